@@ -16,6 +16,127 @@ class Settings:
     # Application
     DEBUG = os.getenv("DEBUG", "False").lower() == "true"
     SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key-change-in-production")
+
+    # Concurrency
+    ANALYZER_MAX_WORKERS = int(os.getenv("ANALYZER_MAX_WORKERS", "8"))
+    HTTP_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", "10"))
+
+    # Transporte HTTP compartilhado (downloads, webhooks e busca do Google)
+    HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "5"))
+    HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "100"))
+    HTTP_MAX_KEEPALIVE = int(os.getenv("HTTP_MAX_KEEPALIVE", "20"))
+    HTTP_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "30"))
+    HTTP_PER_HOST_LIMIT = int(os.getenv("HTTP_PER_HOST_LIMIT", "8"))
+    # HTTP/2 só é usado se o pacote h2 estiver instalado
+    HTTP2_ENABLED = os.getenv("HTTP2_ENABLED", "True").lower() == "true"
+    DNS_CACHE_TTL = float(os.getenv("DNS_CACHE_TTL", "0"))
+    DNS_CACHE_SIZE = int(os.getenv("DNS_CACHE_SIZE", "1024"))
+
+    # Batch endpoint
+    BATCH_MAX_ITEMS = int(os.getenv("BATCH_MAX_ITEMS", "500"))
+    BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", "8"))
+    BATCH_MAX_CONCURRENCY = int(os.getenv("BATCH_MAX_CONCURRENCY", "32"))
+    BATCH_ITEM_TIMEOUT = float(os.getenv("BATCH_ITEM_TIMEOUT", "30"))
+
+    # Verdict store (histórico persistente e camada durável do cache de relatórios)
+    VERDICT_STORE_ENABLED = os.getenv("VERDICT_STORE_ENABLED", "True").lower() == "true"
+
+    # Job queue (POST /jobs)
+    JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+    JOB_WEBHOOK_TIMEOUT = float(os.getenv("JOB_WEBHOOK_TIMEOUT", "10"))
+    # Jobs aguardando worker; com a fila cheia, POST /jobs responde 503
+    JOB_QUEUE_SIZE = int(os.getenv("JOB_QUEUE_SIZE", "1000"))
+
+    # Page downloader: teto de bytes por página e texto de matéria suficiente para parar
+    FETCH_MAX_BYTES = int(os.getenv("FETCH_MAX_BYTES", "2000000"))
+    FETCH_TEXT_TARGET = int(os.getenv("FETCH_TEXT_TARGET", "20000"))
+
+    # HTML extraction backend: auto, selectolax, lxml ou bs4
+    EXTRACTION_BACKEND = os.getenv("EXTRACTION_BACKEND", "auto")
+
+    # Pool de processos para o parsing de HTML (0 = desligado, parsing no executor de threads)
+    EXTRACTION_PROCESSES = int(os.getenv("EXTRACTION_PROCESSES", "0"))
+    EXTRACTION_QUEUE_SIZE = int(os.getenv("EXTRACTION_QUEUE_SIZE", "64"))
+
+    # Seletores aprendidos por host (qual contêiner de matéria funcionou em cada site)
+    EXTRACTION_RULES_LEARNED_SIZE = int(os.getenv("EXTRACTION_RULES_LEARNED_SIZE", "4096"))
+    EXTRACTION_RULES_LEARNED_TTL = float(os.getenv("EXTRACTION_RULES_LEARNED_TTL", "604800"))
+
+    # Google Custom Search
+    SEARCH_PAGE_SIZE = int(os.getenv("SEARCH_PAGE_SIZE", "10"))
+    SEARCH_TIMEOUT = float(os.getenv("SEARCH_TIMEOUT", "10"))
+    # Pós-processamento: fontes que seguem para o prompt e limiar de snippets quase idênticos
+    SEARCH_MAX_SOURCES = int(os.getenv("SEARCH_MAX_SOURCES", "5"))
+    SEARCH_DEDUPE_THRESHOLD = float(os.getenv("SEARCH_DEDUPE_THRESHOLD", "0.8"))
+    # Consulta montada a partir da pista (entidades, números, palavras-chave por TF-IDF)
+    QUERY_MAX_TERMS = int(os.getenv("QUERY_MAX_TERMS", "10"))
+    QUERY_CORPUS_PATH = os.getenv("QUERY_CORPUS_PATH")
+    # Fan-out: variantes da consulta buscadas em paralelo sob um prazo único.
+    # Cada variante é uma chamada ao Custom Search (atenção à cota diária).
+    SEARCH_FANOUT_ENABLED = os.getenv("SEARCH_FANOUT_ENABLED", "False").lower() == "true"
+    SEARCH_FANOUT_QUERIES = int(os.getenv("SEARCH_FANOUT_QUERIES", "2"))
+    # Variante restrita aos sites de checagem (FACT_CHECK_SOURCES, em inglês): só se pedida
+    SEARCH_FANOUT_FACT_CHECK = os.getenv("SEARCH_FANOUT_FACT_CHECK", "False").lower() == "true"
+    SEARCH_FANOUT_DEADLINE = float(os.getenv("SEARCH_FANOUT_DEADLINE", "4"))
+
+    # Enriquecimento: texto das páginas dos primeiros resultados no prompt (desligado por padrão)
+    ENRICH_ENABLED = os.getenv("ENRICH_ENABLED", "False").lower() == "true"
+    ENRICH_TOP_N = int(os.getenv("ENRICH_TOP_N", "3"))
+    ENRICH_PER_HOST = int(os.getenv("ENRICH_PER_HOST", "1"))
+    ENRICH_PAGE_TIMEOUT = float(os.getenv("ENRICH_PAGE_TIMEOUT", "3"))
+    ENRICH_MAX_CHARS = int(os.getenv("ENRICH_MAX_CHARS", "1500"))
+
+    # Resumo extrativo (TextRank) das matérias longas vindas de URL
+    SUMMARY_ENABLED = os.getenv("SUMMARY_ENABLED", "True").lower() == "true"
+    SUMMARY_MIN_CHARS = int(os.getenv("SUMMARY_MIN_CHARS", "2000"))
+    SUMMARY_TARGET_CHARS = int(os.getenv("SUMMARY_TARGET_CHARS", "1000"))
+
+    # Cascata de modelos do relatório: o rápido primeiro, o forte só quando o veredito é incerto
+    GEMINI_MODEL_FAST = os.getenv("GEMINI_MODEL_FAST", "gemini-2.5-flash-lite")
+    GEMINI_MODEL_STRONG = os.getenv("GEMINI_MODEL_STRONG", "gemini-2.5-flash")
+    MODEL_CASCADE_ENABLED = os.getenv("MODEL_CASCADE_ENABLED", "True").lower() == "true"
+    MODEL_ESCALATE_VERDICTS = [v.strip().upper() for v in os.getenv("MODEL_ESCALATE_VERDICTS", "INSUFICIENTE,IMPRECISO").split(",") if v.strip()]
+
+    # Micro-batching: relatórios que chegam juntos vão numa única chamada ao Gemini (desligado por padrão)
+    LLM_BATCH_ENABLED = os.getenv("LLM_BATCH_ENABLED", "False").lower() == "true"
+    LLM_BATCH_WINDOW_MS = float(os.getenv("LLM_BATCH_WINDOW_MS", "30"))
+    LLM_BATCH_MAX_SIZE = int(os.getenv("LLM_BATCH_MAX_SIZE", "8"))
+    # Endpoint alternativo da API do Gemini (transporte REST), ex.: um LLM falso local para testes
+    GEMINI_API_ENDPOINT = os.getenv("GEMINI_API_ENDPOINT")
+
+    # Relatório em JSON imposto pela API (response_schema); o parser tolerante fica como rede de segurança
+    REPORT_STRUCTURED_OUTPUT = os.getenv("REPORT_STRUCTURED_OUTPUT", "True").lower() == "true"
+
+    # Orçamento do prompt do relatório (tokens estimados em ~4 caracteres cada)
+    PROMPT_TOKEN_BUDGET = int(os.getenv("PROMPT_TOKEN_BUDGET", "3000"))
+    PROMPT_LEAD_SHARE = float(os.getenv("PROMPT_LEAD_SHARE", "0.4"))
+    PROMPT_SNIPPET_CHARS = int(os.getenv("PROMPT_SNIPPET_CHARS", "300"))
+
+    # Report cache (TTL em segundos; vereditos "ERRO*" nunca são guardados)
+    REPORT_CACHE_SIZE = int(os.getenv("REPORT_CACHE_SIZE", "1024"))
+    REPORT_CACHE_TTL = float(os.getenv("REPORT_CACHE_TTL", "3600"))
+    REPORT_CACHE_VERDICT_TTLS = {
+        "CONFIRMADO": float(os.getenv("REPORT_CACHE_TTL_CONFIRMADO", "21600")),
+        "FALSO": float(os.getenv("REPORT_CACHE_TTL_FALSO", "21600")),
+        "IMPRECISO": float(os.getenv("REPORT_CACHE_TTL_IMPRECISO", "3600")),
+        "INSUFICIENTE": float(os.getenv("REPORT_CACHE_TTL_INSUFICIENTE", "300")),
+    }
+
+    # Stage caches (busca e extração de URLs)
+    SEARCH_CACHE_SIZE = int(os.getenv("SEARCH_CACHE_SIZE", "2048"))
+    SEARCH_CACHE_TTL = float(os.getenv("SEARCH_CACHE_TTL", "1800"))
+    EXTRACTION_CACHE_SIZE = int(os.getenv("EXTRACTION_CACHE_SIZE", "512"))
+    EXTRACTION_CACHE_TTL = float(os.getenv("EXTRACTION_CACHE_TTL", "86400"))
+
+    # Shared cache backend ("memory" ou "redis") e single-flight entre réplicas
+    CACHE_BACKEND = os.getenv("CACHE_BACKEND", "memory").lower()
+    CACHE_KEY_PREFIX = os.getenv("CACHE_KEY_PREFIX", "newsanalyzer:")
+    CACHE_LOCAL_TTL = float(os.getenv("CACHE_LOCAL_TTL", "60"))
+    REDIS_TIMEOUT = float(os.getenv("REDIS_TIMEOUT", "2"))
+    SINGLE_FLIGHT_LOCK_TTL = float(os.getenv("SINGLE_FLIGHT_LOCK_TTL", "60"))
+    SINGLE_FLIGHT_RESULT_TTL = float(os.getenv("SINGLE_FLIGHT_RESULT_TTL", "30"))
+    SINGLE_FLIGHT_POLL_INTERVAL = float(os.getenv("SINGLE_FLIGHT_POLL_INTERVAL", "0.1"))
+    SINGLE_FLIGHT_WAIT_TIMEOUT = float(os.getenv("SINGLE_FLIGHT_WAIT_TIMEOUT", "45"))
     
     # External APIs
     FACT_CHECK_SOURCES = [
@@ -36,6 +157,11 @@ class Settings:
         "agenciabrasil.ebc.com.br"
     ]
     
+    # Triagem local (antes da busca e do Gemini): score até o limiar = provável desinformação.
+    # Com PRESCREEN_SHORT_CIRCUIT, essas pistas são respondidas sem chamadas de rede.
+    PRESCREEN_FAKE_THRESHOLD = float(os.getenv("PRESCREEN_FAKE_THRESHOLD", "0.15"))
+    PRESCREEN_SHORT_CIRCUIT = os.getenv("PRESCREEN_SHORT_CIRCUIT", "False").lower() == "true"
+
     # Suspicious patterns
     FAKE_NEWS_INDICATORS = [
         "URGENTE",
@@ -1,22 +1,35 @@
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, StreamingResponse
 from pydantic import BaseModel
 from typing import Optional, List, Dict
 import os
+import json
+from contextlib import asynccontextmanager
 from dotenv import load_dotenv
 from app.services.news_analyzer import NewsAnalyzer
+from app.config import settings
+from app.services.jobs import JobQueue, JobQueueFull, job_payload
 
 load_dotenv()
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await job_queue.start()
+    yield
+    await job_queue.stop()
+    await analyzer.aclose()
+
 app = FastAPI(
     title="News Verification API",
     description="API para verificação de notícias falsas",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 analyzer = NewsAnalyzer()
+job_queue = JobQueue(analyzer)
 
 origins = os.getenv("ALLOWED_ORIGINS", "http://localhost:3000").split(",")
 if "null" not in origins:
@@ -45,6 +58,51 @@ class InvestigationResult(BaseModel):
     is_event_real: bool
     verdict: str
     sources: List[Source]
+    credibility_score: Optional[float] = None
+    prescreen: Optional[Dict] = None
+
+class JobInput(BaseModel):
+    text: Optional[str] = None
+    url: Optional[str] = None
+    webhook_url: Optional[str] = None
+
+class JobStatus(BaseModel):
+    job_id: str
+    status: str
+    created_at: str
+    updated_at: str
+    result: Optional[InvestigationResult] = None
+    error: Optional[str] = None
+
+class InvestigationRecord(BaseModel):
+    id: int
+    lead_hash: str
+    lead_text: Optional[str] = None
+    url: Optional[str] = None
+    domain: Optional[str] = None
+    verdict: str
+    is_event_real: bool
+    report: InvestigationResult
+    created_at: str
+
+class HistoryPage(BaseModel):
+    items: List[InvestigationRecord]
+    total: int
+    page: int
+    page_size: int
+
+class BatchInput(BaseModel):
+    items: List[NewsInput]
+    concurrency: Optional[int] = None
+    item_timeout: Optional[float] = None
+
+class BatchItemResult(BaseModel):
+    index: int
+    result: Optional[InvestigationResult] = None
+    error: Optional[str] = None
+
+class BatchResult(BaseModel):
+    results: List[BatchItemResult]
 
 
 @app.get("/")
@@ -55,18 +113,103 @@ async def root():
 async def health_check():
     return {"status": "healthy", "version": "2.0.0"}
 
+@app.get("/stats")
+async def stats():
+    return {**analyzer.stats(), "jobs": job_queue.stats()}
+
 @app.post("/investigate", response_model=InvestigationResult)
 async def investigate_news(news: NewsInput):
     if not news.text and not news.url:
         raise HTTPException(status_code=400, detail="Texto ou URL da notícia é obrigatório")
 
     try:
-        result = analyzer.investigate_and_report(text=news.text, url=news.url)
+        result = await analyzer.ainvestigate_and_report(text=news.text, url=news.url)
         return result
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erro na investigação: {str(e)}")
 
+@app.post("/investigate/stream")
+async def investigate_stream(news: NewsInput):
+    """
+    Server-Sent Events: emite `extraction`, `sources`, `report_chunk` (e `escalation`, se a
+    cascata de modelos passar ao modelo forte) e, por fim, `report` ou `error`.
+    """
+    if not news.text and not news.url:
+        raise HTTPException(status_code=400, detail="Texto ou URL da notícia é obrigatório")
+
+    async def event_stream():
+        try:
+            async for event, data in analyzer.astream_investigation(text=news.text, url=news.url):
+                yield f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+        except Exception as e:
+            error = {"event_summary": f"Erro na investigação: {str(e)}", "key_points": [], "is_event_real": False, "verdict": "ERRO", "sources": []}
+            yield f"event: error\ndata: {json.dumps(error, ensure_ascii=False)}\n\n"
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@app.post("/investigate/batch", response_model=BatchResult)
+async def investigate_batch(batch: BatchInput):
+    if not batch.items:
+        raise HTTPException(status_code=400, detail="A lista de notícias está vazia")
+    if len(batch.items) > settings.BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=413, detail=f"Máximo de {settings.BATCH_MAX_ITEMS} notícias por lote")
+
+    items = [item.model_dump() for item in batch.items]
+    outcomes = await analyzer.ainvestigate_batch(items, concurrency=batch.concurrency, item_timeout=batch.item_timeout)
+
+    results = []
+    for outcome in outcomes:
+        # Valida item a item para que um relatório malformado não derrube o lote inteiro
+        try:
+            result = InvestigationResult(**outcome["result"]) if "result" in outcome else None
+            results.append(BatchItemResult(index=outcome["index"], result=result, error=outcome.get("error")))
+        except Exception as e:
+            results.append(BatchItemResult(index=outcome["index"], error=f"Relatório inválido: {str(e)}"))
+    return BatchResult(results=results)
+
+@app.post("/jobs", response_model=JobStatus, status_code=202)
+async def create_job(job: JobInput):
+    if not job.text and not job.url:
+        raise HTTPException(status_code=400, detail="Texto ou URL da notícia é obrigatório")
+    try:
+        created = await job_queue.submit(text=job.text, url=job.url, webhook_url=job.webhook_url)
+    except JobQueueFull:
+        raise HTTPException(status_code=503, detail="Fila de investigações cheia; tente novamente mais tarde",
+                            headers={"Retry-After": "30"})
+    return job_payload(created)
+
+@app.get("/jobs/{job_id}", response_model=JobStatus)
+async def get_job(job_id: str):
+    job = await job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job não encontrado")
+    return job_payload(job)
+
+@app.get("/history", response_model=HistoryPage)
+async def history(
+    page: int = Query(1, ge=1),
+    page_size: int = Query(20, ge=1, le=100),
+    domain: Optional[str] = None,
+    verdict: Optional[str] = None,
+):
+    if analyzer.verdict_store is None:
+        raise HTTPException(status_code=503, detail="Histórico desabilitado")
+    return await analyzer.ahistory(page=page, page_size=page_size, domain=domain, verdict=verdict)
+
+@app.get("/investigations/{lead_hash}", response_model=HistoryPage)
+async def investigations_by_lead(lead_hash: str, page: int = Query(1, ge=1), page_size: int = Query(20, ge=1, le=100)):
+    if analyzer.verdict_store is None:
+        raise HTTPException(status_code=503, detail="Histórico desabilitado")
+    result = await analyzer.ainvestigations(lead_hash, page=page, page_size=page_size)
+    if not result["total"]:
+        raise HTTPException(status_code=404, detail="Nenhuma investigação encontrada para esta pista")
+    return result
+
 @app.get("/demo", response_class=HTMLResponse)
 async def demo_page():
     html_content = '''
@@ -107,6 +250,7 @@ async def demo_page():
             .result-header.IMPRECISO { background: linear-gradient(135deg, #ffc107 0%, #e0a800 100%); }
             .result-header.FALSO { background: linear-gradient(135deg, #dc3545 0%, #c82333 100%); }
             .result-header.INSUFICIENTE, .result-header.ERRO { background: linear-gradient(135deg, #6c757d 0%, #5a6268 100%); }
+            .result-header.SUSPEITO { background: linear-gradient(135deg, #fd7e14 0%, #e8590c 100%); }
             .result-title { font-size: 1.8em; font-weight: 700; margin: 0; }
             .result-body { padding: 25px; }
             .result-section { margin-bottom: 25px; }
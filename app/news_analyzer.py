@@ -3,10 +3,10 @@ import os
 import json
 import requests
 import google.generativeai as genai
-from googleapiclient.discovery import build
 from bs4 import BeautifulSoup
 from urllib.parse import urlparse
 from typing import Dict, List, Optional
+from app.services.search_client import get_search_client
 
 class NewsAnalyzer:
     """
@@ -107,9 +107,7 @@ class NewsAnalyzer:
         if not self.google_api_key or not self.search_engine_id:
             return [{"error": "A API de Busca não foi configurada."}]
         try:
-            service = build("customsearch", "v1", developerKey=self.google_api_key)
-            result = service.cse().list(q=query, cx=self.search_engine_id, num=5).execute() # Aumentado para 5 resultados
-            return [{ "title": item['title'], "link": item['link'], "snippet": item.get('snippet', '') } for item in result.get('items', [])]
+            return get_search_client(self.google_api_key, self.search_engine_id).search(query, num=5)
         except Exception as e:
             print(f"❌ Erro na busca web: {e}")
             return [{"error": f"Falha ao buscar na web. Detalhe: {str(e)}"}]
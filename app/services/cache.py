@@ -0,0 +1,466 @@
+import time
+import json
+import uuid
+import asyncio
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional
+from app.config import settings
+
+class TTLCache:
+    """
+    Cache LRU limitado em tamanho, com expiração por entrada. Thread-safe.
+    """
+
+    def __init__(self, maxsize: int, default_ttl: float):
+        self.maxsize = maxsize
+        self.default_ttl = default_ttl
+        self._data: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            value, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        ttl = self.default_ttl if ttl is None else ttl
+        if ttl <= 0 or self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key: str):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+class RedisBackend:
+    """
+    Backend de cache compartilhado entre workers e réplicas, com a mesma interface de `TTLCache`.
+    Os valores são serializados em JSON e a expiração fica a cargo do Redis. Falhas de conexão
+    viram "miss" em vez de derrubar a investigação.
+    """
+
+    def __init__(self, client, namespace: str, default_ttl: float):
+        self.client = client
+        self.prefix = f"{settings.CACHE_KEY_PREFIX}{namespace}:"
+        self.default_ttl = default_ttl
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        try:
+            raw = self.client.get(self.prefix + key)
+        except Exception as e:
+            self.errors += 1
+            print(f"[ERROR] Falha ao ler do Redis: {e}")
+            return None
+        if raw is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(raw)
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        ttl = self.default_ttl if ttl is None else ttl
+        if ttl <= 0:
+            return
+        try:
+            self.client.set(self.prefix + key, json.dumps(value, ensure_ascii=False), px=int(ttl * 1000))
+        except Exception as e:
+            self.errors += 1
+            print(f"[ERROR] Falha ao gravar no Redis: {e}")
+
+    def delete(self, key: str):
+        try:
+            self.client.delete(self.prefix + key)
+        except Exception as e:
+            self.errors += 1
+            print(f"[ERROR] Falha ao apagar no Redis: {e}")
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "errors": self.errors,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+class TieredCache:
+    """
+    Cache local (`TTLCache`) na frente de um backend compartilhado. Acertos locais continuam
+    custando microssegundos; o backend compartilhado evita que cada worker comece frio.
+    """
+
+    def __init__(self, local: TTLCache, remote: RedisBackend):
+        self.local = local
+        self.remote = remote
+        self.default_ttl = remote.default_ttl
+
+    def get(self, key: str) -> Optional[Any]:
+        value = self.local.get(key)
+        if value is not None:
+            return value
+        value = self.remote.get(key)
+        if value is not None:
+            self.local.set(key, value)
+        return value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        ttl = self.default_ttl if ttl is None else ttl
+        if ttl <= 0:
+            return
+        # A cópia local vive no máximo o TTL local, para limitar a defasagem entre réplicas
+        self.local.set(key, value, min(ttl, self.local.default_ttl))
+        self.remote.set(key, value, ttl)
+
+    def delete(self, key: str):
+        self.local.delete(key)
+        self.remote.delete(key)
+
+    def clear(self):
+        self.local.clear()
+
+    def stats(self) -> Dict:
+        return {"local": self.local.stats(), "shared": self.remote.stats()}
+
+
+_redis_client = None
+_redis_lock = threading.Lock()
+
+def get_redis_client():
+    """
+    Cliente Redis do processo, criado a partir de `REDIS_URL`. Retorna None se o pacote
+    `redis` não estiver instalado ou o servidor não responder.
+    """
+    global _redis_client
+    if _redis_client is None:
+        with _redis_lock:
+            if _redis_client is None:
+                try:
+                    import redis
+                    client = redis.Redis.from_url(settings.REDIS_URL, socket_timeout=settings.REDIS_TIMEOUT)
+                    client.ping()
+                    print("[OK] Cache compartilhado no Redis configurado.")
+                except Exception as e:
+                    print(f"⚠️ Redis indisponível ({e}). Usando cache em memória.")
+                    client = False
+                _redis_client = client
+    return _redis_client or None
+
+def get_cache_backend(namespace: str, maxsize: int, ttl: float):
+    """
+    Escolhe o backend conforme `CACHE_BACKEND`: "memory" (padrão) ou "redis".
+    """
+    if settings.CACHE_BACKEND == "redis":
+        client = get_redis_client()
+        if client is not None:
+            local = TTLCache(maxsize, min(ttl, settings.CACHE_LOCAL_TTL))
+            return TieredCache(local, RedisBackend(client, namespace, ttl))
+    return TTLCache(maxsize, ttl)
+
+
+class RedisLock:
+    """
+    Lock distribuído simples: SET NX PX com um token próprio. A liberação só apaga a chave se
+    o token ainda for o nosso (WATCH/MULTI, sem depender de scripts Lua).
+    """
+
+    def __init__(self, client, name: str, ttl: float):
+        self.client = client
+        self.name = name
+        self.ttl = ttl
+        self.token = uuid.uuid4().hex
+
+    def acquire(self) -> bool:
+        return bool(self.client.set(self.name, self.token, nx=True, px=int(self.ttl * 1000)))
+
+    def release(self):
+        from redis.exceptions import WatchError
+        with self.client.pipeline() as pipe:
+            try:
+                pipe.watch(self.name)
+                current = pipe.get(self.name)
+                if isinstance(current, bytes):
+                    current = current.decode()
+                if current == self.token:
+                    pipe.multi()
+                    pipe.delete(self.name)
+                    pipe.execute()
+                else:
+                    pipe.unwatch()
+            except WatchError:
+                # O lock expirou e outro worker o pegou: nada a liberar
+                pass
+
+
+class SharedFlight:
+    """
+    Single-flight entre workers e réplicas: para cada pista, só quem obtém o lock no Redis
+    executa o pipeline; os demais aguardam o resultado publicado. Se o dono do lock morrer,
+    o lock expira e um dos que aguardam assume. Passado `wait_timeout`, o worker desiste de
+    esperar e executa por conta própria; se o Redis falhar, executa na hora, sem esperar.
+
+    O cliente Redis é síncrono: em `arun`, as chamadas a ele rodam no executor padrão do loop.
+    """
+
+    def __init__(self, client, lock_ttl: float = None, result_ttl: float = None,
+                 poll_interval: float = None, wait_timeout: float = None):
+        self.client = client
+        self.lock_ttl = lock_ttl or settings.SINGLE_FLIGHT_LOCK_TTL
+        self.poll_interval = poll_interval or settings.SINGLE_FLIGHT_POLL_INTERVAL
+        self.wait_timeout = wait_timeout or settings.SINGLE_FLIGHT_WAIT_TIMEOUT
+        self._results = RedisBackend(client, "flight-result", result_ttl or settings.SINGLE_FLIGHT_RESULT_TTL)
+        self.led = 0
+        self.waited = 0
+        self.timeouts = 0
+        self.errors = 0
+
+    def _lock(self, key: str) -> RedisLock:
+        return RedisLock(self.client, f"{settings.CACHE_KEY_PREFIX}flight-lock:{key}", self.lock_ttl)
+
+    def _try_lead(self, lock: RedisLock) -> Optional[bool]:
+        """
+        True se obteve o lock, False se outro worker o tem, None se o Redis falhou.
+        """
+        try:
+            return lock.acquire()
+        except Exception as e:
+            self.errors += 1
+            print(f"[ERROR] Falha ao obter lock no Redis: {e}")
+            return None
+
+    def _release(self, lock: RedisLock):
+        try:
+            lock.release()
+        except Exception as e:
+            print(f"[ERROR] Falha ao liberar lock no Redis: {e}")
+
+    def _publish(self, key: str, result: Dict):
+        self._results.set(key, {"published_at": time.time(), "result": result})
+
+    def _published_since(self, key: str, started_at: float) -> Optional[Dict]:
+        # Só vale o resultado da execução que estávamos aguardando, não o de uma anterior
+        published = self._results.get(key)
+        if published is None or published["published_at"] < started_at:
+            return None
+        return published["result"]
+
+    def run(self, key: str, compute: Callable[[], Dict]) -> Dict:
+        lock = self._lock(key)
+        started_at = time.time()
+        deadline = time.monotonic() + self.wait_timeout
+        while time.monotonic() < deadline:
+            leading = self._try_lead(lock)
+            if leading is None:
+                # Sem Redis não há quem esperar: executa já
+                return compute()
+            if leading:
+                self.led += 1
+                try:
+                    result = compute()
+                    self._publish(key, result)
+                    return result
+                finally:
+                    self._release(lock)
+            time.sleep(self.poll_interval)
+            result = self._published_since(key, started_at)
+            if result is not None:
+                self.waited += 1
+                return result
+        self.timeouts += 1
+        return compute()
+
+    async def arun(self, key: str, compute: Callable[[], Awaitable[Dict]]) -> Dict:
+        loop = asyncio.get_running_loop()
+        lock = self._lock(key)
+        started_at = time.time()
+        deadline = time.monotonic() + self.wait_timeout
+        while time.monotonic() < deadline:
+            leading = await loop.run_in_executor(None, self._try_lead, lock)
+            if leading is None:
+                return await compute()
+            if leading:
+                self.led += 1
+                try:
+                    result = await compute()
+                    await loop.run_in_executor(None, self._publish, key, result)
+                    return result
+                finally:
+                    await loop.run_in_executor(None, self._release, lock)
+            await asyncio.sleep(self.poll_interval)
+            result = await loop.run_in_executor(None, self._published_since, key, started_at)
+            if result is not None:
+                self.waited += 1
+                return result
+        self.timeouts += 1
+        return await compute()
+
+    def stats(self) -> Dict:
+        return {"led": self.led, "waited": self.waited, "timeouts": self.timeouts, "errors": self.errors}
+
+def get_shared_flight() -> Optional[SharedFlight]:
+    if settings.CACHE_BACKEND != "redis":
+        return None
+    client = get_redis_client()
+    return SharedFlight(client) if client is not None else None
+
+
+class ReportCache:
+    """
+    Cache dos relatórios finais, indexado pela chave normalizada da pista (`lead_key`).
+    O tempo de vida depende do veredito; vereditos de erro nunca são guardados.
+    """
+
+    def __init__(self, maxsize: int = None, default_ttl: float = None, verdict_ttls: Dict[str, float] = None,
+                 backend=None, durable=None):
+        self.verdict_ttls = verdict_ttls if verdict_ttls is not None else settings.REPORT_CACHE_VERDICT_TTLS
+        self.default_ttl = default_ttl if default_ttl is not None else settings.REPORT_CACHE_TTL
+        self._cache = backend if backend is not None else get_cache_backend(
+            "report",
+            maxsize if maxsize is not None else settings.REPORT_CACHE_SIZE,
+            self.default_ttl,
+        )
+        # Camada durável opcional (VerdictStore): consultada quando o cache está frio
+        self.durable = durable
+        self.durable_hits = 0
+
+    def ttl_for(self, report: Dict) -> float:
+        verdict = str(report.get("verdict", "")).upper()
+        if not verdict or verdict.startswith("ERRO"):
+            return 0
+        return self.verdict_ttls.get(verdict, self.default_ttl)
+
+    def get(self, key: str) -> Optional[Dict]:
+        report = self._cache.get(key)
+        if report is None and self.durable is not None:
+            report = self._get_durable(key)
+        return dict(report) if report is not None else None
+
+    def _get_durable(self, key: str) -> Optional[Dict]:
+        max_ttl = max([self.default_ttl, *self.verdict_ttls.values()])
+        found = self.durable.latest(key, max_ttl)
+        if found is None:
+            return None
+        report, age = found
+        remaining = self.ttl_for(report) - age
+        if remaining <= 0:
+            return None
+        # Reaquece o cache rápido com o tempo de vida que ainda resta ao relatório
+        self._cache.set(key, report, remaining)
+        self.durable_hits += 1
+        return report
+
+    def set(self, key: str, report: Dict):
+        self._cache.set(key, dict(report), self.ttl_for(report))
+
+    def clear(self):
+        self._cache.clear()
+
+    def stats(self) -> Dict:
+        stats = self._cache.stats()
+        if self.durable is not None:
+            stats = {**stats, "durable_hits": self.durable_hits}
+        return stats
+
+
+class ExtractionCache:
+    """
+    Cache da etapa de extração de URLs, em dois níveis:
+
+    - validadores HTTP (`ETag`/`Last-Modified`) por URL canônica, usados em GETs condicionais;
+    - conteúdo extraído indexado pelo hash SHA-256 do corpo da página.
+
+    Uma resposta 304 devolve o conteúdo já extraído sem download; um 200 com corpo idêntico
+    a um já visto devolve o conteúdo sem refazer o parsing.
+    """
+
+    def __init__(self, maxsize: int = None, ttl: float = None):
+        maxsize = maxsize if maxsize is not None else settings.EXTRACTION_CACHE_SIZE
+        ttl = ttl if ttl is not None else settings.EXTRACTION_CACHE_TTL
+        self._validators = get_cache_backend("url-validators", maxsize, ttl)
+        self._pages = get_cache_backend("url-pages", maxsize, ttl)
+        self.not_modified = 0
+
+    def conditional_headers(self, url: str) -> Dict[str, str]:
+        validators = self._validators.get(url)
+        if not validators:
+            return {}
+        headers = {}
+        if validators.get("etag"):
+            headers["If-None-Match"] = validators["etag"]
+        if validators.get("last_modified"):
+            headers["If-Modified-Since"] = validators["last_modified"]
+        return headers
+
+    def get_not_modified(self, url: str) -> Optional[Dict]:
+        """
+        Conteúdo extraído para uma URL que respondeu 304, se ainda estiver em cache.
+        """
+        validators = self._validators.get(url)
+        if not validators:
+            return None
+        page = self._pages.get(validators["body_hash"])
+        if page is not None:
+            self.not_modified += 1
+        return page
+
+    @staticmethod
+    def body_hash(content: bytes) -> str:
+        return hashlib.sha256(content).hexdigest()
+
+    def get_page(self, body_hash: str) -> Optional[Dict]:
+        return self._pages.get(body_hash)
+
+    def store(self, url: str, headers, body_hash: str, extracted: Dict):
+        self._pages.set(body_hash, extracted)
+        etag, last_modified = headers.get("ETag"), headers.get("Last-Modified")
+        if etag or last_modified:
+            self._validators.set(url, {"etag": etag, "last_modified": last_modified, "body_hash": body_hash})
+
+    def stats(self) -> Dict:
+        return {
+            "pages": self._pages.stats(),
+            "validators": self._validators.stats(),
+            "not_modified": self.not_modified,
+        }
@@ -0,0 +1,33 @@
+import sqlite3
+from datetime import datetime, timezone
+from urllib.parse import urlparse
+from app.config import settings
+
+DEFAULT_SQLITE_PATH = "./news_checker.db"
+
+def sqlite_path(database_url: str = None) -> str:
+    """
+    Converte `DATABASE_URL` ("sqlite:///./news_checker.db") no caminho do arquivo.
+    Outros bancos não são suportados: nesse caso usa o arquivo SQLite padrão.
+    """
+    database_url = database_url or settings.DATABASE_URL
+    parsed = urlparse(database_url)
+    if parsed.scheme != "sqlite":
+        print(f"⚠️ DATABASE_URL '{parsed.scheme}' não suportado. Usando SQLite em {DEFAULT_SQLITE_PATH}.")
+        return DEFAULT_SQLITE_PATH
+    # sqlite:///relativo.db -> "/relativo.db"; sqlite:////abs/x.db -> "//abs/x.db"
+    path = parsed.path[1:] if parsed.path.startswith("/") else parsed.path
+    return path or ":memory:"
+
+def connect(path: str = None) -> sqlite3.Connection:
+    """
+    Abre uma conexão compartilhável entre threads (o acesso é serializado por quem a usa).
+    """
+    conn = sqlite3.connect(path or sqlite_path(), check_same_thread=False, isolation_level=None)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+def utcnow() -> str:
+    return datetime.now(timezone.utc).isoformat()
@@ -0,0 +1,161 @@
+import re
+import httpx
+from typing import Dict, Optional
+from app.config import settings
+from app.services.extraction import detect_encoding
+from app.services.http_transport import get_transport
+
+HTML_CONTENT_TYPES = ("text/html", "application/xhtml+xml")
+
+# Uma tag não contém "<": cada tentativa para no próximo "<", e a varredura fica linear
+_TAG_RE = re.compile(rb"<(/?)([a-zA-Z][a-zA-Z0-9]*)?(?![a-zA-Z0-9])[^<>]*>")
+# Tags que fecham um <p> aberto (HTML5: o </p> é opcional), mais script/style
+_PARAGRAPH_CLOSERS = frozenset(
+    b"address article aside blockquote div dl fieldset footer form h1 h2 h3 h4 h5 h6 "
+    b"header hr main menu nav ol pre section table ul script style".split()
+)
+# Início de tag ainda sem ">" que fica para o próximo trecho; acima disso é lixo, não tag
+MAX_PENDING_TAG = 4096
+
+class DownloadError(Exception):
+    pass
+
+
+class _BodyCollector:
+    """
+    Acumula o corpo da resposta em streaming e decide quando parar: ao atingir o limite
+    de bytes ou quando os parágrafos já recebidos somam texto suficiente para a análise.
+    """
+
+    def __init__(self, max_bytes: int, text_target: int):
+        self.max_bytes = max_bytes
+        self.text_target = text_target
+        self._buffer = bytearray()
+        self._scan_pos = 0
+        self._in_paragraph = False
+        self._text_chars = 0
+        self.truncated = False
+
+    def check_headers(self, response: httpx.Response):
+        content_type = response.headers.get("Content-Type", "")
+        media_type = content_type.split(";", 1)[0].strip().lower()
+        if media_type and media_type not in HTML_CONTENT_TYPES:
+            raise DownloadError(f"Tipo de conteúdo não suportado: {media_type}")
+
+    def feed(self, chunk: bytes) -> bool:
+        """
+        Adiciona um trecho do corpo. Retorna True quando o download deve parar.
+        """
+        room = self.max_bytes - len(self._buffer)
+        if len(chunk) >= room:
+            self._buffer += chunk[:room]
+            self.truncated = True
+            return True
+        self._buffer += chunk
+        return self._enough_text()
+
+    def _enough_text(self) -> bool:
+        if not self.text_target:
+            return False
+        # Varredura incremental: cada byte é visto uma vez (fora um início de tag cortado
+        # entre trechos), com ou sem </p>, para que HTML hostil não trave o event loop
+        buffer, pos = self._buffer, self._scan_pos
+        for match in _TAG_RE.finditer(buffer, pos):
+            if self._in_paragraph:
+                self._text_chars += len(buffer[pos:match.start()].strip())
+            name = (match.group(2) or b"").lower()
+            if name == b"p":
+                self._in_paragraph = not match.group(1)
+            elif name in _PARAGRAPH_CLOSERS:
+                self._in_paragraph = False
+            pos = match.end()
+        pending = buffer.rfind(b"<", pos)
+        if pending < 0 or len(buffer) - pending > MAX_PENDING_TAG:
+            pending = len(buffer)
+        if self._in_paragraph:
+            self._text_chars += len(buffer[pos:pending].strip())
+        self._scan_pos = pending
+        if self._text_chars >= self.text_target:
+            self.truncated = True
+            return True
+        return False
+
+    @property
+    def content(self) -> bytes:
+        return bytes(self._buffer)
+
+
+class PageDownloader:
+    """
+    Download de páginas com memória previsível: o corpo chega em streaming, limitado a
+    `FETCH_MAX_BYTES`; tipos que não são HTML (PDF, vídeo, streams) são recusados pelos
+    cabeçalhos, antes de qualquer byte do corpo; e o download para assim que há texto
+    de matéria suficiente (`FETCH_TEXT_TARGET` caracteres em parágrafos).
+
+    O charset é resolvido uma única vez (cabeçalho, depois <meta>) e repassado ao
+    extrator, que decodifica o corpo uma só vez. As conexões vêm do transporte HTTP
+    compartilhado; `timeout`, se informado, substitui o padrão do transporte.
+    """
+
+    DEFAULT_HEADERS = {'User-Agent': 'Mozilla/5.0'}
+
+    def __init__(self, max_bytes: int = None, text_target: int = None, timeout: float = None):
+        self.max_bytes = max_bytes or settings.FETCH_MAX_BYTES
+        self.text_target = settings.FETCH_TEXT_TARGET if text_target is None else text_target
+        self.timeout = timeout
+        self.transport = get_transport()
+        self.truncated = 0
+        self.rejected = 0
+
+    def _request_options(self, headers: Optional[Dict[str, str]]) -> Dict:
+        options = {"headers": {**self.DEFAULT_HEADERS, **(headers or {})}, "follow_redirects": True}
+        if self.timeout is not None:
+            options["timeout"] = self.timeout
+        return options
+
+    def _start(self, response: httpx.Response) -> Optional[_BodyCollector]:
+        if response.status_code == 304:
+            return None
+        response.raise_for_status()
+        collector = _BodyCollector(self.max_bytes, self.text_target)
+        try:
+            collector.check_headers(response)
+        except DownloadError:
+            self.rejected += 1
+            raise
+        return collector
+
+    def _page(self, response: httpx.Response, collector: Optional[_BodyCollector]) -> Dict:
+        if collector is None:
+            return {"status": 304, "headers": response.headers, "content": b"", "encoding": None, "truncated": False}
+        content = collector.content
+        if collector.truncated:
+            self.truncated += 1
+        return {
+            "status": response.status_code,
+            "headers": response.headers,
+            "content": content,
+            "encoding": detect_encoding(content, response.headers.get("Content-Type")),
+            "truncated": collector.truncated,
+        }
+
+    def fetch(self, url: str, headers: Dict[str, str] = None) -> Dict:
+        with self.transport.client().stream("GET", url, **self._request_options(headers)) as response:
+            collector = self._start(response)
+            if collector is not None:
+                for chunk in response.iter_bytes():
+                    if collector.feed(chunk):
+                        break
+            return self._page(response, collector)
+
+    async def afetch(self, url: str, headers: Dict[str, str] = None) -> Dict:
+        async with self.transport.async_client().stream("GET", url, **self._request_options(headers)) as response:
+            collector = self._start(response)
+            if collector is not None:
+                async for chunk in response.aiter_bytes():
+                    if collector.feed(chunk):
+                        break
+            return self._page(response, collector)
+
+    def stats(self) -> Dict:
+        return {"truncated": self.truncated, "rejected": self.rejected}
@@ -0,0 +1,115 @@
+import re
+import asyncio
+import threading
+import concurrent.futures
+from collections import Counter
+from typing import Awaitable, Callable, Dict, List
+from app.config import settings
+from app.services.extraction_rules import host_of
+
+_SENTENCE_END_RE = re.compile(r"[.!?](?=\s)")
+
+def condense(text: str, max_chars: int) -> str:
+    """
+    Corta o texto em `max_chars`, terminando na última frase completa quando possível;
+    senão, no último espaço, marcando o corte com reticências.
+    """
+    text = " ".join((text or "").split())
+    if len(text) <= max_chars:
+        return text
+    cut = text[:max_chars]
+    ends = [m.end() for m in _SENTENCE_END_RE.finditer(cut)]
+    if ends and ends[-1] > max_chars // 2:
+        return cut[:ends[-1]]
+    cut = cut[:max_chars - 1]
+    space = cut.rfind(" ")
+    return (cut[:space] if space > max_chars // 2 else cut).rstrip() + "…"
+
+
+class SourceEnricher:
+    """
+    Enriquecimento opcional do contexto do relatório: baixa as páginas dos primeiros
+    `ENRICH_TOP_N` resultados da busca, em paralelo, e passa ao prompt um trecho do texto
+    de cada uma (além do snippet de ~160 caracteres).
+
+    Usa o mesmo caminho de extração das URLs enviadas pelo usuário (downloader, cache de
+    validadores/conteúdo, regras por domínio). Cada página tem um prazo próprio
+    (`ENRICH_PAGE_TIMEOUT`): a que não chegar a tempo simplesmente fica de fora. No máximo
+    `ENRICH_PER_HOST` páginas do mesmo host são escolhidas, o que limita a concorrência por host.
+    """
+
+    def __init__(self, extract: Callable[[str], Dict], aextract: Callable[[str], Awaitable[Dict]],
+                 executor: concurrent.futures.Executor, top_n: int = None, per_host: int = None,
+                 page_timeout: float = None, max_chars: int = None):
+        self.extract = extract
+        self.aextract = aextract
+        self.executor = executor
+        self.top_n = top_n or settings.ENRICH_TOP_N
+        self.per_host = per_host or settings.ENRICH_PER_HOST
+        self.page_timeout = page_timeout or settings.ENRICH_PAGE_TIMEOUT
+        self.max_chars = max_chars or settings.ENRICH_MAX_CHARS
+        self._lock = threading.Lock()
+        self.pages = 0
+        self.enriched = 0
+        self.timeouts = 0
+        self.errors = 0
+
+    def select(self, search_results: List[Dict]) -> List[str]:
+        per_host, links = Counter(), []
+        for item in search_results:
+            host = host_of(item.get("link"))
+            if not host or per_host[host] >= self.per_host:
+                continue
+            per_host[host] += 1
+            links.append(item["link"])
+            if len(links) == self.top_n:
+                break
+        return links
+
+    def _collect(self, link: str, extracted, timed_out: bool, evidence: Dict[str, str]):
+        with self._lock:
+            self.pages += 1
+            if timed_out:
+                self.timeouts += 1
+            elif not extracted or "error" in extracted:
+                self.errors += 1
+            else:
+                self.enriched += 1
+                evidence[link] = condense(extracted.get("extracted_content", ""), self.max_chars)
+
+    def enrich(self, search_results: List[Dict]) -> Dict[str, str]:
+        """
+        Retorna {link: trecho do texto da página} para as páginas que chegaram no prazo.
+        """
+        links = self.select(search_results)
+        futures = {self.executor.submit(self.extract, link): link for link in links}
+        done, pending = concurrent.futures.wait(futures, timeout=self.page_timeout)
+        evidence = {}
+        for future, link in futures.items():
+            if future in pending:
+                future.cancel()
+                self._collect(link, None, True, evidence)
+            else:
+                self._collect(link, None if future.exception() else future.result(), False, evidence)
+        return evidence
+
+    async def aenrich(self, search_results: List[Dict]) -> Dict[str, str]:
+        links = self.select(search_results)
+
+        async def fetch(link: str):
+            try:
+                return await asyncio.wait_for(self.aextract(link), timeout=self.page_timeout), False
+            except asyncio.TimeoutError:
+                return None, True
+            except Exception:
+                return None, False
+
+        outcomes = await asyncio.gather(*(fetch(link) for link in links))
+        evidence = {}
+        for link, (extracted, timed_out) in zip(links, outcomes):
+            self._collect(link, extracted, timed_out, evidence)
+        return evidence
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {"pages": self.pages, "enriched": self.enriched, "timeouts": self.timeouts, "errors": self.errors}
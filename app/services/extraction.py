@@ -0,0 +1,184 @@
+import re
+from bs4 import BeautifulSoup
+from typing import Dict, List, Optional
+from app.config import settings
+
+# Contêineres de conteúdo principal, em ordem de prioridade
+MAIN_CONTENT_SELECTORS = [
+    'article', '.article-body', '.post-content', '.entry-content', '.td-post-content',
+    '.materia-conteudo', '.article__content', '.news_post_body', '.post__text',
+    '#content', '.c-news__body', '.n--noticia__content', '.mc-article-body'
+]
+
+# Elementos removidos antes da extração: nunca fazem parte do texto da matéria
+STRIP_TAGS = ['script', 'style', 'noscript', 'nav']
+
+TITLE_NOT_FOUND = "Título não encontrado"
+
+_META_CHARSET_RE = re.compile(rb'<meta[^>]+charset=["\']?\s*([A-Za-z0-9_\-:.]+)', re.IGNORECASE)
+
+def detect_encoding(content: bytes, content_type: Optional[str] = None) -> str:
+    """
+    Charset da página: primeiro o cabeçalho Content-Type, depois o <meta charset> no início
+    do documento, por fim UTF-8.
+    """
+    if content_type:
+        match = re.search(r'charset=["\']?([A-Za-z0-9_\-:.]+)', content_type, re.IGNORECASE)
+        if match:
+            return match.group(1).lower()
+    match = _META_CHARSET_RE.search(content[:4096])
+    if match:
+        return match.group(1).decode("ascii").lower()
+    return "utf-8"
+
+def decode_html(content: bytes, encoding: Optional[str] = None) -> str:
+    encoding = encoding or detect_encoding(content)
+    try:
+        return content.decode(encoding, errors="replace")
+    except LookupError:
+        # Charset desconhecido declarado pela página
+        return content.decode("utf-8", errors="replace")
+
+def _result(page_title: str, paragraphs: List[str], selector: Optional[str]) -> Dict:
+    # `selector` é o contêiner que casou (None quando caiu na busca genérica por <p>)
+    content = ' '.join(paragraphs)
+    return {"extracted_content": f"{page_title}. {content}", "title": page_title, "selector": selector}
+
+
+class Bs4Extractor:
+    """
+    Implementação de referência com BeautifulSoup + html.parser (Python puro).
+    """
+
+    name = "bs4"
+
+    def extract(self, content: bytes, encoding: Optional[str] = None, selectors: List[str] = None) -> Dict:
+        soup = BeautifulSoup(content, 'html.parser', from_encoding=encoding)
+        for tag in soup(STRIP_TAGS):
+            tag.decompose()
+
+        title = soup.find('title')
+        page_title = title.text.strip() if title else TITLE_NOT_FOUND
+
+        # Cada seletor é avaliado uma única vez
+        content_container, matched = None, None
+        for selector in selectors or MAIN_CONTENT_SELECTORS:
+            content_container = soup.select_one(selector)
+            if content_container is not None:
+                matched = selector
+                break
+
+        if content_container is not None:
+            paragraphs = content_container.find_all('p', recursive=False)
+        else:
+            paragraphs = soup.find_all('p')
+        return _result(page_title, [p.text.strip() for p in paragraphs], matched)
+
+
+class LxmlExtractor:
+    """
+    Parser em C (libxml2). Os seletores, todos simples (tag, .classe, #id), são
+    pré-compilados em XPath uma única vez (os das regras por domínio, no primeiro uso).
+    """
+
+    name = "lxml"
+
+    def __init__(self):
+        import lxml.html
+        from lxml import etree
+        self._html = lxml.html
+        self._etree = etree
+        self._compiled = {s: etree.XPath(self._to_xpath(s)) for s in MAIN_CONTENT_SELECTORS}
+        self._title = etree.XPath('//title')
+        self._paragraphs = etree.XPath('//p')
+
+    @staticmethod
+    def _to_xpath(selector: str) -> str:
+        if selector.startswith('.'):
+            return f'(//*[contains(concat(" ", normalize-space(@class), " "), " {selector[1:]} ")])[1]'
+        if selector.startswith('#'):
+            return f'(//*[@id="{selector[1:]}"])[1]'
+        return f'(//{selector})[1]'
+
+    def _xpath(self, selector: str):
+        compiled = self._compiled.get(selector)
+        if compiled is None:
+            compiled = self._compiled[selector] = self._etree.XPath(self._to_xpath(selector))
+        return compiled
+
+    def extract(self, content: bytes, encoding: Optional[str] = None, selectors: List[str] = None) -> Dict:
+        parser = self._html.HTMLParser(encoding=encoding or detect_encoding(content), remove_comments=True)
+        root = self._html.document_fromstring(content, parser=parser)
+        for element in root.iter(*STRIP_TAGS):
+            element.drop_tree()
+
+        title = self._title(root)
+        page_title = title[0].text_content().strip() if title else TITLE_NOT_FOUND
+
+        content_container, matched = None, None
+        for selector in selectors or MAIN_CONTENT_SELECTORS:
+            found = self._xpath(selector)(root)
+            if found:
+                content_container, matched = found[0], selector
+                break
+
+        if content_container is not None:
+            paragraphs = content_container.findall('p')
+        else:
+            paragraphs = self._paragraphs(root)
+        return _result(page_title, [p.text_content().strip() for p in paragraphs], matched)
+
+
+class SelectolaxExtractor:
+    """
+    Parser em C (lexbor) via selectolax: o mais rápido dos backends.
+    """
+
+    name = "selectolax"
+
+    def __init__(self):
+        from selectolax.lexbor import LexborHTMLParser
+        self._parser = LexborHTMLParser
+
+    def extract(self, content: bytes, encoding: Optional[str] = None, selectors: List[str] = None) -> Dict:
+        tree = self._parser(decode_html(content, encoding))
+        tree.strip_tags(STRIP_TAGS)
+
+        title = tree.css_first('title')
+        page_title = title.text().strip() if title is not None else TITLE_NOT_FOUND
+
+        content_container, matched = None, None
+        for selector in selectors or MAIN_CONTENT_SELECTORS:
+            content_container = tree.css_first(selector)
+            if content_container is not None:
+                matched = selector
+                break
+
+        if content_container is not None:
+            paragraphs = [node for node in content_container.iter() if node.tag == 'p']
+        else:
+            paragraphs = tree.css('p')
+        return _result(page_title, [p.text().strip() for p in paragraphs], matched)
+
+
+EXTRACTORS = {
+    "selectolax": SelectolaxExtractor,
+    "lxml": LxmlExtractor,
+    "bs4": Bs4Extractor,
+}
+
+def get_extractor(name: str = None):
+    """
+    Instancia o backend de extração configurado em `EXTRACTION_BACKEND`. Com "auto" (padrão),
+    usa o mais rápido disponível: selectolax, depois lxml, por fim BeautifulSoup.
+    """
+    name = (name or settings.EXTRACTION_BACKEND).lower()
+    candidates = list(EXTRACTORS) if name == "auto" else [name]
+    for candidate in candidates:
+        try:
+            return EXTRACTORS[candidate]()
+        except ImportError:
+            print(f"⚠️ Backend de extração '{candidate}' indisponível.")
+        except KeyError:
+            print(f"⚠️ Backend de extração '{candidate}' desconhecido.")
+    return Bs4Extractor()
@@ -0,0 +1,112 @@
+import asyncio
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, List, Optional
+from app.config import settings
+from app.services.extraction import get_extractor
+
+# Extrator do processo worker, criado uma única vez pelo initializer
+_worker_extractor = None
+
+def _init_worker(backend: str):
+    global _worker_extractor
+    _worker_extractor = get_extractor(backend)
+
+def _extract_in_worker(content: bytes, encoding: Optional[str], selectors: List[str]) -> Dict:
+    # Entra o corpo bruto, sai só o texto extraído: o mínimo possível atravessa o pipe
+    return _worker_extractor.extract(content, encoding, selectors)
+
+
+class ExtractionPool:
+    """
+    Pool de processos para o parsing de HTML, que é CPU-bound e segura o GIL: com ele,
+    um único worker do uvicorn usa vários núcleos em cargas com muitas URLs.
+
+    O número de páginas em processamento (em execução ou aguardando um processo livre) é
+    limitado a `EXTRACTION_QUEUE_SIZE`; acima disso, quem chega espera. Se o pool quebrar
+    (um processo morto pelo sistema, por exemplo), ele é recriado e a página é processada
+    na própria thread.
+    """
+
+    def __init__(self, workers: int = None, queue_size: int = None, backend: str = None):
+        self.workers = workers or settings.EXTRACTION_PROCESSES
+        self.queue_size = queue_size or settings.EXTRACTION_QUEUE_SIZE
+        self.backend = backend or settings.EXTRACTION_BACKEND
+        # "spawn": o processo pai tem threads (executor, clientes HTTP), e fork com threads não é seguro
+        self._context = multiprocessing.get_context("spawn")
+        self._pool = self._new_pool()
+        self._slots = threading.BoundedSemaphore(self.queue_size)
+        self._async_slots: Optional[asyncio.Semaphore] = None
+        self._lock = threading.Lock()
+        self.submitted = 0
+        self.completed = 0
+        self.restarts = 0
+        self.in_flight = 0
+
+    def _new_pool(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(
+            max_workers=self.workers, mp_context=self._context,
+            initializer=_init_worker, initargs=(self.backend,),
+        )
+
+    def _count(self, delta: int):
+        with self._lock:
+            self.in_flight += delta
+            if delta > 0:
+                self.submitted += 1
+            else:
+                self.completed += 1
+
+    def _restart(self, broken: ProcessPoolExecutor):
+        with self._lock:
+            if self._pool is broken:
+                print("[ERROR] Pool de extração quebrado; recriando.")
+                self._pool = self._new_pool()
+                self.restarts += 1
+        broken.shutdown(wait=False)
+
+    def _inline(self, content: bytes, encoding: Optional[str], selectors: List[str]) -> Dict:
+        return get_extractor(self.backend).extract(content, encoding, selectors)
+
+    def extract(self, content: bytes, encoding: Optional[str] = None, selectors: List[str] = None) -> Dict:
+        with self._slots:
+            self._count(1)
+            pool = self._pool
+            try:
+                return pool.submit(_extract_in_worker, content, encoding, selectors).result()
+            except BrokenProcessPool:
+                self._restart(pool)
+                return self._inline(content, encoding, selectors)
+            finally:
+                self._count(-1)
+
+    async def aextract(self, content: bytes, encoding: Optional[str] = None, selectors: List[str] = None) -> Dict:
+        if self._async_slots is None:
+            self._async_slots = asyncio.Semaphore(self.queue_size)
+        async with self._async_slots:
+            self._count(1)
+            pool = self._pool
+            loop = asyncio.get_running_loop()
+            try:
+                return await loop.run_in_executor(pool, _extract_in_worker, content, encoding, selectors)
+            except BrokenProcessPool:
+                self._restart(pool)
+                return await loop.run_in_executor(None, self._inline, content, encoding, selectors)
+            finally:
+                self._count(-1)
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "queue_size": self.queue_size,
+                "in_flight": self.in_flight,
+                "submitted": self.submitted,
+                "completed": self.completed,
+                "restarts": self.restarts,
+            }
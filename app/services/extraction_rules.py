@@ -0,0 +1,109 @@
+import threading
+from collections import Counter
+from urllib.parse import urlparse
+from typing import Dict, List, Optional
+from app.config import settings
+from app.services.cache import get_cache_backend
+from app.services.extraction import MAIN_CONTENT_SELECTORS
+
+# Contêiner da matéria em cada fonte de `CREDIBLE_SOURCES`, em ordem de preferência.
+# Só seletores simples (tag, .classe, #id): o backend lxml os traduz para XPath.
+DOMAIN_RULES = {
+    "g1.globo.com": [".mc-article-body"],
+    "folha.uol.com.br": [".c-news__body"],
+    "estadao.com.br": [".n--noticia__content"],
+    "uol.com.br": [".text", ".materia-conteudo"],
+    "bbc.com": ["article"],
+    "reuters.com": ["article"],
+    "agenciabrasil.ebc.com.br": [".conteudo-noticia", "article"],
+}
+
+TIERS = ("rule", "learned", "generic", "fallback")
+
+def host_of(url: Optional[str]) -> Optional[str]:
+    if not url:
+        return None
+    host = (urlparse(url).hostname or "").lower()
+    return host[4:] if host.startswith("www.") else host or None
+
+
+class ExtractionRuleRegistry:
+    """
+    Registro de regras de extração indexado por domínio.
+
+    Para cada host, a ordem de tentativa é: o seletor aprendido (o último que funcionou
+    naquele host), as regras explícitas do domínio e, por fim, `MAIN_CONTENT_SELECTORS`.
+    Assim, a partir da segunda página de um site o extrator acerta o contêiner na primeira
+    consulta. Os contadores mostram quanto cada camada resolve e quais hosts ainda caem
+    na busca genérica por <p>.
+    """
+
+    FALLBACK_HOSTS_LIMIT = 20
+
+    def __init__(self, rules: Dict[str, List[str]] = None, maxsize: int = None, ttl: float = None):
+        rules = DOMAIN_RULES if rules is None else rules
+        # Regras para as fontes confiáveis; domínios extras do dicionário também valem
+        self.rules = {domain: list(selectors) for domain, selectors in rules.items()}
+        missing = [domain for domain in settings.CREDIBLE_SOURCES if domain not in self.rules]
+        if missing:
+            print(f"⚠️ Fontes confiáveis sem regra de extração: {', '.join(missing)}")
+        self._learned = get_cache_backend(
+            "extraction-rules",
+            maxsize if maxsize is not None else settings.EXTRACTION_RULES_LEARNED_SIZE,
+            ttl if ttl is not None else settings.EXTRACTION_RULES_LEARNED_TTL,
+        )
+        self._lock = threading.Lock()
+        self._hits = Counter({tier: 0 for tier in TIERS})
+        self._fallback_hosts = Counter()
+
+    def rule_for(self, host: Optional[str]) -> List[str]:
+        """
+        Regras do domínio mais específico que contém o host
+        (folha.uol.com.br vence uol.com.br; m.g1.globo.com usa g1.globo.com).
+        """
+        while host:
+            if host in self.rules:
+                return self.rules[host]
+            if "." not in host:
+                break
+            host = host.split(".", 1)[1]
+        return []
+
+    def selectors_for(self, host: Optional[str]) -> List[str]:
+        learned = self._learned.get(host) if host else None
+        ordered = ([learned] if learned else []) + self.rule_for(host) + MAIN_CONTENT_SELECTORS
+        return list(dict.fromkeys(ordered))
+
+    def record(self, host: Optional[str], selector: Optional[str]):
+        """
+        Registra qual seletor casou (None = busca genérica por <p>) e aprende o seletor do host.
+        """
+        learned = self._learned.get(host) if host else None
+        if selector is None:
+            tier = "fallback"
+        elif selector in self.rule_for(host):
+            tier = "rule"
+        elif selector == learned:
+            tier = "learned"
+        else:
+            tier = "generic"
+        with self._lock:
+            self._hits[tier] += 1
+            if tier == "fallback" and host:
+                self._fallback_hosts[host] += 1
+        if host and selector and selector != learned:
+            self._learned.set(host, selector)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            hits = dict(self._hits)
+            fallback_hosts = dict(self._fallback_hosts.most_common(self.FALLBACK_HOSTS_LIMIT))
+        total = sum(hits.values())
+        return {
+            **hits,
+            "total": total,
+            # Fração das páginas resolvidas direto pelo contêiner certo (regra ou aprendido)
+            "hit_rate": round((hits["rule"] + hits["learned"]) / total, 4) if total else 0.0,
+            "fallback_rate": round(hits["fallback"] / total, 4) if total else 0.0,
+            "fallback_hosts": fallback_hosts,
+        }
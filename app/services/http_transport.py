@@ -0,0 +1,383 @@
+import time
+import socket
+import asyncio
+import threading
+import httpx
+import httplib2
+from collections import OrderedDict
+from typing import Dict, Optional
+from app.config import settings
+
+# Hosts acompanhados nos contadores de pico do `/stats` (os mais recentes)
+MAX_TRACKED_HOSTS = 256
+
+
+class DnsCache:
+    """
+    Cache com TTL para `socket.getaddrinfo`, instalado uma vez por processo. Vale para todo
+    cliente que resolve nomes pela libc (httpx/httpcore, httplib2, redis); o canal gRPC do
+    Gemini usa resolvedor próprio e não passa por aqui.
+
+    Por trocar `socket.getaddrinfo` do processo inteiro, é opcional: só entra com
+    `DNS_CACHE_TTL` > 0 e sai com `uninstall()` no fechamento do `HttpTransport`.
+
+    Limitado a `maxsize` nomes (LRU); entradas vencidas saem a cada nova resolução, então um
+    fluxo de domínios diferentes (URLs enviadas pelos usuários) não cresce sem limite.
+    """
+
+    def __init__(self, ttl: float, maxsize: int = None):
+        self.ttl = ttl
+        self.maxsize = maxsize or settings.DNS_CACHE_SIZE
+        self._entries: "OrderedDict[tuple, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._original = socket.getaddrinfo
+        self.hits = 0
+        self.misses = 0
+
+    def getaddrinfo(self, *args, **kwargs):
+        key = args + tuple(sorted(kwargs.items()))
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+        result = self._original(*args, **kwargs)
+        with self._lock:
+            self._entries[key] = (now + self.ttl, result)
+            self._entries.move_to_end(key)
+            self._prune(now)
+        return result
+
+    def _prune(self, now: float):
+        for key in [key for key, (expires, _) in self._entries.items() if expires <= now]:
+            del self._entries[key]
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def install(self):
+        socket.getaddrinfo = self.getaddrinfo
+
+    def uninstall(self):
+        # Só restaura se ninguém trocou `getaddrinfo` depois de nós
+        if socket.getaddrinfo == self.getaddrinfo:
+            socket.getaddrinfo = self._original
+
+    def stats(self) -> Dict:
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+class _HostLimits:
+    """
+    Limite de requisições simultâneas por host (e contadores para `/stats`). O slot é
+    liberado quando o corpo da resposta é fechado, não quando chegam os cabeçalhos.
+
+    Só hosts com requisições em andamento (ou aguardando slot) têm semáforo; o do host sai
+    quando a última termina. Os picos ficam para os `MAX_TRACKED_HOSTS` hosts mais recentes.
+    """
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self._sync: Dict[str, threading.BoundedSemaphore] = {}
+        self._async: Dict[str, asyncio.Semaphore] = {}
+        # Requisições por host que seguram ou aguardam o semáforo
+        self._users: Dict[tuple, int] = {}
+        self._lock = threading.Lock()
+        self.in_flight: Dict[str, int] = {}
+        self.peak: "OrderedDict[str, int]" = OrderedDict()
+        self.requests = 0
+        self.waits = 0
+
+    def _join(self, semaphores: Dict, host: str, factory):
+        with self._lock:
+            semaphore = semaphores.get(host)
+            if semaphore is None:
+                semaphore = semaphores[host] = factory(self.limit)
+            user_key = (id(semaphores), host)
+            self._users[user_key] = self._users.get(user_key, 0) + 1
+            return semaphore
+
+    def _leave(self, semaphores: Dict, host: str):
+        with self._lock:
+            user_key = (id(semaphores), host)
+            self._users[user_key] -= 1
+            if not self._users[user_key]:
+                del self._users[user_key]
+                del semaphores[host]
+
+    def _enter(self, host: str, waited: bool):
+        with self._lock:
+            self.requests += 1
+            self.waits += int(waited)
+            self.in_flight[host] = self.in_flight.get(host, 0) + 1
+            self.peak[host] = max(self.peak.get(host, 0), self.in_flight[host])
+            self.peak.move_to_end(host)
+            while len(self.peak) > MAX_TRACKED_HOSTS:
+                self.peak.popitem(last=False)
+
+    def _exit(self, host: str):
+        with self._lock:
+            self.in_flight[host] -= 1
+            if not self.in_flight[host]:
+                del self.in_flight[host]
+
+    def acquire(self, host: str):
+        semaphore = self._join(self._sync, host, threading.BoundedSemaphore)
+        waited = not semaphore.acquire(blocking=False)
+        if waited:
+            semaphore.acquire()
+        self._enter(host, waited)
+
+        def release():
+            self._exit(host)
+            semaphore.release()
+            self._leave(self._sync, host)
+        return release
+
+    async def aacquire(self, host: str):
+        semaphore = self._join(self._async, host, asyncio.Semaphore)
+        waited = semaphore.locked()
+        try:
+            await semaphore.acquire()
+        except BaseException:
+            self._leave(self._async, host)
+            raise
+        self._enter(host, waited)
+
+        def release():
+            self._exit(host)
+            semaphore.release()
+            self._leave(self._async, host)
+        return release
+
+    def stats(self) -> Dict:
+        with self._lock:
+            busiest = sorted(self.peak.items(), key=lambda item: item[1], reverse=True)[:10]
+            return {
+                "per_host_limit": self.limit,
+                "requests": self.requests,
+                "waited_for_host_slot": self.waits,
+                "in_flight": sum(self.in_flight.values()),
+                "peak_by_host": dict(busiest),
+            }
+
+
+class _ReleasingStream(httpx.SyncByteStream):
+    def __init__(self, stream, release):
+        self._stream = stream
+        self._release = release
+
+    def __iter__(self):
+        yield from self._stream
+
+    def close(self):
+        try:
+            self._stream.close()
+        finally:
+            if self._release is not None:
+                self._release()
+                self._release = None
+
+
+class _AsyncReleasingStream(httpx.AsyncByteStream):
+    def __init__(self, stream, release):
+        self._stream = stream
+        self._release = release
+
+    async def __aiter__(self):
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self):
+        try:
+            await self._stream.aclose()
+        finally:
+            if self._release is not None:
+                self._release()
+                self._release = None
+
+
+class _LimitedTransport(httpx.HTTPTransport):
+    def __init__(self, host_limits: _HostLimits, **kwargs):
+        super().__init__(**kwargs)
+        self._host_limits = host_limits
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        release = self._host_limits.acquire(request.url.host)
+        try:
+            response = super().handle_request(request)
+        except BaseException:
+            release()
+            raise
+        response.stream = _ReleasingStream(response.stream, release)
+        return response
+
+
+class _AsyncLimitedTransport(httpx.AsyncHTTPTransport):
+    def __init__(self, host_limits: _HostLimits, **kwargs):
+        super().__init__(**kwargs)
+        self._host_limits = host_limits
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        release = await self._host_limits.aacquire(request.url.host)
+        try:
+            response = await super().handle_async_request(request)
+        except BaseException:
+            release()
+            raise
+        response.stream = _AsyncReleasingStream(response.stream, release)
+        return response
+
+
+class HttplibAdapter:
+    """
+    Interface de `httplib2.Http` sobre o cliente httpx compartilhado, para que o
+    `googleapiclient` (busca do Google) use o mesmo pool de conexões do resto da aplicação.
+    Timeouts e erros de conexão viram as exceções de socket que o googleapiclient já
+    sabe tratar (e repetir, quando configurado).
+    """
+
+    def __init__(self, client: httpx.Client, timeout: float = None):
+        self._client = client
+        self.timeout = timeout
+
+    def request(self, uri, method="GET", body=None, headers=None, redirections=None, connection_type=None):
+        try:
+            response = self._client.request(
+                method, uri, content=body, headers=headers,
+                timeout=self.timeout if self.timeout is not None else httpx.USE_CLIENT_DEFAULT,
+            )
+        except httpx.TimeoutException as e:
+            raise socket.timeout(str(e)) from e
+        except httpx.TransportError as e:
+            raise ConnectionError(str(e)) from e
+        info = dict(response.headers)
+        # O httpx já descomprimiu o corpo
+        info.pop("content-encoding", None)
+        info["status"] = str(response.status_code)
+        resp = httplib2.Response(info)
+        resp.reason = response.reason_phrase
+        return resp, response.content
+
+    def close(self):
+        # O cliente é compartilhado: quem fecha é o HttpTransport
+        pass
+
+
+class HttpTransport:
+    """
+    Camada de transporte HTTP única para as chamadas de saída: download de páginas,
+    webhooks de jobs e a busca do Google (via `HttplibAdapter`). Um cliente síncrono e um
+    assíncrono, ambos com keep-alive, limite global e por host de conexões, cache de DNS,
+    HTTP/2 quando o pacote `h2` está instalado e os mesmos timeouts de conexão e leitura.
+
+    O Gemini continua com o próprio canal gRPC, que já é persistente e multiplexado.
+    """
+
+    def __init__(self):
+        self.http2 = settings.HTTP2_ENABLED and self._h2_available()
+        self.timeout = httpx.Timeout(
+            settings.HTTP_TIMEOUT,
+            connect=settings.HTTP_CONNECT_TIMEOUT,
+            read=settings.HTTP_TIMEOUT,
+            pool=settings.HTTP_TIMEOUT,
+        )
+        self.limits = httpx.Limits(
+            max_connections=settings.HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE,
+            keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY,
+        )
+        self.host_limits = _HostLimits(settings.HTTP_PER_HOST_LIMIT)
+        self.dns_cache = None
+        if settings.DNS_CACHE_TTL > 0:
+            self.dns_cache = DnsCache(settings.DNS_CACHE_TTL)
+            self.dns_cache.install()
+        self._client: Optional[httpx.Client] = None
+        self._async_client: Optional[httpx.AsyncClient] = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _h2_available() -> bool:
+        try:
+            import h2  # noqa: F401
+            return True
+        except ImportError:
+            return False
+
+    def _transport_options(self) -> Dict:
+        return {"http2": self.http2, "limits": self.limits, "retries": 1}
+
+    def client(self) -> httpx.Client:
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    self._client = httpx.Client(
+                        timeout=self.timeout,
+                        transport=_LimitedTransport(self.host_limits, **self._transport_options()),
+                    )
+        return self._client
+
+    def async_client(self) -> httpx.AsyncClient:
+        if self._async_client is None:
+            self._async_client = httpx.AsyncClient(
+                timeout=self.timeout,
+                transport=_AsyncLimitedTransport(self.host_limits, **self._transport_options()),
+            )
+        return self._async_client
+
+    def httplib2_adapter(self, timeout: float = None) -> HttplibAdapter:
+        return HttplibAdapter(self.client(), timeout)
+
+    async def aclose(self):
+        if self._async_client is not None:
+            await self._async_client.aclose()
+            self._async_client = None
+        if self._client is not None:
+            self._client.close()
+            self._client = None
+        if self.dns_cache is not None:
+            self.dns_cache.uninstall()
+
+    @staticmethod
+    def _pool_stats(client) -> Optional[Dict]:
+        if client is None:
+            return None
+        # `_pool` é interno do httpx/httpcore: se a estrutura mudar, os números somem do /stats
+        pool = getattr(getattr(client, "_transport", None), "_pool", None)
+        connections = getattr(pool, "connections", None)
+        if connections is None:
+            return None
+        try:
+            idle = sum(1 for conn in connections if conn.is_idle())
+        except Exception:
+            return None
+        return {"open": len(connections), "idle": idle, "active": len(connections) - idle}
+
+    def stats(self) -> Dict:
+        stats = {
+            "http2": self.http2,
+            "max_connections": self.limits.max_connections,
+            "sync_pool": self._pool_stats(self._client),
+            "async_pool": self._pool_stats(self._async_client),
+            "hosts": self.host_limits.stats(),
+        }
+        if self.dns_cache is not None:
+            stats["dns_cache"] = self.dns_cache.stats()
+        return stats
+
+
+_transport: Optional[HttpTransport] = None
+_transport_lock = threading.Lock()
+
+def get_transport() -> HttpTransport:
+    """
+    Transporte compartilhado do processo.
+    """
+    global _transport
+    if _transport is None:
+        with _transport_lock:
+            if _transport is None:
+                _transport = HttpTransport()
+    return _transport
@@ -0,0 +1,187 @@
+import json
+import uuid
+import asyncio
+import functools
+import threading
+from typing import Dict, List, Optional
+from app.config import settings
+from app.services.database import connect, utcnow
+from app.services.http_transport import get_transport
+
+class JobStore:
+    """
+    Estado das investigações assíncronas, persistido no SQLite de `DATABASE_URL`.
+    Jobs `queued` ou `running` sobrevivem a reinícios e são retomados pela fila.
+    """
+
+    def __init__(self, path: str = None):
+        self._conn = connect(path)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.executescript("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    status TEXT NOT NULL,
+                    text TEXT,
+                    url TEXT,
+                    webhook_url TEXT,
+                    result TEXT,
+                    error TEXT,
+                    created_at TEXT NOT NULL,
+                    updated_at TEXT NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, created_at);
+            """)
+
+    @staticmethod
+    def _to_dict(row) -> Dict:
+        job = dict(row)
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
+
+    def create(self, text: str = None, url: str = None, webhook_url: str = None) -> Dict:
+        job_id = uuid.uuid4().hex
+        now = utcnow()
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO jobs (id, status, text, url, webhook_url, created_at, updated_at) VALUES (?, 'queued', ?, ?, ?, ?, ?)",
+                (job_id, text, url, webhook_url, now, now),
+            )
+        return self.get(job_id)
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._to_dict(row) if row else None
+
+    def unfinished(self) -> List[Dict]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM jobs WHERE status IN ('queued', 'running') ORDER BY created_at"
+            ).fetchall()
+        return [self._to_dict(row) for row in rows]
+
+    def update(self, job_id: str, status: str, result: Dict = None, error: str = None):
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = ?, updated_at = ? WHERE id = ?",
+                (status, json.dumps(result, ensure_ascii=False) if result is not None else None, error, utcnow(), job_id),
+            )
+
+
+class JobQueueFull(Exception):
+    pass
+
+
+class JobQueue:
+    """
+    Pool de workers que executa investigações enfileiradas via `POST /jobs`.
+    O resultado fica disponível em `GET /jobs/{id}` e, se houver `webhook_url`,
+    é enviado por POST para o endereço informado.
+
+    A fila comporta até `JOB_QUEUE_SIZE` jobs; além disso, `submit` levanta `JobQueueFull`.
+    O `JobStore` é SQLite síncrono: as operações nele rodam no executor padrão do loop.
+    """
+
+    def __init__(self, analyzer, store: JobStore = None, workers: int = None, max_size: int = None):
+        self.analyzer = analyzer
+        self.store = store
+        self.workers = workers or settings.JOB_WORKERS
+        self.max_size = max_size or settings.JOB_QUEUE_SIZE
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self.rejected = 0
+
+    async def _store(self, fn, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, functools.partial(fn, *args, **kwargs))
+
+    async def start(self):
+        if self.store is None:
+            self.store = JobStore()
+        # Retoma o que ficou pendente antes de um reinício; esses jobs sempre cabem na fila
+        recovered = await self._store(self.store.unfinished)
+        self._queue = asyncio.Queue(maxsize=max(self.max_size, len(recovered)))
+        for job in recovered:
+            self._queue.put_nowait(job["id"])
+        if recovered:
+            print(f"[OK] {len(recovered)} investigações pendentes retomadas.")
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def submit(self, text: str = None, url: str = None, webhook_url: str = None) -> Dict:
+        if self._queue.full():
+            self.rejected += 1
+            raise JobQueueFull()
+        job = await self._store(self.store.create, text=text, url=url, webhook_url=webhook_url)
+        try:
+            self._queue.put_nowait(job["id"])
+        except asyncio.QueueFull:
+            # Outro pedido ocupou a última vaga enquanto o job era gravado
+            self.rejected += 1
+            await self._store(self.store.update, job["id"], "failed", error="Fila de investigações cheia")
+            raise JobQueueFull()
+        return job
+
+    async def get(self, job_id: str) -> Optional[Dict]:
+        return await self._store(self.store.get, job_id)
+
+    def stats(self) -> Dict:
+        return {
+            "workers": len(self._tasks),
+            "queued": self._queue.qsize() if self._queue else 0,
+            "max_queued": self._queue.maxsize if self._queue else self.max_size,
+            "rejected": self.rejected,
+        }
+
+    async def _worker(self):
+        while True:
+            job_id = await self._queue.get()
+            try:
+                await self._run(job_id)
+            except Exception as e:
+                print(f"[ERROR] Erro inesperado no job {job_id}: {e}")
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job_id: str):
+        job = await self._store(self.store.get, job_id)
+        if job is None or job["status"] not in ("queued", "running"):
+            return
+        await self._store(self.store.update, job_id, "running")
+        try:
+            result = await self.analyzer.ainvestigate_and_report(text=job["text"], url=job["url"])
+            await self._store(self.store.update, job_id, "done", result=result)
+        except Exception as e:
+            await self._store(self.store.update, job_id, "failed", error=f"Erro na investigação: {str(e)}")
+
+        if job["webhook_url"]:
+            await self._notify(await self._store(self.store.get, job_id))
+
+    async def _notify(self, job: Dict):
+        try:
+            response = await get_transport().async_client().post(
+                job["webhook_url"], json=job_payload(job), timeout=settings.JOB_WEBHOOK_TIMEOUT
+            )
+            response.raise_for_status()
+        except Exception as e:
+            print(f"[ERROR] Falha ao notificar webhook do job {job['id']}: {e}")
+
+
+def job_payload(job: Dict) -> Dict:
+    """
+    Representação pública de um job (resposta de `GET /jobs/{id}` e corpo do webhook).
+    """
+    return {
+        "job_id": job["id"],
+        "status": job["status"],
+        "created_at": job["created_at"],
+        "updated_at": job["updated_at"],
+        "result": job["result"],
+        "error": job["error"],
+    }
@@ -0,0 +1,106 @@
+import time
+import asyncio
+import threading
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+from app.config import settings
+
+
+class ReportBatcher:
+    """
+    Micro-batching dos relatórios: pedidos que chegam dentro de uma janela curta
+    (`LLM_BATCH_WINDOW_MS`) são empacotados num único prompt com vários casos
+    (até `LLM_BATCH_MAX_SIZE`; o lote cheio sai na hora). As instruções vão uma vez só e
+    cada caso tem sua vaga na resposta, que é distribuída de volta a quem esperava.
+
+    `submit` devolve None quando o caso deve seguir pelo caminho individual: pedido
+    sozinho na janela, vaga ausente ou ilegível na resposta, ou falha da chamada do lote.
+
+    `generate`, `build_prompt` e `parse` são injetados (prompt -> texto, casos -> prompt,
+    texto -> {número do caso: relatório}), o que permite testar contra um LLM falso.
+    `on_batch(latência, casos, falhas)`, se dado, recebe cada lote despachado (a cascata
+    de modelos o contabiliza no nível rápido).
+    """
+
+    def __init__(self, generate: Callable[[str], Awaitable[str]], build_prompt: Callable[[List[str]], str],
+                 parse: Callable[[str], Dict[int, Dict]], window_ms: float = None, max_size: int = None,
+                 on_batch: Callable[[float, int, int], None] = None):
+        self.generate = generate
+        self.build_prompt = build_prompt
+        self.parse = parse
+        self.on_batch = on_batch
+        self.window = (settings.LLM_BATCH_WINDOW_MS if window_ms is None else window_ms) / 1000
+        self.max_size = max_size or settings.LLM_BATCH_MAX_SIZE
+        self._pending: List[Tuple[str, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks = set()
+        self._lock = threading.Lock()
+        self.batches = 0
+        self.batched_cases = 0
+        self.single = 0
+        self.missing = 0
+        self.errors = 0
+        self.total_time = 0.0
+
+    async def submit(self, case: str) -> Optional[Dict]:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((case, future))
+        if len(self._pending) >= self.max_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._flush)
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        # Pedidos cancelados enquanto esperavam a janela não entram no lote
+        batch = [(case, future) for case, future in batch if not future.done()]
+        if len(batch) == 1:
+            with self._lock:
+                self.single += 1
+            batch[0][1].set_result(None)
+        elif batch:
+            task = asyncio.ensure_future(self._dispatch(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _dispatch(self, batch: List[Tuple[str, asyncio.Future]]):
+        start = time.perf_counter()
+        reports, failed = {}, False
+        try:
+            reports = self.parse(await self.generate(self.build_prompt([case for case, _ in batch])))
+        except Exception as e:
+            failed = True
+            print(f"⚠️ Lote de {len(batch)} relatórios falhou; seguindo individualmente: {e}")
+        missing = 0
+        for number, (_, future) in enumerate(batch, 1):
+            report = reports.get(number)
+            missing += int(report is None)
+            if not future.done():
+                future.set_result(report)
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self.batches += 1
+            self.batched_cases += len(batch)
+            self.missing += 0 if failed else missing
+            self.errors += int(failed)
+            self.total_time += elapsed
+        if self.on_batch is not None:
+            self.on_batch(elapsed, len(batch), missing)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "window_ms": round(self.window * 1000, 1),
+                "max_size": self.max_size,
+                "batches": self.batches,
+                "batched_cases": self.batched_cases,
+                "avg_batch_size": round(self.batched_cases / self.batches, 2) if self.batches else 0.0,
+                "single": self.single,
+                "missing_slots": self.missing,
+                "errors": self.errors,
+                "avg_latency_ms": round(self.total_time / self.batches * 1000, 1) if self.batches else 0.0,
+            }
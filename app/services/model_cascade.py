@@ -0,0 +1,208 @@
+import time
+import threading
+from collections import Counter
+from typing import AsyncIterator, Callable, Dict, List, Optional, Tuple, Union
+from app.config import settings
+
+
+class _TierStats:
+    def __init__(self, model_name: str):
+        self.model_name = model_name
+        self.calls = 0
+        self.batched = 0
+        self.errors = 0
+        self.total_time = 0.0
+
+    def as_dict(self) -> Dict:
+        return {
+            "model": self.model_name,
+            "calls": self.calls,
+            "batched": self.batched,
+            "errors": self.errors,
+            "avg_latency_ms": round(self.total_time / self.calls * 1000, 1) if self.calls else 0.0,
+        }
+
+
+class ModelCascade:
+    """
+    Cascata de modelos para o relatório: a primeira passada usa o modelo rápido
+    (`GEMINI_MODEL_FAST`) e só escala para o forte (`GEMINI_MODEL_STRONG`) quando o veredito
+    é de baixa confiança (`MODEL_ESCALATE_VERDICTS`, por padrão INSUFICIENTE e IMPRECISO),
+    quando a resposta não pôde ser interpretada ou quando a chamada falhou. Afirmações
+    claras ficam com a latência do modelo rápido.
+
+    Cada nível tem uma instância de `GenerativeModel` criada uma vez e reaproveitada.
+    Se o nível forte também falhar, vale o último relatório válido de um nível anterior.
+    """
+
+    def __init__(self, model_factory: Callable[[str], object], parse: Callable[[str], Tuple[Dict, str]],
+                 tiers: List[Tuple[str, str]] = None, escalate_verdicts=None):
+        self.model_factory = model_factory
+        self.parse = parse
+        if tiers is None:
+            tiers = [("fast", settings.GEMINI_MODEL_FAST), ("strong", settings.GEMINI_MODEL_STRONG)]
+            if not settings.MODEL_CASCADE_ENABLED:
+                tiers = tiers[1:]
+        # Dois níveis com o mesmo modelo não fazem sentido: fica só o primeiro
+        seen, self.tiers = set(), []
+        for tier, model_name in tiers:
+            if model_name and model_name not in seen:
+                seen.add(model_name)
+                self.tiers.append((tier, model_name))
+        self.escalate_verdicts = set(escalate_verdicts or settings.MODEL_ESCALATE_VERDICTS)
+        self._models: Dict[str, object] = {}
+        self._lock = threading.Lock()
+        self._tier_stats = {tier: _TierStats(model_name) for tier, model_name in self.tiers}
+        self.runs = 0
+        self.escalations = Counter()
+
+    def model(self, tier: str):
+        with self._lock:
+            model = self._models.get(tier)
+            if model is None:
+                model = self.model_factory(dict(self.tiers)[tier])
+                self._models[tier] = model
+            return model
+
+    def _record(self, tier: str, elapsed: float, failed: bool):
+        with self._lock:
+            stats = self._tier_stats[tier]
+            stats.calls += 1
+            stats.errors += int(failed)
+            stats.total_time += elapsed
+
+    def record_batch(self, elapsed: float, size: int, failed: int):
+        """
+        Contabiliza no primeiro nível um lote do micro-batching: cada caso conta como uma
+        chamada com a latência do lote, e `failed` casos (vaga ausente ou chamada falha)
+        contam como erro, já que seguem pelo caminho individual.
+        """
+        with self._lock:
+            stats = self._tier_stats[self.tiers[0][0]]
+            stats.calls += size
+            stats.batched += size
+            stats.errors += failed
+            stats.total_time += elapsed * size
+
+    def _outcome(self, tier: str, elapsed: float, response_text: Optional[str], error: Optional[Exception]):
+        """
+        Interpreta a resposta de um nível.
+        Retorna (relatório ou None, motivo para escalar ou None, erro ou None).
+        """
+        report = None
+        if error is None:
+            try:
+                report, _ = self.parse(response_text)
+            except ValueError as e:
+                error = e
+        self._record(tier, elapsed, error is not None)
+        if error is not None:
+            print(f"⚠️ Nível '{tier}' do relatório falhou: {error}")
+            return None, "error" if response_text is None else "malformed", error
+        if report["verdict"] in self.escalate_verdicts:
+            return report, report["verdict"], None
+        return report, None, None
+
+    def _finish(self, best: Optional[Dict], tier: Optional[str], last_error: Optional[Exception]) -> Tuple[Dict, str]:
+        with self._lock:
+            self.runs += 1
+        if best is None:
+            raise last_error or ValueError("Nenhum modelo gerou um relatório válido.")
+        return best, tier
+
+    def _escalate(self, reason: str):
+        with self._lock:
+            self.escalations[reason] += 1
+
+    def generate(self, prompt: str) -> Tuple[Dict, str]:
+        """
+        Retorna (relatório, nível que o gerou).
+        """
+        best, best_tier, last_error = None, None, None
+        for position, (tier, _) in enumerate(self.tiers):
+            start = time.perf_counter()
+            response_text, error = None, None
+            try:
+                response_text = self.model(tier).generate_content(prompt).text
+            except Exception as e:
+                error = e
+            report, reason, failure = self._outcome(tier, time.perf_counter() - start, response_text, error)
+            if report is not None:
+                best, best_tier = report, tier
+            last_error = failure or last_error
+            if reason is None or position == len(self.tiers) - 1:
+                break
+            self._escalate(reason)
+        return self._finish(best, best_tier, last_error)
+
+    async def agenerate(self, prompt: Union[str, Callable[[], str]], prior: Dict = None) -> Tuple[Dict, str]:
+        """
+        `prior` é um relatório do primeiro nível já obtido por outro caminho (lote do
+        micro-batching): só escala, se for o caso, sem repetir a chamada do nível rápido.
+        `prompt` pode ser uma função que o monta: com `prior` final, ele nem é montado.
+        """
+        best, best_tier, last_error = None, None, None
+        for position, (tier, _) in enumerate(self.tiers):
+            if position == 0 and prior is not None:
+                best, best_tier = prior, tier
+                reason = prior["verdict"] if prior["verdict"] in self.escalate_verdicts else None
+                if reason is None or len(self.tiers) == 1:
+                    break
+                self._escalate(reason)
+                continue
+            if callable(prompt):
+                prompt = prompt()
+            start = time.perf_counter()
+            response_text, error = None, None
+            try:
+                response_text = (await self.model(tier).generate_content_async(prompt)).text
+            except Exception as e:
+                error = e
+            report, reason, failure = self._outcome(tier, time.perf_counter() - start, response_text, error)
+            if report is not None:
+                best, best_tier = report, tier
+            last_error = failure or last_error
+            if reason is None or position == len(self.tiers) - 1:
+                break
+            self._escalate(reason)
+        return self._finish(best, best_tier, last_error)
+
+    async def astream(self, prompt: str) -> AsyncIterator[Tuple[str, Dict]]:
+        """
+        Versão em streaming: emite `report_chunk` com os trechos de cada nível e, ao escalar,
+        `escalation` ({"from", "to", "reason"}), a partir do qual os trechos recomeçam do zero.
+        O último evento é `result`, com {"report", "tier"}.
+        """
+        best, best_tier, last_error = None, None, None
+        for position, (tier, _) in enumerate(self.tiers):
+            start = time.perf_counter()
+            chunks, error = [], None
+            try:
+                response = await self.model(tier).generate_content_async(prompt, stream=True)
+                async for chunk in response:
+                    if chunk.text:
+                        chunks.append(chunk.text)
+                        yield "report_chunk", {"text": chunk.text, "tier": tier}
+            except Exception as e:
+                error = e
+            report, reason, failure = self._outcome(tier, time.perf_counter() - start, None if error else "".join(chunks), error)
+            if report is not None:
+                best, best_tier = report, tier
+            last_error = failure or last_error
+            if reason is None or position == len(self.tiers) - 1:
+                break
+            self._escalate(reason)
+            yield "escalation", {"from": tier, "to": self.tiers[position + 1][0], "reason": reason}
+        report, tier = self._finish(best, best_tier, last_error)
+        yield "result", {"report": report, "tier": tier}
+
+    def stats(self) -> Dict:
+        with self._lock:
+            escalated = sum(self.escalations.values())
+            return {
+                "runs": self.runs,
+                "tiers": {tier: stats.as_dict() for tier, stats in self._tier_stats.items()},
+                "escalations": escalated,
+                "escalation_rate": round(escalated / self.runs, 4) if self.runs else 0.0,
+                "escalation_reasons": dict(self.escalations),
+            }
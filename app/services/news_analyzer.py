@@ -1,27 +1,126 @@
 import re
 import os
-import json
-import requests
+import asyncio
+import functools
 import google.generativeai as genai
-from googleapiclient.discovery import build
-from bs4 import BeautifulSoup
+from concurrent.futures import ThreadPoolExecutor
 from urllib.parse import urlparse
-from typing import Dict, List, Optional
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+from app.config import settings
+from app.services.search_client import get_search_client
+from app.services.cache import ReportCache, ExtractionCache, TieredCache, get_cache_backend, get_shared_flight
+from app.services.single_flight import SingleFlight
+from app.services.verdict_store import VerdictStore
+from app.services.extraction import get_extractor
+from app.services.extraction_rules import ExtractionRuleRegistry, host_of
+from app.services.extraction_pool import ExtractionPool
+from app.services.downloader import PageDownloader
+from app.services.http_transport import get_transport
+from app.services.prescreen import PreScreen
+from app.services.search_ranking import SearchPostProcessor
+from app.services.query_builder import QueryBuilder
+from app.services.search_fanout import SearchFanout
+from app.services.enrichment import SourceEnricher
+from app.services.prompt_builder import PromptBuilder
+from app.services.summarizer import ExtractiveSummarizer
+from app.services.report_parser import ReportParser, REPORT_SCHEMA, BATCH_SCHEMA
+from app.services.model_cascade import ModelCascade
+from app.services.llm_batcher import ReportBatcher
+from app.services.normalize import lead_key, normalize_text, canonicalize_url
+
+class _RestModel:
+    """
+    `GenerativeModel` com transporte REST, usado com `GEMINI_API_ENDPOINT` (ex.: um LLM falso
+    local nos testes de carga). A biblioteca não tem cliente REST assíncrono: as chamadas
+    assíncronas rodam no executor e o streaming chega num trecho só.
+    """
+
+    def __init__(self, model, executor: ThreadPoolExecutor):
+        self._model = model
+        self._executor = executor
+
+    def generate_content(self, prompt: str):
+        return self._model.generate_content(prompt)
+
+    async def generate_content_async(self, prompt: str, stream: bool = False):
+        loop = asyncio.get_running_loop()
+        response = await loop.run_in_executor(self._executor, self._model.generate_content, prompt)
+        if not stream:
+            return response
+
+        async def single_chunk():
+            yield response
+        return single_chunk()
+
 
 class NewsAnalyzer:
     """
     Serviço para investigação de notícias usando a API do Google Gemini e a API de Busca do Google.
     """
-    
+
     def __init__(self):
         self.gemini_api_key = os.getenv("GEMINI_API_KEY")
         self.google_api_key = os.getenv("GOOGLE_API_KEY")
         self.search_engine_id = os.getenv("SEARCH_ENGINE_ID")
 
+        # Executor limitado para as etapas que ainda são bloqueantes (busca e parsing de HTML),
+        # para que elas não travem o event loop do uvicorn.
+        self._executor = ThreadPoolExecutor(max_workers=settings.ANALYZER_MAX_WORKERS, thread_name_prefix="analyzer")
+        # Histórico persistente dos relatórios, também usado como camada durável do cache
+        self.verdict_store = VerdictStore() if settings.VERDICT_STORE_ENABLED else None
+        self.report_cache = ReportCache(durable=self.verdict_store)
+        self.search_cache = get_cache_backend("search", settings.SEARCH_CACHE_SIZE, settings.SEARCH_CACHE_TTL)
+        # Com o Redis, os caches fazem I/O de rede síncrono: nos caminhos assíncronos, vão para o executor
+        self._remote_cache = isinstance(self.search_cache, TieredCache)
+        # Consulta curta (entidades, números, palavras-chave) em vez da pista inteira
+        self.query_builder = QueryBuilder()
+        # Deduplicação e ranqueamento por credibilidade das fontes antes do prompt
+        self.search_postprocessor = SearchPostProcessor()
+        # Matérias longas vindas de URL são reduzidas às frases centrais antes da busca e do prompt
+        self.summarizer = ExtractiveSummarizer() if settings.SUMMARY_ENABLED else None
+        # Prompt do relatório montado dentro de um orçamento de tokens
+        self.prompt_builder = PromptBuilder()
+        # Resposta do Gemini interpretada sem descartar a chamada por defeito de formato
+        self.report_parser = ReportParser()
+        # Modelo rápido primeiro; o forte só para vereditos de baixa confiança
+        self.model_cascade = ModelCascade(self._get_ai_model, self.report_parser.parse)
+        # Opcional: relatórios simultâneos agrupados numa única chamada ao Gemini
+        self.report_batcher = None
+        self._batch_model = None
+        if settings.LLM_BATCH_ENABLED:
+            self.report_batcher = ReportBatcher(self._agenerate_batch, self.prompt_builder.build_batch, self.report_parser.parse_batch,
+                                                on_batch=self.model_cascade.record_batch)
+        # Opcional: trechos das páginas dos primeiros resultados no contexto do relatório
+        self.enricher = None
+        if settings.ENRICH_ENABLED:
+            self.enricher = SourceEnricher(self._extract_text_from_url, self._aextract_text_from_url, self._executor)
+        # Variantes da consulta buscadas em paralelo, sob um prazo único
+        self.search_fanout = None
+        if settings.SEARCH_FANOUT_ENABLED:
+            self.search_fanout = SearchFanout(self._search_web, self._asearch_web, self.search_postprocessor, self._executor)
+        self.extraction_cache = ExtractionCache()
+        self.extractor = get_extractor()
+        # Regras por domínio + seletor aprendido por host: o contêiner certo na primeira tentativa
+        self.extraction_rules = ExtractionRuleRegistry()
+        # Opcional: parsing em processos separados, para usar todos os núcleos
+        self.extraction_pool = ExtractionPool() if settings.EXTRACTION_PROCESSES > 0 else None
+        self.downloader = PageDownloader()
+        # Triagem local da pista, antes de gastar cota de busca e do Gemini
+        self.prescreen = PreScreen()
+        # Com CACHE_BACKEND=redis, só um worker por pista executa o pipeline
+        self.shared_flight = get_shared_flight()
+        # Pedidos idênticos e simultâneos dentro do processo compartilham uma única execução
+        self.single_flight = SingleFlight()
+
         if not self.gemini_api_key:
             print("⚠️ API Key do Gemini não encontrada. Funções de IA desabilitadas.")
         else:
-            genai.configure(api_key=self.gemini_api_key)
+            if settings.GEMINI_API_ENDPOINT:
+                genai.configure(api_key=self.gemini_api_key, transport="rest",
+                                client_options={"api_endpoint": settings.GEMINI_API_ENDPOINT})
+                print(f"[OK] Gemini apontado para {settings.GEMINI_API_ENDPOINT}.")
+            else:
+                genai.configure(api_key=self.gemini_api_key)
             print("[OK] API do Gemini configurada.")
 
         if not self.google_api_key or not self.search_engine_id:
@@ -29,142 +128,544 @@ class NewsAnalyzer:
         else:
             print("[OK] API de Busca do Google configurada.")
 
-    def _get_ai_model(self):
+    async def _acache(self, fn, *args):
+        """
+        Executa uma operação de cache a partir do event loop: direto em memória, no executor
+        quando o backend é o Redis (cliente síncrono, com timeout de rede).
+        """
+        if not self._remote_cache:
+            return fn(*args)
+        return await self._offload(fn, *args)
+
+    async def _areport_cache(self, fn, *args):
+        """
+        Como `_acache`, para o cache de relatórios: com o histórico (SQLite, síncrono e com
+        lock) como camada durável, leituras e gravações vão sempre para o executor.
+        """
+        if not self._remote_cache and self.verdict_store is None:
+            return fn(*args)
+        return await self._offload(fn, *args)
+
+    async def _offload(self, fn, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(fn, *args, **kwargs))
+
+    async def ahistory(self, **filters) -> Dict:
+        """
+        Página do histórico (`VerdictStore.history`), lida fora do event loop.
+        """
+        return await self._offload(self.verdict_store.history, **filters)
+
+    async def ainvestigations(self, lead_hash: str, **pagination) -> Dict:
+        """
+        Investigações de uma mesma pista (`VerdictStore.by_lead_hash`), lidas fora do event loop.
+        """
+        return await self._offload(self.verdict_store.by_lead_hash, lead_hash, **pagination)
+
+    async def aclose(self):
+        """
+        Libera os clientes HTTP e o executor. Chamado no desligamento da aplicação.
+        """
+        await get_transport().aclose()
+        if self.extraction_pool is not None:
+            self.extraction_pool.shutdown()
+        self._executor.shutdown(wait=False)
+
+    def _get_ai_model(self, model_name: str = None, response_schema: Dict = REPORT_SCHEMA):
         safety_settings = [
             {"category": "HARM_CATEGORY_HARASSMENT", "threshold": "BLOCK_MEDIUM_AND_ABOVE"},
             {"category": "HARM_CATEGORY_HATE_SPEECH", "threshold": "BLOCK_MEDIUM_AND_ABOVE"},
             {"category": "HARM_CATEGORY_SEXUALLY_EXPLICIT", "threshold": "BLOCK_MEDIUM_AND_ABOVE"},
             {"category": "HARM_CATEGORY_DANGEROUS_CONTENT", "threshold": "BLOCK_MEDIUM_AND_ABOVE"},
         ]
-        return genai.GenerativeModel('gemini-2.5-flash', safety_settings=safety_settings)
+        generation_config = None
+        if settings.REPORT_STRUCTURED_OUTPUT:
+            # JSON garantido pela API, no formato do InvestigationResult
+            generation_config = genai.GenerationConfig(
+                response_mime_type="application/json",
+                response_schema=response_schema,
+            )
+        model = genai.GenerativeModel(model_name or settings.GEMINI_MODEL_STRONG, safety_settings=safety_settings, generation_config=generation_config)
+        return _RestModel(model, self._executor) if settings.GEMINI_API_ENDPOINT else model
+
+    async def _agenerate_batch(self, prompt: str) -> str:
+        # Lotes vão para o primeiro nível da cascata; a instância é criada uma vez
+        if self._batch_model is None:
+            self._batch_model = self._get_ai_model(self.model_cascade.tiers[0][1], BATCH_SCHEMA)
+        return (await self._batch_model.generate_content_async(prompt)).text
+
+    def _build_report_prompt(self, lead_text: str, search_results: List[Dict], evidence: Dict[str, str] = None) -> str:
+        # Pista, snippets e trechos de matéria cabem em `PROMPT_TOKEN_BUDGET`
+        return self.prompt_builder.build(lead_text, search_results, evidence)
 
-    def _get_investigative_report(self, lead_text: str, search_results: List[Dict]) -> Dict:
+    @staticmethod
+    def _with_sources(report: Dict, search_results: List[Dict]) -> Dict:
+        # Garante que as fontes usadas no relatório sejam as mesmas da busca
+        report['sources'] = search_results
+        return report
+
+    def _get_investigative_report(self, lead_text: str, search_results: List[Dict], evidence: Dict[str, str] = None) -> Dict:
         """
         Gera um relatório investigativo com base em uma pista inicial e resultados de pesquisa.
         """
         if not self.gemini_api_key:
             return {"error": "A API Key do Gemini não foi configurada."}
 
-        model = self._get_ai_model()
-        
-        # Converte os resultados da busca para uma string formatada
-        research_context = "\n".join([
-            f"- Título: {item['title']}\n  Link: {item['link']}\n  Resumo: {item['snippet']}" 
-            for item in search_results
-        ])
-
-        prompt = f"""
-        Você é um jornalista investigativo sênior. Sua tarefa é apurar uma informação inicial (uma "pista") e entregar um relatório conciso e factual.
-
-        --- PISTA INICIAL ---
-        "{lead_text}"
-        --- FIM DA PISTA ---
-
-        --- APURAÇÃO (Resultados de busca na web) ---
-        {research_context}
-        --- FIM DA APURAÇÃO ---
-
-        **Instruções:**
-        1.  **Sintetize a Apuração:** Com base nos resultados da busca, escreva um resumo coeso e neutro sobre o evento.
-        2.  **Extraia Pontos-Chave:** Identifique de 3 a 5 fatos essenciais e verificáveis sobre o evento (ex: datas, locais, nomes, números).
-        3.  **Dê um Veredito:** Compare a "Pista Inicial" com a "Apuração". A pista parece ser verdadeira, falsa ou parcialmente correta? Seja direto. O veredito deve ser uma das seguintes strings: "CONFIRMADO", "IMPRECISO", "FALSO", "INSUFICIENTE".
-        4.  **Justifique o Veredito:** Escreva uma frase curta explicando o porquê do seu veredito.
-        5.  **Garanta a validade do JSON:** Certifique-se de que todas as strings dentro do JSON estejam corretamente escapadas (especialmente aspas duplas internas) e que a estrutura JSON seja estritamente válida.
-        6.  **Liste as Fontes:** Retorne as fontes que você usou na apuração.
-
-        Retorne sua análise ESTRITAMENTE no seguinte formato JSON:
-        {{
-            "event_summary": "<Seu resumo detalhado do evento aqui>",
-            "key_points": [
-                "<Primeiro ponto-chave>",
-                "<Segundo ponto-chave>",
-                "<Terceiro ponto-chave>"
-            ],
-            "is_event_real": <true se o veredito for 'CONFIRMADO' ou 'IMPRECISO', false caso contrário>,
-            "verdict": "<Seu veredito: 'CONFIRMADO', 'IMPRECISO', 'FALSO' ou 'INSUFICIENTE'>",
-            "sources": [
-                {{
-                    "title": "<Título da fonte 1>",
-                    "link": "<Link da fonte 1>",
-                    "snippet": "<Snippet da fonte 1>"
-                }}
-            ]
-        }}
+        prompt = self._build_report_prompt(lead_text, search_results, evidence)
+
+        try:
+            report, _ = self.model_cascade.generate(prompt)
+            return self._with_sources(report, search_results)
+        except Exception as e:
+            print(f"[ERROR] Erro na geração do relatório com IA: {e}")
+            return {"error": f"A IA não conseguiu gerar o relatório. Detalhe: {str(e)}"}
+
+    async def _aget_investigative_report(self, lead_text: str, search_results: List[Dict], evidence: Dict[str, str] = None) -> Dict:
+        """
+        Versão assíncrona de `_get_investigative_report`, usando a chamada nativa assíncrona do Gemini.
         """
+        if not self.gemini_api_key:
+            return {"error": "A API Key do Gemini não foi configurada."}
 
         try:
-            response = model.generate_content(prompt)
-            cleaned_response = response.text.strip().replace('```json', '').replace('```', '')
-            report = json.loads(cleaned_response)
-            
-            # Garante que as fontes usadas no relatório sejam as mesmas da busca
-            report['sources'] = search_results
-            return report
+            # No lote, o relatório vem do nível rápido; a cascata só decide se precisa escalar
+            prior = None
+            if self.report_batcher is not None:
+                prior = await self.report_batcher.submit(self.prompt_builder.build_case(lead_text, search_results, evidence))
+            # O prompt individual só é montado se a cascata precisar chamar um modelo
+            prompt = functools.partial(self._build_report_prompt, lead_text, search_results, evidence)
+            report, _ = await self.model_cascade.agenerate(prompt, prior=prior)
+            return self._with_sources(report, search_results)
         except Exception as e:
             print(f"[ERROR] Erro na geração do relatório com IA: {e}")
             return {"error": f"A IA não conseguiu gerar o relatório. Detalhe: {str(e)}"}
 
+    async def _astream_report(self, lead_text: str, search_results: List[Dict], evidence: Dict[str, str] = None) -> AsyncIterator[Tuple[str, Dict]]:
+        """
+        Gera o relatório com a API de streaming do Gemini, emitindo `report_chunk` a cada trecho
+        recebido e `escalation` quando a cascata passa ao modelo forte (os trechos recomeçam).
+        O último evento é sempre `report`, com o relatório ou com {"error": ...}.
+        """
+        if not self.gemini_api_key:
+            yield "report", {"error": "A API Key do Gemini não foi configurada."}
+            return
+
+        prompt = self._build_report_prompt(lead_text, search_results, evidence)
+
+        report = None
+        try:
+            async for event, data in self.model_cascade.astream(prompt):
+                if event == "result":
+                    report = self._with_sources(data["report"], search_results)
+                else:
+                    yield event, data
+        except Exception as e:
+            print(f"[ERROR] Erro na geração do relatório com IA: {e}")
+            report = {"error": f"A IA não conseguiu gerar o relatório. Detalhe: {str(e)}"}
+        yield "report", report
+
     def _search_web(self, query: str) -> List[Dict]:
         if not self.google_api_key or not self.search_engine_id:
             return [{"error": "A API de Busca não foi configurada."}]
+        cached = self.search_cache.get(normalize_text(query))
+        if cached is not None:
+            return list(cached)
+        return self._fetch_search(query)
+
+    async def _asearch_web(self, query: str) -> List[Dict]:
+        if not self.google_api_key or not self.search_engine_id:
+            return [{"error": "A API de Busca não foi configurada."}]
+        # Acerto no cache em memória não precisa passar pelo executor
+        cached = await self._acache(self.search_cache.get, normalize_text(query))
+        if cached is not None:
+            return list(cached)
+        # O cliente do Custom Search é síncrono: roda no executor limitado
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self._fetch_search, query)
+
+    def _fetch_search(self, query: str) -> List[Dict]:
         try:
-            service = build("customsearch", "v1", developerKey=self.google_api_key)
-            result = service.cse().list(q=query, cx=self.search_engine_id, num=5).execute() # Aumentado para 5 resultados
-            return [{ "title": item['title'], "link": item['link'], "snippet": item.get('snippet', '') } for item in result.get('items', [])]
+            results = get_search_client(self.google_api_key, self.search_engine_id).search(query)
+            results = self.search_postprocessor.process(results)
         except Exception as e:
             print(f"[ERROR] Erro na busca web: {e}")
             return [{"error": f"Falha ao buscar na web. Detalhe: {str(e)}"}]
+        self.search_cache.set(normalize_text(query), results)
+        return list(results)
+
+    def _search_queries(self, lead_text: str, title: str = None) -> List[str]:
+        built = self.query_builder.build(lead_text, title)
+        if self.search_fanout is None:
+            return [built["query"]]
+        return self.search_fanout.queries_for(built)
+
+    def _search_lead(self, queries: List[str]) -> List[Dict]:
+        if self.search_fanout is None:
+            return self._search_web(queries[0])
+        return self.search_fanout.run(queries)
+
+    async def _asearch_lead(self, queries: List[str]) -> List[Dict]:
+        if self.search_fanout is None:
+            return await self._asearch_web(queries[0])
+        return await self.search_fanout.arun(queries)
+
+    def _parse_html(self, content: bytes, encoding: Optional[str] = None, url: str = None) -> Dict:
+        host = host_of(url)
+        selectors = self.extraction_rules.selectors_for(host)
+        if self.extraction_pool is not None:
+            extracted = self.extraction_pool.extract(content, encoding, selectors)
+        else:
+            extracted = self.extractor.extract(content, encoding, selectors)
+        self.extraction_rules.record(host, extracted.get("selector"))
+        return extracted
+
+    async def _aparse_html(self, content: bytes, encoding: Optional[str] = None, url: str = None) -> Dict:
+        # O parsing é CPU-bound: sai do event loop (para o pool de processos, se houver)
+        host = host_of(url)
+        selectors = await self._acache(self.extraction_rules.selectors_for, host)
+        if self.extraction_pool is not None:
+            extracted = await self.extraction_pool.aextract(content, encoding, selectors)
+        else:
+            loop = asyncio.get_running_loop()
+            extracted = await loop.run_in_executor(self._executor, self.extractor.extract, content, encoding, selectors)
+        await self._acache(self.extraction_rules.record, host, extracted.get("selector"))
+        return extracted
 
     def _extract_text_from_url(self, url: str) -> Dict:
         if not url:
             return {"error": "URL vazia"}
+        cache_key = canonicalize_url(url)
         try:
-            response = requests.get(url, timeout=10, headers={'User-Agent': 'Mozilla/5.0'})
-            response.raise_for_status()
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            title = soup.find('title')
-            page_title = title.text.strip() if title else "Título não encontrado"
-            
-            main_content_selectors = [
-                'article', '.article-body', '.post-content', '.entry-content', '.td-post-content', 
-                '.materia-conteudo', '.article__content', '.news_post_body', '.post__text', 
-                '#content', '.c-news__body', '.n--noticia__content', '.mc-article-body'
-            ]
-            content_container = next((soup.select_one(s) for s in main_content_selectors if soup.select_one(s)), None)
-            
-            if content_container:
-                paragraphs = content_container.find_all('p', recursive=False)
-                content = ' '.join([p.text.strip() for p in paragraphs])
-            else:
-                paragraphs = soup.find_all('p')
-                content = ' '.join([p.text.strip() for p in paragraphs])
-                
-            return {"extracted_content": f"{page_title}. {content}", "title": page_title}
+            page = self.downloader.fetch(url, headers=self.extraction_cache.conditional_headers(cache_key))
+            if page["status"] == 304:
+                cached = self.extraction_cache.get_not_modified(cache_key)
+                if cached is not None:
+                    return dict(cached)
+                page = self.downloader.fetch(url)
+
+            body_hash = ExtractionCache.body_hash(page["content"])
+            extracted = self.extraction_cache.get_page(body_hash)
+            if extracted is None:
+                extracted = self._parse_html(page["content"], page["encoding"], url)
+            self.extraction_cache.store(cache_key, page["headers"], body_hash, extracted)
+            return dict(extracted)
+        except Exception as e:
+            return {"error": f"Erro ao processar a URL: {str(e)}"}
+
+    async def _aextract_text_from_url(self, url: str) -> Dict:
+        if not url:
+            return {"error": "URL vazia"}
+        cache_key = canonicalize_url(url)
+        try:
+            headers = await self._acache(self.extraction_cache.conditional_headers, cache_key)
+            page = await self.downloader.afetch(url, headers=headers)
+            if page["status"] == 304:
+                cached = await self._acache(self.extraction_cache.get_not_modified, cache_key)
+                if cached is not None:
+                    return dict(cached)
+                page = await self.downloader.afetch(url)
+
+            body_hash = ExtractionCache.body_hash(page["content"])
+            extracted = await self._acache(self.extraction_cache.get_page, body_hash)
+            if extracted is None:
+                extracted = await self._aparse_html(page["content"], page["encoding"], url)
+            await self._acache(self.extraction_cache.store, cache_key, page["headers"], body_hash, extracted)
+            return dict(extracted)
         except Exception as e:
             return {"error": f"Erro ao processar a URL: {str(e)}"}
 
+    @staticmethod
+    def _error_result(message: str, verdict: str = "ERRO") -> Dict:
+        # Retorna um erro no formato esperado pelo InvestigationResult
+        return {"event_summary": message, "key_points": [], "is_event_real": False, "verdict": verdict, "sources": []}
+
+    def stats(self) -> Dict:
+        """
+        Contadores internos expostos em `/stats`.
+        """
+        stats = {
+            "report_cache": self.report_cache.stats(),
+            "search_cache": self.search_cache.stats(),
+            "search_postprocessing": self.search_postprocessor.stats(),
+            "query_builder": self.query_builder.stats(),
+            "prompt": self.prompt_builder.stats(),
+            "report_parser": self.report_parser.stats(),
+            "model_cascade": self.model_cascade.stats(),
+            "extraction_cache": self.extraction_cache.stats(),
+            "extraction_rules": self.extraction_rules.stats(),
+            "single_flight": self.single_flight.stats(),
+            "downloader": self.downloader.stats(),
+            "prescreen": self.prescreen.stats(),
+            "http_transport": get_transport().stats(),
+        }
+        if self.shared_flight is not None:
+            stats["shared_flight"] = self.shared_flight.stats()
+        if self.extraction_pool is not None:
+            stats["extraction_pool"] = self.extraction_pool.stats()
+        if self.search_fanout is not None:
+            stats["search_fanout"] = self.search_fanout.stats()
+        if self.enricher is not None:
+            stats["enrichment"] = self.enricher.stats()
+        if self.summarizer is not None:
+            stats["summarizer"] = self.summarizer.stats()
+        if self.report_batcher is not None:
+            stats["llm_batcher"] = self.report_batcher.stats()
+        return stats
+
+    def _summarize(self, content: str, title: str = None) -> str:
+        """
+        Texto da matéria usado como pista: as frases centrais quando o resumo está ativo.
+        """
+        if self.summarizer is None or not content:
+            return content
+        return self.summarizer.summarize(content, title)
+
+    async def _asummarize(self, content: str, title: str = None) -> str:
+        # O TextRank é CPU-bound (NumPy): roda no executor, fora do event loop
+        if self.summarizer is None or not content:
+            return content
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self.summarizer.summarize, content, title)
+
+    def _screen(self, lead_text: str, url: str = None) -> Tuple[Dict, Optional[Dict]]:
+        """
+        Triagem local da pista. Retorna (triagem, relatório); o relatório só vem preenchido
+        quando a pista é barrada (`PRESCREEN_SHORT_CIRCUIT` e score abaixo do limiar).
+        """
+        prescreen = self.prescreen.score(lead_text, url)
+        self.prescreen.record(prescreen)
+        if settings.PRESCREEN_SHORT_CIRCUIT and prescreen["is_likely_fake"]:
+            return prescreen, self._with_prescreen(self.prescreen.short_circuit_report(prescreen), prescreen)
+        return prescreen, None
+
+    @staticmethod
+    def _with_prescreen(report: Dict, prescreen: Dict) -> Dict:
+        report["credibility_score"] = prescreen["credibility_score"]
+        report["prescreen"] = prescreen
+        return report
+
+    def _screen_text(self, text: str = None, url: str = None) -> Optional[Tuple[Dict, Optional[Dict]]]:
+        """
+        Triagem de uma pista de texto, refeita a cada pedido, antes do cache: `lead_key` ignora
+        caixa e pontuação, que pesam na triagem, então pistas com a mesma chave podem ter
+        triagens diferentes. Pistas só com URL são triadas no pipeline, após a extração.
+        """
+        return self._screen(text, url) if text else None
+
+    def _rescreened(self, report: Dict, screened: Optional[Tuple[Dict, Optional[Dict]]]) -> Dict:
+        """
+        Relatório do cache (ou de outro pedido coalescido) com a triagem deste pedido.
+        """
+        if screened is None or "prescreen" not in report:
+            return report
+        return self._with_prescreen(dict(report), screened[0])
+
+    def _remember(self, key: str, report: Dict, text: str = None, url: str = None):
+        # O relatório da triagem depende da grafia exata da pista: não vai para o cache
+        if report.get("verdict") == PreScreen.VERDICT:
+            return
+        self.report_cache.set(key, report)
+        if self.verdict_store is not None and not str(report.get("verdict", "")).upper().startswith("ERRO"):
+            try:
+                self.verdict_store.save(key, report, text=text, url=url)
+            except Exception as e:
+                print(f"[ERROR] Falha ao salvar o relatório no histórico: {e}")
+
+    def _cached_report(self, cached: Optional[Dict]) -> Optional[Dict]:
+        # Relatórios da triagem gravados antes de deixarem de ir para o cache são ignorados
+        if cached is None or cached.get("verdict") == PreScreen.VERDICT:
+            return None
+        return cached
+
     def investigate_and_report(self, text: str = None, url: str = None) -> Dict:
-        lead_text = text
+        screened = self._screen_text(text, url)
+        if screened is not None and screened[1] is not None:
+            return screened[1]
+        key = lead_key(text, url)
+        cached = self._cached_report(self.report_cache.get(key))
+        if cached is not None:
+            return self._rescreened(cached, screened)
+
+        def compute():
+            report = self._investigate(text, url, screened)
+            self._remember(key, report, text, url)
+            return report
+
+        if self.shared_flight is not None:
+            return self._rescreened(self.shared_flight.run(key, compute), screened)
+        return compute()
+
+    async def ainvestigate_and_report(self, text: str = None, url: str = None) -> Dict:
+        """
+        Versão assíncrona de `investigate_and_report`: download, busca e geração do relatório
+        não bloqueiam o event loop, então investigações concorrentes se sobrepõem.
+        """
+        screened = self._screen_text(text, url)
+        if screened is not None and screened[1] is not None:
+            return screened[1]
+        key = lead_key(text, url)
+        cached = self._cached_report(await self._areport_cache(self.report_cache.get, key))
+        if cached is not None:
+            return self._rescreened(cached, screened)
+
+        async def compute():
+            report = await self._ainvestigate(text, url, screened)
+            await self._areport_cache(self._remember, key, report, text, url)
+            return report
+
+        async def run():
+            if self.shared_flight is not None:
+                return await self.shared_flight.arun(key, compute)
+            return await compute()
+
+        # O resultado pode vir de outro pedido com a mesma chave: leva a triagem deste
+        return self._rescreened(dict(await self.single_flight.do(key, run)), screened)
+
+    async def ainvestigate_batch(self, items: List[Dict], concurrency: int = None, item_timeout: float = None) -> List[Dict]:
+        """
+        Investiga uma lista de pistas ({text, url}) com no máximo `concurrency` em paralelo e
+        um prazo por item. Cache e coalescência continuam valendo para cada item. Retorna, na
+        ordem de entrada, {"index", "result"} ou {"index", "error"}.
+
+        Pistas que a triagem local marca como provável desinformação entram por último na
+        fila, para não atrasar as que de fato precisam de busca e do Gemini.
+        """
+        concurrency = max(1, min(concurrency or settings.BATCH_CONCURRENCY, settings.BATCH_MAX_CONCURRENCY))
+        item_timeout = item_timeout or settings.BATCH_ITEM_TIMEOUT
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def run(index: int, item: Dict) -> Dict:
+            if not item.get("text") and not item.get("url"):
+                return {"index": index, "error": "Texto ou URL da notícia é obrigatório"}
+            async with semaphore:
+                try:
+                    result = await asyncio.wait_for(
+                        self.ainvestigate_and_report(text=item.get("text"), url=item.get("url")),
+                        timeout=item_timeout,
+                    )
+                    return {"index": index, "result": result}
+                except asyncio.TimeoutError:
+                    return {"index": index, "error": f"Tempo limite de {item_timeout:g}s excedido"}
+                except Exception as e:
+                    return {"index": index, "error": f"Erro na investigação: {str(e)}"}
+
+        def priority(index: int):
+            item = items[index]
+            return self.prescreen.score(item.get("text"), item.get("url"))["is_likely_fake"], index
+
+        order = sorted(range(len(items)), key=priority)
+        outcomes = await asyncio.gather(*(run(i, items[i]) for i in order))
+        return sorted(outcomes, key=lambda outcome: outcome["index"])
+
+    def _investigate(self, text: str = None, url: str = None, screened: Tuple[Dict, Optional[Dict]] = None) -> Dict:
+        lead_text, title = text, None
         if url and not text:
             url_analysis = self._extract_text_from_url(url)
             if "error" in url_analysis:
-                # Retorna um erro no formato esperado pelo InvestigationResult
-                return {"event_summary": url_analysis["error"], "key_points": [], "is_event_real": False, "verdict": "ERRO", "sources": []}
-            lead_text = url_analysis.get("extracted_content", "")
+                return self._error_result(url_analysis["error"])
+            title = url_analysis.get("title")
+            lead_text = self._summarize(url_analysis.get("extracted_content", ""), title)
 
         if not lead_text:
-            return {"event_summary": "Nenhuma pista inicial fornecida.", "key_points": [], "is_event_real": False, "verdict": "ERRO", "sources": []}
+            return self._error_result("Nenhuma pista inicial fornecida.")
 
-        # Usa a pista inicial para buscar na web
-        search_results = self._search_web(lead_text)
+        prescreen, short_circuit = screened or self._screen(lead_text, url)
+        if short_circuit is not None:
+            return short_circuit
+
+        # Busca na web com consultas curtas extraídas da pista
+        search_results = self._search_lead(self._search_queries(lead_text, title))
         if not search_results or "error" in search_results[0]:
             error_message = search_results[0]['error'] if search_results else "Falha na busca web."
-            return {"event_summary": error_message, "key_points": [], "is_event_real": False, "verdict": "ERRO DE BUSCA", "sources": []}
+            return self._error_result(error_message, "ERRO DE BUSCA")
+
+        evidence = self.enricher.enrich(search_results) if self.enricher is not None else None
 
         # Gera o relatório com base na pista e na apuração
-        report = self._get_investigative_report(lead_text, search_results)
+        report = self._get_investigative_report(lead_text, search_results, evidence)
+        if "error" in report:
+            return self._error_result(report["error"], "ERRO DE IA")
+
+        return self._with_prescreen(report, prescreen)
+
+    async def astream_investigation(self, text: str = None, url: str = None) -> AsyncIterator[Tuple[str, Dict]]:
+        """
+        Executa a investigação emitindo um evento a cada etapa concluída:
+        `extraction` (título e conteúdo da URL), `prescreen` (triagem local),
+        `sources` (resultados da busca), `enrichment` (páginas das fontes lidas, se ativado),
+        `report_chunk` (trechos do relatório conforme o Gemini gera) e, por fim,
+        `report` ou `error` (ambos no formato do InvestigationResult).
+
+        Cada stream executa seu próprio pipeline (não passa pela coalescência), mas o
+        relatório final alimenta o cache e um acerto no cache é emitido na hora.
+        """
+        screened = self._screen_text(text, url)
+        if screened is not None and screened[1] is not None:
+            yield "prescreen", screened[0]
+            yield "report", screened[1]
+            return
+        key = lead_key(text, url)
+        cached = self._cached_report(await self._areport_cache(self.report_cache.get, key))
+        if cached is not None:
+            yield "sources", {"sources": cached.get("sources", [])}
+            yield "report", self._rescreened(cached, screened)
+            return
+
+        async for event, data in self._apipeline(text, url, stream=True, screened=screened):
+            if event == "report":
+                await self._areport_cache(self._remember, key, data, text, url)
+            yield event, data
+
+    async def _ainvestigate(self, text: str = None, url: str = None, screened: Tuple[Dict, Optional[Dict]] = None) -> Dict:
+        async for event, data in self._apipeline(text, url, screened=screened):
+            if event in ("report", "error"):
+                return data
+
+    async def _apipeline(self, text: str = None, url: str = None, stream: bool = False,
+                         screened: Tuple[Dict, Optional[Dict]] = None) -> AsyncIterator[Tuple[str, Dict]]:
+        lead_text, title = text, None
+        if url and not text:
+            url_analysis = await self._aextract_text_from_url(url)
+            if "error" in url_analysis:
+                yield "error", self._error_result(url_analysis["error"])
+                return
+            content, title = url_analysis.get("extracted_content", ""), url_analysis.get("title")
+            lead_text = await self._asummarize(content, title)
+            yield "extraction", {"title": title, "content": content, "summary": lead_text}
+
+        if not lead_text:
+            yield "error", self._error_result("Nenhuma pista inicial fornecida.")
+            return
+
+        prescreen, short_circuit = screened or self._screen(lead_text, url)
+        yield "prescreen", prescreen
+        if short_circuit is not None:
+            yield "report", short_circuit
+            return
+
+        queries = self._search_queries(lead_text, title)
+        search_results = await self._asearch_lead(queries)
+        if not search_results or "error" in search_results[0]:
+            error_message = search_results[0]['error'] if search_results else "Falha na busca web."
+            yield "error", self._error_result(error_message, "ERRO DE BUSCA")
+            return
+        yield "sources", {"sources": search_results, "queries": queries}
+
+        evidence = None
+        if self.enricher is not None:
+            evidence = await self.enricher.aenrich(search_results)
+            yield "enrichment", {"pages": list(evidence)}
+
+        if stream:
+            async for event, data in self._astream_report(lead_text, search_results, evidence):
+                if event == "report":
+                    report = data
+                else:
+                    yield event, data
+        else:
+            report = await self._aget_investigative_report(lead_text, search_results, evidence)
         if "error" in report:
-            return {"event_summary": report["error"], "key_points": [], "is_event_real": False, "verdict": "ERRO DE IA", "sources": []}
+            yield "error", self._error_result(report["error"], "ERRO DE IA")
+            return
 
-        return report
\ No newline at end of file
+        yield "report", self._with_prescreen(report, prescreen)
@@ -0,0 +1,55 @@
+import re
+import hashlib
+import unicodedata
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+from typing import Optional
+
+# Parâmetros de rastreamento que não mudam o conteúdo da página
+TRACKING_PARAMS = {"fbclid", "gclid", "igshid", "mc_cid", "mc_eid", "ref", "ref_src", "cmpid", "origin"}
+
+_PUNCTUATION_RE = re.compile(r"[^\w\s]|_")
+_WHITESPACE_RE = re.compile(r"\s+")
+
+def strip_accents(text: str) -> str:
+    decomposed = unicodedata.normalize("NFKD", text)
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+
+def normalize_text(text: str) -> str:
+    """
+    Normaliza um texto para comparação: sem acentos, caixa unificada e
+    pontuação/espaços colapsados. "URGENTE!!  Avião  cai" -> "urgente aviao cai".
+    """
+    text = strip_accents(text or "").casefold()
+    text = _PUNCTUATION_RE.sub(" ", text)
+    return _WHITESPACE_RE.sub(" ", text).strip()
+
+def canonicalize_url(url: str) -> str:
+    """
+    Forma canônica de uma URL: esquema https, host minúsculo sem "www." e sem porta padrão,
+    sem fragmento, sem parâmetros de rastreamento, query ordenada e sem barra final.
+    """
+    parts = urlsplit((url or "").strip())
+    host = (parts.hostname or "").lower()
+    if host.startswith("www."):
+        host = host[4:]
+    port = parts.port
+    if port and port not in (80, 443):
+        host = f"{host}:{port}"
+
+    query = sorted(
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if not k.lower().startswith("utm_") and k.lower() not in TRACKING_PARAMS
+    )
+    path = parts.path.rstrip("/") or "/"
+    return urlunsplit(("https", host, path, urlencode(query), ""))
+
+def lead_key(text: Optional[str] = None, url: Optional[str] = None) -> str:
+    """
+    Chave estável de uma pista. Segue a mesma regra do pipeline: o texto tem prioridade
+    e a URL só é usada quando não há texto.
+    """
+    if text:
+        material = "text:" + normalize_text(text)
+    else:
+        material = "url:" + canonicalize_url(url or "")
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
@@ -0,0 +1,165 @@
+import re
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Tuple
+from app.config import settings
+from app.services.normalize import normalize_text
+from app.services.extraction_rules import host_of
+
+class AhoCorasick:
+    """
+    Autômato de Aho-Corasick: encontra todas as ocorrências de um conjunto de padrões em
+    uma única passada pelo texto, independentemente de quantos padrões existam.
+    Os padrões e o texto são comparados já normalizados (sem acentos, caixa ou pontuação),
+    e só contam ocorrências de palavras inteiras.
+    """
+
+    def __init__(self, patterns: Iterable[str]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[Tuple[str, int]]] = [[]]
+        for pattern in patterns:
+            normalized = normalize_text(pattern)
+            if normalized:
+                self._add(normalized, pattern)
+        self._build()
+
+    def _add(self, normalized: str, pattern: str):
+        state = 0
+        for ch in normalized:
+            next_state = self._goto[state].get(ch)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][ch] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+            state = next_state
+        self._output[state].append((pattern, len(normalized)))
+
+    def _build(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[next_state] = self._goto[fail].get(ch, 0)
+                self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+
+    def find(self, text: str) -> List[str]:
+        """
+        Padrões (na forma original) presentes no texto, sem repetição.
+        """
+        normalized = normalize_text(text)
+        found = {}
+        state = 0
+        for end, ch in enumerate(normalized):
+            while state and ch not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(ch, 0)
+            for pattern, length in self._output[state]:
+                start = end - length + 1
+                before_ok = start == 0 or normalized[start - 1] == " "
+                after_ok = end + 1 == len(normalized) or normalized[end + 1] == " "
+                if before_ok and after_ok:
+                    found.setdefault(pattern, None)
+        return list(found)
+
+
+def _matches_domain(host: Optional[str], domains: Iterable[str]) -> bool:
+    return bool(host) and any(host == domain or host.endswith("." + domain) for domain in domains)
+
+_EXCLAMATION_RUN_RE = re.compile(r"[!?]{2,}")
+
+
+class PreScreen:
+    """
+    Triagem local da pista, executada antes de qualquer chamada de rede: indicadores de
+    sensacionalismo (`FAKE_NEWS_INDICATORS`), pontuação exagerada, excesso de maiúsculas
+    e o domínio da URL (`CREDIBLE_SOURCES`, `FACT_CHECK_SOURCES`).
+
+    O resultado é um `credibility_score` entre 0 e 1 (0,5 = neutro). Com
+    `PRESCREEN_SHORT_CIRCUIT`, pistas com score até `PRESCREEN_FAKE_THRESHOLD` são
+    respondidas sem gastar cota de busca e do Gemini; no lote, elas vão para o fim da fila.
+    """
+
+    # Veredito do relatório de uma pista barrada na triagem
+    VERDICT = "SUSPEITO"
+    NEUTRAL = 0.5
+    INDICATOR_PENALTY = 0.15
+    MAX_INDICATOR_PENALTY = 0.45
+    PUNCTUATION_PENALTY = 0.1
+    CAPS_PENALTY = 0.1
+    CAPS_RATIO = 0.6
+    CAPS_MIN_LETTERS = 20
+    CREDIBLE_BONUS = 0.3
+    FACT_CHECK_BONUS = 0.4
+
+    def __init__(self, indicators: List[str] = None, credible_sources: List[str] = None,
+                 fact_check_sources: List[str] = None, threshold: float = None):
+        self.matcher = AhoCorasick(indicators if indicators is not None else settings.FAKE_NEWS_INDICATORS)
+        self.credible_sources = [d.lower() for d in (credible_sources if credible_sources is not None else settings.CREDIBLE_SOURCES)]
+        # FACT_CHECK_SOURCES guarda URLs completas; aqui só interessa o domínio
+        fact_check = fact_check_sources if fact_check_sources is not None else settings.FACT_CHECK_SOURCES
+        self.fact_check_sources = [host_of(source) or source for source in fact_check]
+        self.threshold = settings.PRESCREEN_FAKE_THRESHOLD if threshold is None else threshold
+        self.screened = 0
+        self.flagged = 0
+
+    def score(self, text: str = None, url: str = None) -> Dict:
+        text = text or ""
+        indicators = self.matcher.find(text) if text else []
+        exclamation_runs = len(_EXCLAMATION_RUN_RE.findall(text))
+        letters = [ch for ch in text if ch.isalpha()]
+        caps_ratio = sum(ch.isupper() for ch in letters) / len(letters) if len(letters) >= self.CAPS_MIN_LETTERS else 0.0
+        host = host_of(url)
+        is_credible = _matches_domain(host, self.credible_sources)
+        is_fact_check = _matches_domain(host, self.fact_check_sources)
+
+        score = self.NEUTRAL
+        score -= min(self.INDICATOR_PENALTY * len(indicators), self.MAX_INDICATOR_PENALTY)
+        if exclamation_runs:
+            score -= self.PUNCTUATION_PENALTY
+        if caps_ratio > self.CAPS_RATIO:
+            score -= self.CAPS_PENALTY
+        if is_fact_check:
+            score += self.FACT_CHECK_BONUS
+        elif is_credible:
+            score += self.CREDIBLE_BONUS
+        score = round(min(max(score, 0.0), 1.0), 2)
+
+        return {
+            "credibility_score": score,
+            "is_likely_fake": score <= self.threshold,
+            "suspicious_patterns_found": indicators,
+            "exclamation_runs": exclamation_runs,
+            "caps_ratio": round(caps_ratio, 2),
+            "domain": host,
+            "is_credible_source": is_credible,
+            "is_fact_check_source": is_fact_check,
+        }
+
+    def record(self, prescreen: Dict):
+        self.screened += 1
+        self.flagged += int(prescreen["is_likely_fake"])
+
+    def short_circuit_report(self, prescreen: Dict) -> Dict:
+        """
+        Relatório no formato do InvestigationResult para uma pista barrada na triagem.
+        """
+        patterns = ", ".join(prescreen["suspicious_patterns_found"]) or "nenhum"
+        return {
+            "event_summary": "A pista apresenta fortes marcas de desinformação e não foi investigada na web.",
+            "key_points": [
+                f"Padrões sensacionalistas encontrados: {patterns}.",
+                f"Score de credibilidade da triagem local: {prescreen['credibility_score']:.2f}.",
+            ],
+            "is_event_real": False,
+            "verdict": self.VERDICT,
+            "sources": [],
+        }
+
+    def stats(self) -> Dict:
+        return {"screened": self.screened, "flagged": self.flagged, "threshold": self.threshold}
@@ -0,0 +1,178 @@
+import math
+import threading
+from typing import Dict, List, Optional
+from app.config import settings
+from app.services.enrichment import condense
+
+# Média para texto em português no tokenizador do Gemini: ~4 caracteres por token
+CHARS_PER_TOKEN = 4
+EXCERPT_LABEL = "\n  Trecho da matéria: "
+# Trechos menores que isso não acrescentam nada ao snippet
+MIN_EXCERPT_CHARS = 120
+
+REPORT_INTRO = """Você é um jornalista investigativo sênior. Sua tarefa é apurar uma informação inicial (uma "pista") e entregar um relatório conciso e factual.
+
+"""
+
+CASE_TEMPLATE = """--- PISTA INICIAL ---
+"{lead}"
+--- FIM DA PISTA ---
+
+--- APURAÇÃO (Resultados de busca na web) ---
+{evidence}
+--- FIM DA APURAÇÃO ---
+"""
+
+REPORT_INSTRUCTIONS = """
+**Instruções:**
+1. **Sintetize a Apuração:** Com base nos resultados da busca, escreva um resumo coeso e neutro sobre o evento.
+2. **Extraia Pontos-Chave:** Identifique de 3 a 5 fatos essenciais e verificáveis sobre o evento (ex: datas, locais, nomes, números).
+3. **Dê um Veredito:** Compare a "Pista Inicial" com a "Apuração". A pista parece ser verdadeira, falsa ou parcialmente correta? Seja direto. O veredito deve ser uma das seguintes strings: "CONFIRMADO", "IMPRECISO", "FALSO", "INSUFICIENTE".
+4. **Justifique o Veredito:** Escreva uma frase curta explicando o porquê do seu veredito.
+"""
+
+REPORT_TEMPLATE = REPORT_INTRO + CASE_TEMPLATE + REPORT_INSTRUCTIONS
+
+# Lote de pistas (micro-batching): as instruções vão uma vez só e cada caso tem sua vaga na resposta
+BATCH_INTRO = """Você é um jornalista investigativo sênior. Você vai apurar {count} pistas independentes, numeradas como CASO 1 a CASO {count}, e entregar um relatório conciso e factual para cada uma. Nunca misture informações de casos diferentes.
+
+"""
+
+BATCH_OUTPUT_SECTION = """
+Aplique as instruções a cada caso separadamente. Responda com um objeto JSON {"reports": [...]} contendo exatamente um relatório por caso, cada um com o campo "case" igual ao número do caso.
+"""
+
+# Só vai no prompt quando o formato não é imposto pela API (`REPORT_STRUCTURED_OUTPUT`)
+JSON_FORMAT_SECTION = """5. **Garanta a validade do JSON:** Certifique-se de que todas as strings dentro do JSON estejam corretamente escapadas (especialmente aspas duplas internas) e que a estrutura JSON seja estritamente válida.
+
+Retorne sua análise ESTRITAMENTE no seguinte formato JSON:
+{
+    "event_summary": "<Seu resumo detalhado do evento aqui>",
+    "key_points": [
+        "<Primeiro ponto-chave>",
+        "<Segundo ponto-chave>",
+        "<Terceiro ponto-chave>"
+    ],
+    "is_event_real": <true se o veredito for 'CONFIRMADO' ou 'IMPRECISO', false caso contrário>,
+    "verdict": "<Seu veredito: 'CONFIRMADO', 'IMPRECISO', 'FALSO' ou 'INSUFICIENTE'>"
+}
+"""
+
+# Equivalente do JSON_FORMAT_SECTION para o lote: os campos de cada relatório, mais "case"
+BATCH_JSON_FORMAT_SECTION = """Garanta a validade do JSON: todas as strings corretamente escapadas (especialmente aspas duplas internas) e a estrutura estritamente válida. Formato:
+{
+    "reports": [
+        {
+            "case": <número do caso>,
+            "event_summary": "<Resumo do evento do caso>",
+            "key_points": ["<Primeiro ponto-chave>", "<Segundo ponto-chave>", "<Terceiro ponto-chave>"],
+            "is_event_real": <true se o veredito for 'CONFIRMADO' ou 'IMPRECISO', false caso contrário>,
+            "verdict": "<'CONFIRMADO', 'IMPRECISO', 'FALSO' ou 'INSUFICIENTE'>"
+        }
+    ]
+}
+"""
+
+def estimate_tokens(text: str) -> int:
+    return math.ceil(len(text or "") / CHARS_PER_TOKEN)
+
+def trim(text: str, max_chars: int) -> str:
+    """
+    Corta em `max_chars` no último espaço, marcando o corte com reticências.
+    Usado nos snippets, que raramente têm frases completas.
+    """
+    text = " ".join((text or "").split())
+    if len(text) <= max_chars:
+        return text
+    if max_chars <= 1:
+        return ""
+    cut = text[:max_chars - 1]
+    space = cut.rfind(" ")
+    return (cut[:space] if space > max_chars // 2 else cut).rstrip() + "…"
+
+
+class PromptBuilder:
+    """
+    Monta o prompt do relatório dentro de um orçamento de tokens (`PROMPT_TOKEN_BUDGET`).
+
+    Descontado o texto fixo das instruções, o orçamento é dividido entre a pista
+    (`PROMPT_LEAD_SHARE`) e a apuração; o que a apuração não usa passa para a pista, que é
+    cortada no fim de uma frase. Cada snippet é limitado a `PROMPT_SNIPPET_CHARS` e os
+    trechos de matéria (enriquecimento) dividem igualmente o que sobrar.
+
+    Com `REPORT_STRUCTURED_OUTPUT` o formato JSON é imposto pela API (`response_schema`) e
+    a descrição dele sai do prompt. O formato de saída não pede mais a lista de fontes:
+    `report['sources']` é sempre preenchido com os resultados da busca, então ecoá-las só
+    custava tokens de saída.
+    """
+
+    def __init__(self, budget: int = None, lead_share: float = None, snippet_chars: int = None, structured: bool = None):
+        self.budget = budget or settings.PROMPT_TOKEN_BUDGET
+        structured = settings.REPORT_STRUCTURED_OUTPUT if structured is None else structured
+        self.format_section = "" if structured else JSON_FORMAT_SECTION
+        self.batch_format_section = "" if structured else BATCH_JSON_FORMAT_SECTION
+        self.lead_share = settings.PROMPT_LEAD_SHARE if lead_share is None else lead_share
+        self.snippet_chars = snippet_chars or settings.PROMPT_SNIPPET_CHARS
+        self._fixed_tokens = estimate_tokens(REPORT_TEMPLATE.format(lead="", evidence="") + self.format_section)
+        self._lock = threading.Lock()
+        self.built = 0
+        self.trimmed_leads = 0
+        self.tokens = 0
+
+    @staticmethod
+    def _source_lines(item: Dict, snippet_chars: int) -> str:
+        return f"- Título: {item['title']}\n  Link: {item['link']}\n  Resumo: {trim(item.get('snippet', ''), snippet_chars)}"
+
+    def build(self, lead_text: str, search_results: List[Dict], evidence: Optional[Dict[str, str]] = None) -> str:
+        prompt = REPORT_INTRO + self.build_case(lead_text, search_results, evidence) + REPORT_INSTRUCTIONS + self.format_section
+        with self._lock:
+            self.built += 1
+            self.tokens += estimate_tokens(prompt)
+        return prompt
+
+    def build_batch(self, cases: List[str]) -> str:
+        """
+        Prompt de um lote: os casos já montados por `build_case`, numerados a partir de 1.
+        """
+        numbered = "\n".join(f"=== CASO {number} ===\n{case}" for number, case in enumerate(cases, 1))
+        return BATCH_INTRO.format(count=len(cases)) + numbered + REPORT_INSTRUCTIONS + BATCH_OUTPUT_SECTION + self.batch_format_section
+
+    def build_case(self, lead_text: str, search_results: List[Dict], evidence: Optional[Dict[str, str]] = None) -> str:
+        """
+        Pista e apuração de uma investigação, dentro do orçamento.
+        """
+        evidence = evidence or {}
+        available = max(self.budget - self._fixed_tokens, 0) * CHARS_PER_TOKEN
+
+        sources = [self._source_lines(item, self.snippet_chars) for item in search_results]
+        sources_chars = sum(len(lines) + 1 for lines in sources)
+        excerpts = [evidence.get(item["link"], "") for item in search_results]
+        excerpt_chars = sum(len(" ".join(text.split())) for text in excerpts if text)
+
+        # A parte da apuração que os resultados não usam fica com a pista
+        lead_limit = max(int(available * self.lead_share), available - sources_chars - excerpt_chars)
+        full_lead = " ".join((lead_text or "").split())
+        lead = condense(full_lead, lead_limit)
+        # Os trechos de matéria dividem o que sobra depois da pista e dos snippets
+        excerpt_room = max(available - len(lead) - sources_chars, 0)
+        with_excerpt = sum(1 for text in excerpts if text)
+        per_excerpt = excerpt_room // with_excerpt - len(EXCERPT_LABEL) if with_excerpt else 0
+
+        blocks = []
+        for lines, text in zip(sources, excerpts):
+            if text and per_excerpt >= MIN_EXCERPT_CHARS:
+                lines += EXCERPT_LABEL + condense(text, per_excerpt)
+            blocks.append(lines)
+
+        with self._lock:
+            self.trimmed_leads += int(len(lead) < len(full_lead))
+        return CASE_TEMPLATE.format(lead=lead, evidence="\n".join(blocks))
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "budget": self.budget,
+                "built": self.built,
+                "trimmed_leads": self.trimmed_leads,
+                "avg_tokens": round(self.tokens / self.built, 1) if self.built else 0.0,
+            }
@@ -0,0 +1,248 @@
+import re
+import math
+import threading
+from pathlib import Path
+from collections import Counter
+from typing import Dict, List
+from app.config import settings
+from app.services.normalize import strip_accents, normalize_text
+
+DEFAULT_CORPUS_PATH = Path(__file__).resolve().parent / "data" / "news_corpus_pt.txt"
+
+# Stopwords do português (sem acentos, como saem de `normalize_text`)
+STOPWORDS = frozenset("""
+a ao aos aquela aquelas aquele aqueles aquilo as ate com como contra da das de dela delas dele
+deles depois do dos e ela elas ele eles em entre era eram essa essas esse esses esta estao estas
+estava estavam este esteja estes esteve estive estivemos estiveram eu foi fomos for foram forem
+fosse fossem fui ha isso isto ja la lhe lhes mais mas me mesmo meu meus minha minhas muito muitos
+na nas nem no nos nossa nossas nosso nossos num numa o os ou para pela pelas pelo pelos per perante
+pois por porque quais qual quando que quem se sem ser sera serao seria seriam seu seus si sido so
+sob sobre sua suas tambem te tem tendo tenho ter teu teus tinha tinham toda todas todo todos tu tua
+tuas tudo um uma umas uns vai vao voce voces vos ainda apos assim cada onde outra outras outro
+outros pode podem poderia sao seja sejam sendo tao tal tanto tantos ate aqui ali la entao enquanto
+desde durante mediante segundo conforme caso cerca etc hoje ontem amanha agora sempre nunca
+neste nesta nestes nestas nesse nessa nesses nessas naquele naquela naqueles naquelas
+mil milhao milhoes bilhao bilhoes trilhao trilhoes
+""".split())
+
+# Verbos de atribuição, presentes em quase toda notícia: não dizem do que a pista trata
+REPORTING_VERBS = frozenset("""
+diz dizem disse disseram afirma afirmam afirmou confirma confirmam confirmou anuncia anunciam
+anunciou informa informou revela revelou aponta apontou deixa deixam deixou preve previu
+alerta alertou declara declarou garante garantiu
+""".split())
+
+MONTHS = "janeiro|fevereiro|março|marco|abril|maio|junho|julho|agosto|setembro|outubro|novembro|dezembro"
+_DATE_RE = re.compile(
+    rf"\b\d{{1,2}}/\d{{1,2}}(?:/\d{{2,4}})?\b|\b\d{{1,2}}(?:º)? de (?:{MONTHS})(?: de \d{{4}})?\b",
+    re.IGNORECASE,
+)
+# Multiplicadores do mais longo para o mais curto: "milhões" não pode parar em "mil"
+_MULTIPLIERS = "trilhões|trilhão|bilhões|bilhão|milhões|milhão|mil"
+_AMOUNT_RE = re.compile(
+    rf"(?:R\$|US\$|€)\s?\d+(?:[.,]\d+)*(?:\s(?:{_MULTIPLIERS})\b)?"
+    rf"|\b\d+(?:[.,]\d+)*(?:\s?%|\s(?:{_MULTIPLIERS})\b)"
+    r"|\b(?:19|20)\d{2}\b",
+    re.IGNORECASE,
+)
+# Número solto seguido de um substantivo ("62 pessoas", "3 mortos"); a palavra seguinte é
+# conferida contra as stopwords em `numbers`
+_COUNT_RE = re.compile(r"\b\d+(?:[.,]\d+)*\s+([a-zà-ÿ]{3,})\b")
+# Terminações verbais comuns ("38 alcançou", "5 morreram", "2 saiu"): não são o que se conta
+_VERB_ENDINGS = ("ou", "am", "iu")
+# Nas palavras-chave, verbos (passado, plural, infinitivo) valem menos que o assunto
+_KEYWORD_VERB_ENDINGS = _VERB_ENDINGS + ("ar", "er", "ir")
+VERB_WEIGHT = 0.5
+# "terça-feira" é um dia da semana, não "terça" + "feira"
+_WEEKDAY_RE = re.compile(r"\b(?:segunda|terça|terca|quarta|quinta|sexta)-feira\b", re.IGNORECASE)
+_UPPER = "A-ZÁÀÂÃÉÊÍÓÔÕÚÇ"
+_WORD = r"[\wÀ-ÿ]"
+_ENTITY_RE = re.compile(
+    rf"\b[{_UPPER}]{_WORD}+(?:\s+(?:(?:da|de|do|das|dos|e)\s+)?[{_UPPER}]{_WORD}+)*"
+)
+_TOKEN_RE = re.compile(rf"{_WORD}+")
+_SENTENCE_START_RE = re.compile(r"(?:^|[.!?:]\s+|\n)\s*$")
+
+# Siglas em caixa alta (STF, OMS, PIB) são entidades; palavras maiores em caixa alta são grito
+ACRONYM_MAX_LEN = 5
+# Vagas da consulta reservadas às palavras-chave de maior TF-IDF
+KEYWORD_SLOTS = 2
+
+
+class QueryBuilder:
+    """
+    Monta uma consulta curta para a busca a partir da pista, sem custo de LLM: entidades
+    (sequências em maiúscula como "Ministério da Saúde", siglas), números e datas e as
+    palavras mais salientes por TF-IDF, com o IDF calculado sobre um corpus de notícias
+    empacotado (`data/news_corpus_pt.txt`, ou `QUERY_CORPUS_PATH`).
+
+    Também produz consultas alternativas (entidades entre aspas, título, só palavras-chave),
+    usadas quando se quer ampliar a busca.
+    """
+
+    def __init__(self, corpus_path: str = None, max_terms: int = None):
+        self.max_terms = max_terms or settings.QUERY_MAX_TERMS
+        self._doc_freq, self._documents = self._load_corpus(corpus_path or settings.QUERY_CORPUS_PATH or DEFAULT_CORPUS_PATH)
+        # Indicadores de sensacionalismo nunca entram na consulta
+        self._noise = {word for term in settings.FAKE_NEWS_INDICATORS for word in normalize_text(term).split()}
+        self._lock = threading.Lock()
+        self.built = 0
+        self.raw = 0
+        self.chars_in = 0
+        self.chars_out = 0
+
+    @staticmethod
+    def _load_corpus(path) -> tuple:
+        doc_freq, documents = Counter(), 0
+        try:
+            with open(path, encoding="utf-8") as corpus:
+                for line in corpus:
+                    if not line.strip() or line.startswith("#"):
+                        continue
+                    documents += 1
+                    doc_freq.update(set(normalize_text(line).split()))
+        except OSError as e:
+            print(f"⚠️ Corpus do construtor de consultas indisponível ({e}); usando IDF uniforme.")
+        return doc_freq, documents
+
+    def idf(self, word: str) -> float:
+        return math.log((self._documents + 1) / (self._doc_freq.get(word, 0) + 1)) + 1
+
+    def _is_noise(self, word: str) -> bool:
+        return word in STOPWORDS or word in REPORTING_VERBS or word in self._noise
+
+    def entities(self, text: str) -> List[str]:
+        # Em texto "gritado", caixa alta não indica sigla nem nome próprio
+        letters = [ch for ch in text if ch.isalpha()]
+        shouting = bool(letters) and sum(ch.isupper() for ch in letters) / len(letters) > 0.6
+        mentions = Counter(normalize_text(text).split())
+        found = {}
+        for match in _ENTITY_RE.finditer(text):
+            words = match.group().split()
+            # Uma palavra gritada contamina a sequência: "NINGUÉM CONTA" não tem sigla
+            shouted = shouting or any(w.isupper() and len(w) > ACRONYM_MAX_LEN for w in words)
+            words = [w for w in words if not self._is_shout(w, shouted)]
+            at_start = match.start() == 0 or _SENTENCE_START_RE.search(text[:match.start()])
+            # Artigo ou palavra comum só com maiúscula por abrir a frase ("O Ministério", "Segundo")
+            if words and at_start and self._is_noise(normalize_text(words[0])):
+                words.pop(0)
+                at_start = False
+            while words and self._is_noise(normalize_text(words[-1])):
+                words.pop()
+            if not words:
+                continue
+            entity = " ".join(words)
+            normalized = normalize_text(entity)
+            if len(words) == 1:
+                if self._is_noise(normalized):
+                    continue
+                # Maiúscula só por abrir a frase ("Avião cai...") não faz entidade, a menos
+                # que a palavra volte no texto
+                if at_start and mentions[normalized] < 2:
+                    continue
+            found.setdefault(normalized, entity)
+        return list(found.values())
+
+    def _is_shout(self, word: str, shouting: bool) -> bool:
+        if normalize_text(word) in self._noise:
+            return True
+        return word.isupper() and (shouting or len(word) > ACRONYM_MAX_LEN)
+
+    @staticmethod
+    def numbers(text: str) -> List[str]:
+        counts = [
+            m.span() for m in _COUNT_RE.finditer(text)
+            if normalize_text(m.group(1)) not in STOPWORDS and not m.group(1).endswith(_VERB_ENDINGS)
+        ]
+        spans = sorted(
+            [m.span() for m in _DATE_RE.finditer(text)] + [m.span() for m in _AMOUNT_RE.finditer(text)] + counts,
+            key=lambda span: (span[0], -(span[1] - span[0])),
+        )
+        found, last_end = {}, -1
+        for start, end in spans:
+            if start < last_end:
+                continue  # contido em um trecho maior (ex.: o ano de uma data completa)
+            found.setdefault(text[start:end].strip(), None)
+            last_end = end
+        return list(found)
+
+    def keywords(self, text: str, title: str = None, exclude: set = frozenset()) -> List[str]:
+        counts = Counter()
+        for source, weight in ((text, 1), (title or "", 2)):
+            for token in _TOKEN_RE.findall(_WEEKDAY_RE.sub(" ", source)):
+                word = strip_accents(token).casefold()
+                if len(word) < 3 or word.isdigit() or self._is_noise(word) or word in exclude:
+                    continue
+                counts[token.casefold()] += weight
+        scored = {
+            token: tf * self.idf(strip_accents(token)) * (VERB_WEIGHT if token.endswith(_KEYWORD_VERB_ENDINGS) else 1)
+            for token, tf in counts.items()
+        }
+        return sorted(scored, key=lambda token: (-scored[token], token))
+
+    def build(self, text: str, title: str = None) -> Dict:
+        """
+        Retorna {"query", "alternates", "entities", "numbers", "keywords"}. Pistas que já
+        são curtas (até `QUERY_MAX_TERMS` palavras, sem título) seguem como estão.
+        """
+        text = (text or "").strip()
+        entities = self.entities(f"{title}. {text}" if title else text)
+        numbers = self.numbers(text)
+        # Palavras que já entram como entidade ou junto de um número não se repetem na consulta
+        used_words = {w for term in entities + numbers[:2] for w in normalize_text(term).split()}
+        keywords = self.keywords(text, title, exclude=used_words)
+
+        if not title and len(text.split()) <= self.max_terms:
+            query = text
+            is_raw = True
+        else:
+            # As palavras-chave mais salientes (o assunto: "dengue") têm vaga garantida;
+            # entidades e números dividem o resto
+            reserved = min(KEYWORD_SLOTS, len(keywords))
+            terms: List[str] = []
+            for term in entities[:3] + numbers[:2]:
+                if len(" ".join(terms + [term]).split()) <= self.max_terms - reserved:
+                    terms.append(term)
+            for term in keywords:
+                if len(" ".join(terms + [term]).split()) > self.max_terms:
+                    break
+                terms.append(term)
+            query = " ".join(terms) or " ".join(text.split()[:self.max_terms])
+            is_raw = False
+
+        alternates = []
+        if entities:
+            alternates.append(" ".join([f'"{e}"' if " " in e else e for e in entities[:3]] + numbers[:1] + keywords[:2]))
+        if title:
+            alternates.append(" ".join(title.split()[:self.max_terms + 2]))
+        if keywords:
+            alternates.append(" ".join(keywords[:6]))
+        seen = {normalize_text(query)}
+        unique_alternates = []
+        for alternate in alternates:
+            if alternate and normalize_text(alternate) not in seen:
+                seen.add(normalize_text(alternate))
+                unique_alternates.append(alternate)
+
+        with self._lock:
+            self.built += 1
+            self.raw += int(is_raw)
+            self.chars_in += len(text)
+            self.chars_out += len(query)
+        return {
+            "query": query,
+            "alternates": unique_alternates,
+            "entities": entities,
+            "numbers": numbers,
+            "keywords": keywords[:10],
+        }
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "built": self.built,
+                "raw_leads": self.raw,
+                "corpus_documents": self._documents,
+                "avg_chars_in": round(self.chars_in / self.built, 1) if self.built else 0.0,
+                "avg_chars_out": round(self.chars_out / self.built, 1) if self.built else 0.0,
+            }
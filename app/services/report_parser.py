@@ -0,0 +1,259 @@
+import re
+import ast
+import json
+import threading
+from typing import Dict, List, Tuple
+
+VERDICTS = ("CONFIRMADO", "IMPRECISO", "FALSO", "INSUFICIENTE")
+
+# Esquema do relatório pedido ao Gemini (`response_schema`); espelha o InvestigationResult,
+# sem `sources`, que vem sempre da busca
+REPORT_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "event_summary": {"type": "string"},
+        "key_points": {"type": "array", "items": {"type": "string"}},
+        "is_event_real": {"type": "boolean"},
+        "verdict": {"type": "string", "enum": list(VERDICTS)},
+    },
+    "required": ["event_summary", "key_points", "is_event_real", "verdict"],
+}
+
+# Lote de relatórios (micro-batching): um item por caso, identificado pelo número do caso
+BATCH_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "reports": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {"case": {"type": "integer"}, **REPORT_SCHEMA["properties"]},
+                "required": ["case"] + REPORT_SCHEMA["required"],
+            },
+        },
+    },
+    "required": ["reports"],
+}
+
+_FENCE_RE = re.compile(r"^\s*```(?:json)?\s*|\s*```\s*$", re.IGNORECASE)
+_TRAILING_COMMA_RE = re.compile(r",(\s*[}\]])")
+_LITERALS = {"True": "true", "False": "false", "None": "null"}
+# O valor vai até a aspa que fecha o campo (seguida do próximo campo ou do fim do objeto),
+# não até a primeira aspa: citações sem escape ficam dentro do valor
+_STRING_FIELD_RE = r'"{}"\s*:\s*"((?:[^\\]|\\.)*?)"\s*(?=,\s*"|[}}\]]|$)'
+_KEY_POINTS_RE = re.compile(r'"key_points"\s*:\s*\[(.*?)\]', re.DOTALL)
+_QUOTED_RE = re.compile(r'"((?:[^"\\]|\\.)*)"')
+
+
+def _closes_string(text: str, position: int) -> bool:
+    rest = text[position:].lstrip()
+    if not rest or rest[0] in ":}]":
+        return True
+    if rest[0] != ",":
+        return False
+    after = rest[1:].lstrip()
+    return not after or after[0] in '"{[}]-0123456789' or after.startswith(("true", "false", "null", "True", "False", "None"))
+
+
+def _literal(text: str):
+    """
+    Dicionário no formato do Python (aspas simples, True/False/None), lido com `ast.literal_eval`.
+    """
+    start, end = text.find("{"), text.rfind("}")
+    if start < 0 or end < start:
+        return None
+    try:
+        value = ast.literal_eval(text[start:end + 1])
+    except (ValueError, SyntaxError, TypeError, MemoryError, RecursionError):
+        return None
+    return value if isinstance(value, (dict, list)) else None
+
+
+def _repair(text: str) -> str:
+    """
+    Conserta os defeitos mais comuns de JSON gerado por LLM, numa passada só:
+    aspas internas sem escape, quebras de linha dentro de strings, literais do Python,
+    vírgula sobrando e resposta cortada (fecha strings, listas e objetos abertos).
+    """
+    start = text.find("{")
+    if start < 0:
+        return text
+    out, stack, in_string, escaped = [], [], False, False
+    i = start
+    while i < len(text):
+        ch = text[i]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == '"':
+                # Só fecha a string se o que vem depois for estrutura: depois de uma vírgula,
+                # o próximo valor ou chave ('Ele disse "sim", depois saiu' não fecha em "sim")
+                if _closes_string(text, i + 1):
+                    in_string = False
+                else:
+                    out.append("\\")
+            elif ch in "\n\r\t":
+                ch = {"\n": "\\n", "\r": "\\r", "\t": "\\t"}[ch]
+            out.append(ch)
+        else:
+            literal = next((word for word in _LITERALS if text.startswith(word, i)), None)
+            if literal:
+                out.append(_LITERALS[literal])
+                i += len(literal)
+                continue
+            if ch == '"':
+                in_string = True
+            elif ch in "{[":
+                stack.append("}" if ch == "{" else "]")
+            elif ch in "}]":
+                if stack:
+                    stack.pop()
+                out.append(ch)
+                if not stack:
+                    break  # fim do objeto externo; o que vier depois é texto solto
+                i += 1
+                continue
+            out.append(ch)
+        i += 1
+
+    if in_string:
+        out.append('"')
+    repaired = "".join(out).rstrip().rstrip(",") + "".join(reversed(stack))
+    return _TRAILING_COMMA_RE.sub(r"\1", repaired)
+
+
+def _unescape(value: str) -> str:
+    try:
+        return json.loads(f'"{value}"')
+    except ValueError:
+        return value
+
+
+def _salvage_fields(text: str) -> Dict:
+    """
+    Último recurso: extrai os campos um a um por expressão regular.
+    """
+    report = {}
+    for field in ("event_summary", "verdict"):
+        match = re.search(_STRING_FIELD_RE.format(field), text)
+        if match:
+            report[field] = _unescape(match.group(1))
+    match = _KEY_POINTS_RE.search(text)
+    if match:
+        report["key_points"] = [_unescape(point) for point in _QUOTED_RE.findall(match.group(1))]
+    match = re.search(r'"is_event_real"\s*:\s*(true|false)', text, re.IGNORECASE)
+    if match:
+        report["is_event_real"] = match.group(1).lower() == "true"
+    return report
+
+
+def _as_text_list(value) -> List[str]:
+    if isinstance(value, str):
+        return [value] if value.strip() else []
+    if isinstance(value, list):
+        return [str(item) for item in value if str(item).strip()]
+    return []
+
+
+class ReportParser:
+    """
+    Interpreta a resposta do Gemini sem jogar fora uma chamada paga por um defeito de formato.
+
+    1. `json.loads` direto (após remover cercas ```json);
+    2. dicionário no formato do Python (aspas simples), via `ast.literal_eval`;
+    3. reparo tolerante (`_repair`) do objeto JSON encontrado no texto;
+    4. extração campo a campo, se ao menos o veredito estiver legível.
+
+    O relatório é então normalizado (veredito em caixa alta, `key_points` como lista,
+    `is_event_real` derivado do veredito quando ausente). Os contadores separam o que passou
+    direto, o que foi recuperado e o que falhou: `strict_failure_rate` é a taxa de falha do
+    parser antigo sobre o mesmo tráfego, `failure_rate` a atual.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.strict = 0
+        self.recovered = 0
+        self.failed = 0
+
+    def _record(self, status: str):
+        with self._lock:
+            setattr(self, status, getattr(self, status) + 1)
+
+    @staticmethod
+    def _load(response_text: str) -> Tuple[object, str]:
+        text = _FENCE_RE.sub("", (response_text or "").strip())
+        try:
+            return json.loads(text), "strict"
+        except ValueError:
+            pass
+        literal = _literal(text)
+        if literal is not None:
+            return literal, "recovered"
+        try:
+            repaired = json.loads(_repair(text))
+        except ValueError:
+            repaired = None
+        # Reparo que engoliu o veredito (ou o lote) perdeu conteúdo: vale a extração por campo
+        if isinstance(repaired, list) or (isinstance(repaired, dict) and ("verdict" in repaired or "reports" in repaired)):
+            return repaired, "recovered"
+        return _salvage_fields(text), "recovered"
+
+    @staticmethod
+    def _normalize(report) -> Dict:
+        verdict = str(report.get("verdict", "")).strip().upper() if isinstance(report, dict) else ""
+        if verdict not in VERDICTS:
+            raise ValueError("relatório sem um veredito válido")
+        is_event_real = report.get("is_event_real")
+        return {
+            "event_summary": str(report.get("event_summary") or ""),
+            "key_points": _as_text_list(report.get("key_points")),
+            "is_event_real": is_event_real if isinstance(is_event_real, bool) else verdict in ("CONFIRMADO", "IMPRECISO"),
+            "verdict": verdict,
+        }
+
+    def parse(self, response_text: str) -> Tuple[Dict, str]:
+        """
+        Retorna (relatório, status), com status "strict" ou "recovered".
+        Levanta ValueError quando nada aproveitável foi encontrado.
+        """
+        report, status = self._load(response_text)
+        try:
+            report = self._normalize(report)
+        except ValueError:
+            self._record("failed")
+            raise ValueError(f"Resposta da IA sem um veredito válido: {(response_text or '')[:200]!r}")
+        self._record(status)
+        return report, status
+
+    def parse_batch(self, response_text: str) -> Dict[int, Dict]:
+        """
+        Resposta de um lote ({"reports": [{"case": n, ...}]}) -> {n: relatório}.
+        Casos ausentes ou ilegíveis simplesmente não aparecem no resultado.
+        """
+        loaded, status = self._load(response_text)
+        items = loaded.get("reports", []) if isinstance(loaded, dict) else loaded
+        reports = {}
+        for item in items if isinstance(items, list) else []:
+            try:
+                case = int(item.get("case"))
+                reports[case] = self._normalize(item)
+            except (AttributeError, TypeError, ValueError):
+                self._record("failed")
+                continue
+            self._record(status)
+        return reports
+
+    def stats(self) -> Dict:
+        with self._lock:
+            total = self.strict + self.recovered + self.failed
+            return {
+                "parsed": total,
+                "strict": self.strict,
+                "recovered": self.recovered,
+                "failed": self.failed,
+                "strict_failure_rate": round((self.recovered + self.failed) / total, 4) if total else 0.0,
+                "failure_rate": round(self.failed / total, 4) if total else 0.0,
+            }
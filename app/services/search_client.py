@@ -0,0 +1,54 @@
+import threading
+from googleapiclient.discovery import build
+from typing import Dict, List
+from app.config import settings
+from app.services.http_transport import get_transport
+
+class SearchClient:
+    """
+    Cliente de longa duração para a API Google Custom Search.
+
+    O objeto de serviço é construído uma única vez a partir do documento de discovery
+    empacotado na biblioteca (sem ida à rede). As requisições saem pelo transporte HTTP
+    compartilhado (thread-safe, com keep-alive), através de um adaptador com a interface
+    de `httplib2.Http`.
+    """
+
+    def __init__(self, api_key: str, engine_id: str, page_size: int = None, timeout: float = None):
+        self.engine_id = engine_id
+        # A API aceita no máximo 10 resultados por página
+        self.page_size = max(1, min(page_size or settings.SEARCH_PAGE_SIZE, 10))
+        self.timeout = timeout or settings.SEARCH_TIMEOUT
+        self._service = build(
+            "customsearch", "v1",
+            developerKey=api_key,
+            static_discovery=True,
+            cache_discovery=False,
+            http=get_transport().httplib2_adapter(self.timeout),
+        )
+
+    def search(self, query: str, num: int = None, **params) -> List[Dict]:
+        """
+        Executa a busca e retorna os itens no formato {title, link, snippet}.
+        Exceções da API são propagadas para o chamador.
+        """
+        request = self._service.cse().list(q=query, cx=self.engine_id, num=num or self.page_size, **params)
+        result = request.execute()
+        return [{"title": item['title'], "link": item['link'], "snippet": item.get('snippet', '')} for item in result.get('items', [])]
+
+
+_clients: Dict[tuple, SearchClient] = {}
+_clients_lock = threading.Lock()
+
+def get_search_client(api_key: str, engine_id: str) -> SearchClient:
+    """
+    Retorna o cliente compartilhado do processo para o par (chave, mecanismo de busca).
+    """
+    key = (api_key, engine_id)
+    client = _clients.get(key)
+    if client is None:
+        with _clients_lock:
+            client = _clients.get(key)
+            if client is None:
+                client = _clients[key] = SearchClient(api_key, engine_id)
+    return client
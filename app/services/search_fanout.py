@@ -0,0 +1,123 @@
+import time
+import asyncio
+import threading
+import concurrent.futures
+from typing import Awaitable, Callable, Dict, List
+from app.config import settings
+from app.services.normalize import normalize_text
+from app.services.extraction_rules import host_of
+
+def _usable(results: List[Dict]) -> bool:
+    return bool(results) and "error" not in results[0]
+
+def _outcome(future) -> List[Dict]:
+    # Serve para concurrent.futures.Future e asyncio.Task: falha vira lista vazia
+    if future.cancelled() or future.exception() is not None:
+        return []
+    return future.result()
+
+
+class SearchFanout:
+    """
+    Busca com várias variantes da consulta em paralelo (consulta principal, título,
+    alternativas do `QueryBuilder` e, com `SEARCH_FANOUT_FACT_CHECK`, a principal restrita
+    aos sites de checagem), com um prazo único (`SEARCH_FANOUT_DEADLINE`). O que chegou
+    até o prazo é fundido, deduplicado e ranqueado pelo `SearchPostProcessor`; variantes
+    atrasadas são abandonadas (o resultado delas ainda alimenta o cache de busca quando
+    terminar).
+
+    Se nenhuma variante respondeu até o prazo, espera a primeira resposta útil até
+    `SEARCH_TIMEOUT`, para não trocar uma busca lenta por nenhuma fonte.
+    """
+
+    def __init__(self, search: Callable[[str], List[Dict]], asearch: Callable[[str], Awaitable[List[Dict]]],
+                 postprocessor, executor: concurrent.futures.Executor,
+                 max_queries: int = None, deadline: float = None):
+        self.search = search
+        self.asearch = asearch
+        self.postprocessor = postprocessor
+        self.executor = executor
+        self.max_queries = max_queries or settings.SEARCH_FANOUT_QUERIES
+        self.deadline = deadline or settings.SEARCH_FANOUT_DEADLINE
+        self.fact_check_hosts = []
+        if settings.SEARCH_FANOUT_FACT_CHECK:
+            self.fact_check_hosts = [host_of(source) or source for source in settings.FACT_CHECK_SOURCES]
+        self._lock = threading.Lock()
+        self.runs = 0
+        self.queries = 0
+        self.late = 0
+        self.failed = 0
+
+    def queries_for(self, built: Dict) -> List[str]:
+        """
+        Variantes da consulta, sem repetição, limitadas a `SEARCH_FANOUT_QUERIES`.
+        """
+        candidates = [built["query"]]
+        if self.fact_check_hosts:
+            sites = " OR ".join(f"site:{host}" for host in self.fact_check_hosts)
+            candidates.append(f"{built['query']} ({sites})")
+        candidates += built.get("alternates", [])
+        queries, seen = [], set()
+        for query in candidates:
+            key = normalize_text(query)
+            if key and key not in seen:
+                seen.add(key)
+                queries.append(query)
+        return queries[:self.max_queries]
+
+    def _merge(self, outcomes: List[List[Dict]]) -> List[Dict]:
+        # `outcomes` segue a ordem das variantes: a consulta principal tem precedência
+        usable = [results for results in outcomes if _usable(results)]
+        if not usable:
+            errors = [results for results in outcomes if results]
+            return errors[0] if errors else [{"error": "Nenhuma busca respondeu dentro do prazo."}]
+        merged = [result for results in usable for result in results]
+        return self.postprocessor.process(merged)
+
+    def _record(self, queries: int, late: int, results: List[Dict]):
+        with self._lock:
+            self.runs += 1
+            self.queries += queries
+            self.late += late
+            self.failed += int(not _usable(results))
+
+    def run(self, queries: List[str]) -> List[Dict]:
+        futures = [self.executor.submit(self.search, query) for query in queries]
+        done, pending = concurrent.futures.wait(futures, timeout=self.deadline)
+        remaining = max(settings.SEARCH_TIMEOUT - self.deadline, 0)
+        while pending and not any(_usable(_outcome(future)) for future in done) and remaining > 0:
+            start = time.monotonic()
+            more, pending = concurrent.futures.wait(pending, timeout=remaining, return_when=concurrent.futures.FIRST_COMPLETED)
+            done |= more
+            remaining -= time.monotonic() - start
+        for future in pending:
+            future.cancel()
+        results = self._merge([_outcome(future) if future in done else [] for future in futures])
+        self._record(len(queries), len(pending), results)
+        return results
+
+    async def arun(self, queries: List[str]) -> List[Dict]:
+        tasks = [asyncio.ensure_future(self.asearch(query)) for query in queries]
+        done, pending = await asyncio.wait(tasks, timeout=self.deadline)
+        remaining = max(settings.SEARCH_TIMEOUT - self.deadline, 0)
+        loop = asyncio.get_running_loop()
+        while pending and not any(_usable(_outcome(task)) for task in done) and remaining > 0:
+            start = loop.time()
+            more, pending = await asyncio.wait(pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+            done |= more
+            remaining -= loop.time() - start
+        for task in pending:
+            task.cancel()
+        results = self._merge([_outcome(task) if task in done else [] for task in tasks])
+        self._record(len(queries), len(pending), results)
+        return results
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "runs": self.runs,
+                "queries": self.queries,
+                "late_queries": self.late,
+                "failed": self.failed,
+                "deadline": self.deadline,
+            }
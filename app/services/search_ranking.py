@@ -0,0 +1,162 @@
+import re
+import threading
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+from typing import Dict, List, Optional, Set
+from app.config import settings
+from app.services.normalize import canonicalize_url, normalize_text
+from app.services.extraction_rules import host_of
+
+# Prefixos de host das versões móveis/AMP de um site
+MOBILE_HOST_PREFIXES = ("m.", "mobile.", "amp.")
+# Parâmetros que só selecionam a versão AMP
+AMP_QUERY_PARAMS = {"amp", "outputtype", "output"}
+
+# Caches AMP: o esquema e o endereço original vêm no caminho (/s/ = https)
+_AMPPROJECT_CACHE_RE = re.compile(r"^/[cvi]/(s/)?(.+)$")
+_GOOGLE_AMP_RE = re.compile(r"^/amp/(s/)?(.+)$")
+_AMP_SEGMENT_RE = re.compile(r"(/amp)(?=/|$)|(\.amp)(?=\.html?$|$)", re.IGNORECASE)
+
+def article_url(url: str) -> str:
+    """
+    Endereço da versão "normal" de uma matéria: desfaz o cache AMP do Google
+    (`*.cdn.ampproject.org/c/s/...`, `google.com/amp/s/...`), remove subdomínios móveis/AMP,
+    segmentos `/amp` e parâmetros como `?amp=1`. Demais partes da URL são preservadas.
+    """
+    parts = urlsplit((url or "").strip())
+    host = (parts.hostname or "").lower()
+    path = parts.path
+
+    match = None
+    if host.endswith(".cdn.ampproject.org"):
+        match = _AMPPROJECT_CACHE_RE.match(path)
+    elif host == "google.com" or host.endswith(".google.com"):
+        match = _GOOGLE_AMP_RE.match(path)
+    if match:
+        scheme = "https" if match.group(1) else "http"
+        return article_url(f"{scheme}://{match.group(2)}" + (f"?{parts.query}" if parts.query else ""))
+
+    netloc = parts.netloc.lower()
+    for prefix in MOBILE_HOST_PREFIXES:
+        if host.startswith(prefix) and host.count(".") >= 2:
+            netloc = netloc.replace(prefix, "", 1)
+            break
+
+    path = _AMP_SEGMENT_RE.sub("", path) or "/"
+    query = urlencode([(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+                       if k.lower() not in AMP_QUERY_PARAMS])
+    return urlunsplit((parts.scheme, netloc, path, query, parts.fragment))
+
+
+class DomainSuffixTrie:
+    """
+    Índice de domínios por sufixo: os rótulos são inseridos do TLD para a esquerda
+    (com -> globo -> g1), e a busca de um host devolve o valor do domínio mais específico
+    que o contém, em tempo proporcional ao número de rótulos do host.
+    """
+
+    _VALUE = object()
+
+    def __init__(self):
+        self._root: Dict = {}
+
+    def insert(self, domain: str, value):
+        node = self._root
+        for label in reversed(domain.lower().strip(".").split(".")):
+            node = node.setdefault(label, {})
+        node[self._VALUE] = value
+
+    def lookup(self, host: Optional[str]):
+        node, found = self._root, None
+        for label in reversed((host or "").lower().split(".")):
+            node = node.get(label)
+            if node is None:
+                break
+            found = node.get(self._VALUE, found)
+        return found
+
+
+def _shingles(text: str, size: int = 3) -> Set[tuple]:
+    words = normalize_text(text).split()
+    if len(words) < size:
+        return {tuple(words)} if words else set()
+    return {tuple(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+def _jaccard(a: Set, b: Set) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+class SearchPostProcessor:
+    """
+    Pós-processamento dos resultados da busca antes do prompt:
+
+    1. resultados que apontam para a mesma matéria (mesma URL canônica, sem AMP/versão
+       móvel) são fundidos; o link exibido continua o que a busca devolveu;
+    2. snippets quase idênticos (Jaccard de trigramas de palavras acima de
+       `SEARCH_DEDUPE_THRESHOLD`) contam como a mesma matéria republicada;
+    3. o que sobra é ordenado pela credibilidade do domínio (checagem de fatos, depois
+       `CREDIBLE_SOURCES`, depois o resto, mantendo a ordem da busca em cada grupo) e
+       cortado em `SEARCH_MAX_SOURCES`.
+
+    Menos fontes, e melhores, significam um prompt menor e respostas mais rápidas do Gemini.
+    """
+
+    FACT_CHECK_WEIGHT = 2
+    CREDIBLE_WEIGHT = 1
+
+    def __init__(self, max_sources: int = None, dedupe_threshold: float = None):
+        self.max_sources = max_sources or settings.SEARCH_MAX_SOURCES
+        self.dedupe_threshold = settings.SEARCH_DEDUPE_THRESHOLD if dedupe_threshold is None else dedupe_threshold
+        self.index = DomainSuffixTrie()
+        for domain in settings.CREDIBLE_SOURCES:
+            self.index.insert(domain, self.CREDIBLE_WEIGHT)
+        for source in settings.FACT_CHECK_SOURCES:
+            self.index.insert(host_of(source) or source, self.FACT_CHECK_WEIGHT)
+        self._lock = threading.Lock()
+        self.processed = 0
+        self.url_duplicates = 0
+        self.snippet_duplicates = 0
+        self.dropped = 0
+
+    def weight(self, url: str) -> int:
+        return self.index.lookup(host_of(url)) or 0
+
+    def process(self, results: List[Dict]) -> List[Dict]:
+        # Ordena antes de deduplicar, para que a cópia mantida seja a da fonte mais confiável.
+        # sorted é estável: dentro do mesmo peso, vale a ordem da busca.
+        # A URL da matéria só serve de chave: a reescrita de AMP erra em URLs válidas
+        # (ex.: /google/amp/ do g1), então o link do resultado fica intacto
+        candidates = [(article_url(result["link"]), result) for result in results]
+        candidates.sort(key=lambda candidate: -self.weight(candidate[0]))
+
+        kept, seen_urls, kept_shingles = [], set(), []
+        url_duplicates = snippet_duplicates = 0
+        for url, result in candidates:
+            canonical = canonicalize_url(url)
+            if canonical in seen_urls:
+                url_duplicates += 1
+                continue
+            shingles = _shingles(result.get("snippet", ""))
+            if any(_jaccard(shingles, other) >= self.dedupe_threshold for other in kept_shingles):
+                snippet_duplicates += 1
+                continue
+            seen_urls.add(canonical)
+            kept_shingles.append(shingles)
+            kept.append(result)
+
+        with self._lock:
+            self.processed += len(results)
+            self.url_duplicates += url_duplicates
+            self.snippet_duplicates += snippet_duplicates
+            self.dropped += max(len(kept) - self.max_sources, 0)
+        return kept[:self.max_sources]
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "processed": self.processed,
+                "url_duplicates": self.url_duplicates,
+                "snippet_duplicates": self.snippet_duplicates,
+                "dropped_by_limit": self.dropped,
+            }
@@ -0,0 +1,159 @@
+import re
+import time
+import threading
+import numpy as np
+from collections import Counter
+from typing import Dict, List
+from app.config import settings
+from app.services.normalize import normalize_text
+from app.services.enrichment import condense
+from app.services.query_builder import STOPWORDS
+
+_UPPER = "A-ZÁÀÂÃÉÊÍÓÔÕÚÇ"
+# Fim de frase: pontuação seguida de espaço e de algo que abre uma nova frase
+_SENTENCE_SPLIT_RE = re.compile(rf"(?<=[.!?…])\s+(?=[\"“'(\-–—]?[{_UPPER}0-9])")
+# Frases muito curtas costumam ser "Leia mais", legendas, créditos de foto
+MIN_SENTENCE_WORDS = 5
+# Similaridade de cosseno a partir da qual uma frase repete outra já escolhida
+REDUNDANCY_THRESHOLD = 0.7
+
+
+class ExtractiveSummarizer:
+    """
+    Resumo extrativo local (sem LLM) para matérias longas vindas de URL: as frases são
+    vetorizadas por TF-IDF (IDF calculado sobre as frases da própria matéria), a
+    similaridade de cosseno entre elas forma um grafo e o TextRank (PageRank por iteração
+    de potência, com NumPy) dá a centralidade de cada frase. Comentários, "leia também"
+    e boilerplate têm pouco em comum com o resto do texto e ficam com score baixo; frases
+    sem nenhum termo em comum com as demais são descartadas.
+
+    A primeira frase (o lide, onde costuma estar a afirmação) é sempre mantida; as demais
+    entram por score até `SUMMARY_TARGET_CHARS` e saem na ordem original. Textos até
+    `SUMMARY_MIN_CHARS` passam intactos.
+    """
+
+    def __init__(self, target_chars: int = None, min_chars: int = None, damping: float = 0.85,
+                 max_iterations: int = 50, tolerance: float = 1e-6):
+        self.target_chars = target_chars or settings.SUMMARY_TARGET_CHARS
+        self.min_chars = min_chars or settings.SUMMARY_MIN_CHARS
+        self.damping = damping
+        self.max_iterations = max_iterations
+        self.tolerance = tolerance
+        self._lock = threading.Lock()
+        self.summarized = 0
+        self.skipped = 0
+        self.chars_in = 0
+        self.chars_out = 0
+        self.total_time = 0.0
+
+    @staticmethod
+    def sentences(text: str) -> List[str]:
+        return [s.strip() for s in _SENTENCE_SPLIT_RE.split(" ".join((text or "").split())) if s.strip()]
+
+    @staticmethod
+    def _terms(sentence: str) -> List[str]:
+        return [w for w in normalize_text(sentence).split() if len(w) > 2 and w not in STOPWORDS and not w.isdigit()]
+
+    def _matrix(self, sentences: List[str], title: str = None) -> tuple:
+        """
+        Matriz TF-IDF normalizada (uma linha por frase) e o vetor do título, se houver.
+        """
+        terms = [Counter(self._terms(s)) for s in sentences]
+        vocabulary = {w: i for i, w in enumerate(sorted({w for counts in terms for w in counts}))}
+        tf = np.zeros((len(sentences), len(vocabulary)))
+        for row, counts in enumerate(terms):
+            for word, count in counts.items():
+                tf[row, vocabulary[word]] = count
+        idf = np.log((len(sentences) + 1) / ((tf > 0).sum(axis=0) + 1)) + 1
+        vectors = tf * idf
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        vectors = np.divide(vectors, norms, out=np.zeros_like(vectors), where=norms > 0)
+
+        title_vector = None
+        if title:
+            title_tf = np.zeros(len(vocabulary))
+            for word in self._terms(title):
+                if word in vocabulary:
+                    title_tf[vocabulary[word]] += 1
+            title_norm = np.linalg.norm(title_tf * idf)
+            if title_norm > 0:
+                title_vector = title_tf * idf / title_norm
+        return vectors, title_vector
+
+    def _rank(self, vectors: np.ndarray, title_vector=None) -> np.ndarray:
+        n = len(vectors)
+        similarity = vectors @ vectors.T
+        np.fill_diagonal(similarity, 0.0)
+        # Matriz de transição por linha; frases isoladas distribuem o peso por igual
+        out_weight = similarity.sum(axis=1, keepdims=True)
+        transition = np.divide(similarity, out_weight, out=np.full_like(similarity, 1.0 / n), where=out_weight > 0)
+
+        rank = np.full(n, 1.0 / n)
+        for _ in range(self.max_iterations):
+            updated = (1 - self.damping) / n + self.damping * (transition.T @ rank)
+            converged = np.abs(updated - rank).sum() < self.tolerance
+            rank = updated
+            if converged:
+                break
+        # Frases próximas do título falam do assunto da matéria
+        if title_vector is not None:
+            rank = rank * (1 + vectors @ title_vector)
+        return rank
+
+    def scores(self, sentences: List[str], title: str = None) -> np.ndarray:
+        return self._rank(*self._matrix(sentences, title))
+
+    def summarize(self, text: str, title: str = None) -> str:
+        text = " ".join((text or "").split())
+        if len(text) <= self.min_chars:
+            with self._lock:
+                self.skipped += 1
+            return text
+
+        start = time.perf_counter()
+        # Frases repetidas (legendas, chamadas) contam uma vez só
+        kept, seen = [], set()
+        for i, sentence in enumerate(self.sentences(text)):
+            key = normalize_text(sentence)
+            if key in seen or (i > 0 and len(sentence.split()) < MIN_SENTENCE_WORDS):
+                continue
+            seen.add(key)
+            kept.append(sentence)
+
+        if len(kept) < 3:
+            # Pouca frase para ranquear: corta no fim de frase (ou de palavra) mais próximo
+            summary = condense(text, self.target_chars)
+        else:
+            vectors, title_vector = self._matrix(kept, title)
+            scores = self._rank(vectors, title_vector)
+            # Frase sem nenhum termo em comum com as outras está fora do assunto da matéria
+            similarity = vectors @ vectors.T
+            np.fill_diagonal(similarity, 0.0)
+            isolated = similarity.max(axis=1) <= 0
+            chosen, size = [0], len(kept[0])
+            for index in np.argsort(-scores, kind="stable"):
+                index = int(index)
+                if index in chosen or isolated[index] or size + len(kept[index]) + 1 > self.target_chars:
+                    continue
+                # Quase a mesma frase de uma já escolhida não acrescenta informação
+                if (vectors[chosen] @ vectors[index]).max() >= REDUNDANCY_THRESHOLD:
+                    continue
+                chosen.append(index)
+                size += len(kept[index]) + 1
+            summary = " ".join(kept[i] for i in sorted(chosen))
+
+        with self._lock:
+            self.summarized += 1
+            self.chars_in += len(text)
+            self.chars_out += len(summary)
+            self.total_time += time.perf_counter() - start
+        return summary
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "summarized": self.summarized,
+                "skipped": self.skipped,
+                "reduction": round(self.chars_in / self.chars_out, 1) if self.chars_out else 0.0,
+                "avg_ms": round(self.total_time / self.summarized * 1000, 2) if self.summarized else 0.0,
+            }
@@ -0,0 +1,105 @@
+import json
+import threading
+from datetime import datetime, timezone
+from urllib.parse import urlparse
+from typing import Dict, Optional, Tuple
+from app.services.database import connect, utcnow
+
+class VerdictStore:
+    """
+    Histórico persistente dos relatórios gerados, no SQLite de `DATABASE_URL`.
+
+    Além de alimentar `/history` e `/investigations/{hash}`, serve de camada durável
+    do cache de relatórios: após um reinício, pistas populares são respondidas a
+    partir daqui em vez de refazer busca e chamada ao Gemini.
+    """
+
+    LEAD_TEXT_LIMIT = 500
+
+    def __init__(self, path: str = None):
+        self._conn = connect(path)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.executescript("""
+                CREATE TABLE IF NOT EXISTS investigations (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    lead_hash TEXT NOT NULL,
+                    lead_text TEXT,
+                    url TEXT,
+                    domain TEXT,
+                    verdict TEXT NOT NULL,
+                    is_event_real INTEGER NOT NULL,
+                    report TEXT NOT NULL,
+                    created_at TEXT NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS idx_investigations_lead_hash ON investigations (lead_hash, created_at);
+                CREATE INDEX IF NOT EXISTS idx_investigations_domain ON investigations (domain, created_at);
+                CREATE INDEX IF NOT EXISTS idx_investigations_created_at ON investigations (created_at);
+            """)
+
+    @staticmethod
+    def _domain(url: Optional[str]) -> Optional[str]:
+        if not url:
+            return None
+        host = (urlparse(url).hostname or "").lower()
+        return host[4:] if host.startswith("www.") else host or None
+
+    @staticmethod
+    def _to_dict(row) -> Dict:
+        record = dict(row)
+        record["is_event_real"] = bool(record["is_event_real"])
+        record["report"] = json.loads(record["report"])
+        return record
+
+    def save(self, lead_hash: str, report: Dict, text: str = None, url: str = None):
+        lead_text = (text or "")[:self.LEAD_TEXT_LIMIT] or None
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO investigations (lead_hash, lead_text, url, domain, verdict, is_event_real, report, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    lead_hash, lead_text, url, self._domain(url),
+                    str(report.get("verdict", "")), int(bool(report.get("is_event_real"))),
+                    json.dumps(report, ensure_ascii=False), utcnow(),
+                ),
+            )
+
+    def latest(self, lead_hash: str, max_age: float) -> Optional[Tuple[Dict, float]]:
+        """
+        Relatório mais recente da pista, se tiver no máximo `max_age` segundos.
+        Retorna (relatório, idade em segundos) ou None.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT report, created_at FROM investigations WHERE lead_hash = ? ORDER BY created_at DESC LIMIT 1",
+                (lead_hash,),
+            ).fetchone()
+        if row is None:
+            return None
+        age = (datetime.now(timezone.utc) - datetime.fromisoformat(row["created_at"])).total_seconds()
+        if age > max_age:
+            return None
+        return json.loads(row["report"]), age
+
+    def _page(self, where: str, params: tuple, page: int, page_size: int) -> Dict:
+        with self._lock:
+            total = self._conn.execute(f"SELECT COUNT(*) FROM investigations {where}", params).fetchone()[0]
+            rows = self._conn.execute(
+                f"SELECT * FROM investigations {where} ORDER BY created_at DESC LIMIT ? OFFSET ?",
+                params + (page_size, (page - 1) * page_size),
+            ).fetchall()
+        return {"items": [self._to_dict(row) for row in rows], "total": total, "page": page, "page_size": page_size}
+
+    def history(self, page: int = 1, page_size: int = 20, domain: str = None, verdict: str = None) -> Dict:
+        clauses, params = [], ()
+        if domain:
+            clauses.append("domain = ?")
+            params += (domain.lower(),)
+        if verdict:
+            clauses.append("verdict = ?")
+            params += (verdict.upper(),)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        return self._page(where, params, page, page_size)
+
+    def by_lead_hash(self, lead_hash: str, page: int = 1, page_size: int = 20) -> Dict:
+        return self._page("WHERE lead_hash = ?", (lead_hash,), page, page_size)
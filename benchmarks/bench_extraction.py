@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Benchmark dos backends de extração de HTML contra a implementação original
+(BeautifulSoup + html.parser, com `select_one` duplicado por seletor).
+
+Uso:
+    python benchmarks/bench_extraction.py                   # usa benchmarks/corpus/*.html
+    python benchmarks/bench_extraction.py --save URL [URL]  # baixa páginas para o corpus
+    python benchmarks/bench_extraction.py --repeat 20
+
+Sem páginas salvas no corpus, gera páginas sintéticas no estilo dos grandes portais
+(menus, scripts, blocos de "leia também" e o corpo da matéria em um contêiner do fim
+da lista de seletores).
+"""
+
+import sys
+import time
+import random
+import argparse
+import statistics
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bs4 import BeautifulSoup
+from app.services.extraction import EXTRACTORS
+
+CORPUS_DIR = Path(__file__).resolve().parent / "corpus"
+
+
+def legacy_parse_html(content: bytes) -> dict:
+    # Cópia fiel da implementação anterior de `_extract_text_from_url`
+    soup = BeautifulSoup(content, 'html.parser')
+
+    title = soup.find('title')
+    page_title = title.text.strip() if title else "Título não encontrado"
+
+    main_content_selectors = [
+        'article', '.article-body', '.post-content', '.entry-content', '.td-post-content',
+        '.materia-conteudo', '.article__content', '.news_post_body', '.post__text',
+        '#content', '.c-news__body', '.n--noticia__content', '.mc-article-body'
+    ]
+    content_container = next((soup.select_one(s) for s in main_content_selectors if soup.select_one(s)), None)
+
+    if content_container:
+        paragraphs = content_container.find_all('p', recursive=False)
+        content = ' '.join([p.text.strip() for p in paragraphs])
+    else:
+        paragraphs = soup.find_all('p')
+        content = ' '.join([p.text.strip() for p in paragraphs])
+
+    return {"extracted_content": f"{page_title}. {content}", "title": page_title}
+
+
+WORDS = ("governo federal anuncia medida para conter alta de preços dos alimentos em todo o país "
+         "segundo especialistas ouvidos pela reportagem impacto deve ser sentido nos próximos meses").split()
+
+def _sentence(rng: random.Random, size: int = 25) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(size)).capitalize() + "."
+
+def synthetic_page(seed: int) -> bytes:
+    rng = random.Random(seed)
+    nav = "".join(f'<li><a href="/secao/{i}">Seção {i}</a></li>' for i in range(150))
+    scripts = "".join(f"<script>window.__data{i} = {{'a': {i}, 'b': '{'x' * 400}'}};</script>" for i in range(40))
+    related = "".join(
+        f'<div class="card"><a href="/noticia/{i}"><h3>{_sentence(rng, 8)}</h3></a><p>{_sentence(rng, 15)}</p></div>'
+        for i in range(120)
+    )
+    body = "".join(f"<p>{_sentence(rng)} {_sentence(rng)}</p>" for _ in range(40))
+    comments = "".join(f'<div class="comment"><p>{_sentence(rng, 12)}</p></div>' for _ in range(80))
+    html = f"""<!DOCTYPE html><html lang="pt-BR"><head><meta charset="utf-8">
+<title>Portal de Notícias {seed} - {_sentence(rng, 6)}</title>{scripts}
+<style>{'.c{color:red}' * 500}</style></head><body>
+<header><nav><ul>{nav}</ul></nav></header>
+<main><div class="wrapper"><div class="mc-article-body">{body}</div>
+<aside>{related}</aside><section class="comments">{comments}</section></div></main>
+<footer><nav><ul>{nav}</ul></nav></footer></body></html>"""
+    return html.encode("utf-8")
+
+
+def load_corpus() -> list:
+    pages = [(path.name, path.read_bytes()) for path in sorted(CORPUS_DIR.glob("*.html"))]
+    if not pages:
+        print(f"Corpus vazio em {CORPUS_DIR}: usando 5 páginas sintéticas.")
+        pages = [(f"sintetica-{i}.html", synthetic_page(i)) for i in range(5)]
+    return pages
+
+def save_pages(urls: list):
+    import requests
+    CORPUS_DIR.mkdir(exist_ok=True)
+    for url in urls:
+        response = requests.get(url, timeout=15, headers={'User-Agent': 'Mozilla/5.0'})
+        response.raise_for_status()
+        name = "".join(ch if ch.isalnum() else "_" for ch in url.split("://", 1)[-1])[:80] + ".html"
+        (CORPUS_DIR / name).write_bytes(response.content)
+        print(f"Salvo: {name} ({len(response.content) / 1024:.0f} KB)")
+
+
+def bench(fn, content: bytes, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(content)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--save", nargs="+", metavar="URL", help="baixa páginas para o corpus e sai")
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    if args.save:
+        save_pages(args.save)
+        return
+
+    backends = {"legacy": legacy_parse_html}
+    for name, cls in EXTRACTORS.items():
+        try:
+            backends[name] = cls().extract
+        except ImportError:
+            print(f"Backend '{name}' indisponível, ignorado.")
+
+    pages = load_corpus()
+    header = f"{'página':<40} {'KB':>6} " + " ".join(f"{name:>12}" for name in backends)
+    print(header)
+    print("-" * len(header))
+    totals = {name: 0.0 for name in backends}
+    for page_name, content in pages:
+        row = f"{page_name[:40]:<40} {len(content) / 1024:>6.0f} "
+        for name, fn in backends.items():
+            ms = bench(fn, content, args.repeat)
+            totals[name] += ms
+            row += f"{ms:>10.2f}ms"
+        print(row)
+
+    print("-" * len(header))
+    print(f"{'total (mediana por página, somada)':<47} " + " ".join(f"{totals[n]:>10.2f}ms" for n in backends))
+    print(f"{'speedup vs legacy':<47} " + " ".join(f"{totals['legacy'] / totals[n]:>11.1f}x" for n in backends))
+
+
+if __name__ == "__main__":
+    main()
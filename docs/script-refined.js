@@ -11,6 +11,9 @@ document.addEventListener('DOMContentLoaded', () => {
     const animatedElements = document.querySelectorAll('.fade-in-up');
 
     const API_URL = 'https://projeto-senac-f43t.onrender.com/investigate';
+    const STREAM_URL = `${API_URL}/stream`;
+    const loadingMessage = loadingDiv.querySelector('p');
+    const defaultLoadingMessage = loadingMessage.textContent;
 
     const displayValidationMessage = (message) => {
         validationMessageDiv.textContent = message;
@@ -56,30 +59,147 @@ document.addEventListener('DOMContentLoaded', () => {
         }
 
         try {
-            const response = await fetch(API_URL, {
+            const response = await fetch(STREAM_URL, {
                 method: 'POST',
                 headers: { 'Content-Type': 'application/json' },
                 body: JSON.stringify(requestBody),
             });
 
-            if (!response.ok) {
-                const errorData = await response.json().catch(() => ({ detail: 'Unknown server error.' }));
-                throw new Error(errorData.detail || 'The server response was not successful.');
+            if (response.status === 404 || !response.body) {
+                // Backend without the streaming endpoint: falls back to the single response
+                displayResult(await fetchFullReport(requestBody));
+            } else {
+                if (!response.ok) {
+                    const errorData = await response.json().catch(() => ({ detail: 'Unknown server error.' }));
+                    throw new Error(errorData.detail || 'The server response was not successful.');
+                }
+                streamState = { draft: '', finished: false };
+                await readEventStream(response, handleStreamEvent);
+                if (!streamState.finished) {
+                    throw new Error('The connection closed before the final report arrived.');
+                }
             }
 
-            const result = await response.json();
-            displayResult(result);
-
         } catch (error) {
             
             displayError(error.message);
         } finally {
             loadingDiv.style.display = 'none';
+            loadingMessage.textContent = defaultLoadingMessage;
             investigateBtn.disabled = false;
             exampleBtns.forEach(btn => btn.disabled = false);
         }
     };
 
+    const fetchFullReport = async (requestBody) => {
+        const response = await fetch(API_URL, {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify(requestBody),
+        });
+
+        if (!response.ok) {
+            const errorData = await response.json().catch(() => ({ detail: 'Unknown server error.' }));
+            throw new Error(errorData.detail || 'The server response was not successful.');
+        }
+        return response.json();
+    };
+
+    const readEventStream = async (response, onEvent) => {
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+
+        while (true) {
+            const { done, value } = await reader.read();
+            if (done) break;
+            buffer += decoder.decode(value, { stream: true });
+
+            let boundary;
+            while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+                const rawEvent = buffer.slice(0, boundary);
+                buffer = buffer.slice(boundary + 2);
+
+                let event = 'message';
+                let data = '';
+                rawEvent.split('\n').forEach(line => {
+                    if (line.startsWith('event:')) event = line.slice(6).trim();
+                    else if (line.startsWith('data:')) data += line.slice(5).trim();
+                });
+                if (data) onEvent(event, JSON.parse(data));
+            }
+        }
+    };
+
+    // Draft of the report being written and whether a final event arrived
+    let streamState = { draft: '', finished: false };
+
+    const handleStreamEvent = (event, data) => {
+        switch (event) {
+            case 'extraction':
+                loadingMessage.textContent = `Article read: ${data.title}. Searching the web...`;
+                break;
+            case 'sources':
+                loadingMessage.textContent = `Found ${data.sources.length} sources. The AI is writing the report...`;
+                displaySources(data.sources);
+                break;
+            case 'report_chunk':
+                streamState.draft += data.text;
+                displayDraft(streamState.draft);
+                break;
+            case 'escalation':
+                // The stronger model starts the report over
+                loadingMessage.textContent = 'Double-checking with a stronger model...';
+                streamState.draft = '';
+                displayDraft(streamState.draft);
+                break;
+            case 'report':
+            case 'error':
+                streamState.finished = true;
+                displayResult(data);
+                break;
+        }
+    };
+
+    const displaySources = (sources) => {
+        const sourcesHtml = sources.map(source => `
+            <div class="source-item">
+                <a href="${source.link}" target="_blank" rel="noopener noreferrer">${source.title}</a>
+                <p>${source.snippet}</p>
+            </div>`).join('');
+
+        resultContainer.innerHTML = `
+            <div class="result-card glass-morphism">
+                <div class="result-body">
+                    <section class="result-section">
+                        <h3>🔗 Consulted Sources</h3>
+                        <div class="sources-list">${sourcesHtml}</div>
+                    </section>
+                </div>
+            </div>
+        `;
+    };
+
+    const displayDraft = (text) => {
+        let draft = resultContainer.querySelector('.report-draft');
+        if (!draft) {
+            const section = document.createElement('section');
+            section.className = 'result-card glass-morphism';
+            section.innerHTML = `
+                <div class="result-body">
+                    <section class="result-section">
+                        <h3>✍️ Writing the report...</h3>
+                        <pre class="report-draft"></pre>
+                    </section>
+                </div>
+            `;
+            resultContainer.prepend(section);
+            draft = section.querySelector('.report-draft');
+        }
+        // textContent: the draft is raw model output, not HTML
+        draft.textContent = text;
+    };
+
     const displayError = (message) => {
         clearValidationMessage();
         resultContainer.innerHTML = `
@@ -1,4 +1,5 @@
 const API_URL = 'https://projeto-senac-f43t.onrender.com/investigate';
+const STREAM_URL = `${API_URL}/stream`;
 
 async function investigateNews() {
     console.log('🕵️‍♂️ Iniciando investigação...');
@@ -26,19 +27,45 @@ async function investigateNews() {
     }
 
     try {
-        const response = await fetch(API_URL, {
+        const response = await fetch(STREAM_URL, {
             method: 'POST',
             headers: { 'Content-Type': 'application/json' },
             body: JSON.stringify(requestBody),
         });
 
+        if (response.status === 404 || !response.body) {
+            // Backend sem o endpoint de streaming: cai na resposta única
+            displayResult(await fetchFullReport(requestBody));
+            return;
+        }
+
         if (!response.ok) {
             const errorData = await response.json().catch(() => ({ detail: 'Erro desconhecido no servidor.' }));
             throw new Error(errorData.detail || 'A resposta do servidor não foi bem-sucedida.');
         }
 
-        const result = await response.json();
-        displayResult(result);
+        // Cada etapa do pipeline chega como um evento SSE assim que termina
+        let draft = '';
+        let finished = false;
+        await readEventStream(response, (event, data) => {
+            if (event === 'sources') {
+                console.log(`🔗 ${data.sources.length} fontes encontradas, aguardando o relatório...`);
+            } else if (event === 'report_chunk') {
+                draft += data.text;
+                displayDraft(draft);
+            } else if (event === 'escalation') {
+                // O modelo forte recomeça o relatório do zero
+                draft = '';
+                displayDraft(draft);
+            } else if (event === 'report' || event === 'error') {
+                finished = true;
+                displayResult(data);
+            }
+        });
+
+        if (!finished) {
+            throw new Error('A conexão foi encerrada antes do relatório final.');
+        }
 
     } catch (error) {
         console.error('❌ Erro na investigação:', error);
@@ -49,6 +76,62 @@ async function investigateNews() {
     }
 }
 
+async function fetchFullReport(requestBody) {
+    const response = await fetch(API_URL, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify(requestBody),
+    });
+
+    if (!response.ok) {
+        const errorData = await response.json().catch(() => ({ detail: 'Erro desconhecido no servidor.' }));
+        throw new Error(errorData.detail || 'A resposta do servidor não foi bem-sucedida.');
+    }
+    return response.json();
+}
+
+async function readEventStream(response, onEvent) {
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+
+    while (true) {
+        const { done, value } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+
+        let boundary;
+        while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+            const rawEvent = buffer.slice(0, boundary);
+            buffer = buffer.slice(boundary + 2);
+
+            let event = 'message';
+            let data = '';
+            rawEvent.split('\n').forEach(line => {
+                if (line.startsWith('event:')) event = line.slice(6).trim();
+                else if (line.startsWith('data:')) data += line.slice(5).trim();
+            });
+            if (data) onEvent(event, JSON.parse(data));
+        }
+    }
+}
+
+function displayDraft(text) {
+    const resultContainer = document.getElementById('result-container');
+    resultContainer.innerHTML = `
+        <div class="result-card">
+            <div class="result-body">
+                <div class="result-section summary-section">
+                    <h4>✍️ Redigindo o relatório...</h4>
+                    <pre class="report-draft"></pre>
+                </div>
+            </div>
+        </div>
+    `;
+    // textContent: o rascunho é texto cru do modelo, não HTML
+    resultContainer.querySelector('.report-draft').textContent = text;
+}
+
 function displayError(message) {
     const resultContainer = document.getElementById('result-container');
     resultContainer.innerHTML = `
@@ -101,6 +184,7 @@ function getVerdictIcon(verdict) {
         case 'FALSO': return '❌';
         case 'IMPRECISO': return '⚠️';
         case 'INSUFICIENTE': return '❓';
+        case 'SUSPEITO': return '🚩';
         default: return '🔎';
     }
 }
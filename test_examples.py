@@ -7,7 +7,7 @@ import requests
 import json
 
 # URL da API
-API_URL = "http://localhost:8000/verify"
+API_URL = "http://localhost:8000/investigate"
 
 def test_fake_news_example():
     """Testa com um exemplo de notícia suspeita"""
@@ -24,9 +24,9 @@ def test_fake_news_example():
     result = response.json()
     
     print(f"✅ Score de credibilidade: {result['credibility_score']:.2f}")
-    print(f"✅ É possivelmente falsa: {result['is_likely_fake']}")
-    print(f"✅ Confiança: {result['confidence']:.2f}")
-    print(f"✅ Padrões suspeitos encontrados: {result['analysis']['text']['suspicious_patterns_found']}")
+    print(f"✅ É possivelmente falsa: {result['prescreen']['is_likely_fake']}")
+    print(f"✅ Veredito: {result['verdict']}")
+    print(f"✅ Padrões suspeitos encontrados: {result['prescreen']['suspicious_patterns_found']}")
     print("-" * 50)
 
 def test_credible_news_example():
@@ -45,9 +45,9 @@ def test_credible_news_example():
     result = response.json()
     
     print(f"✅ Score de credibilidade: {result['credibility_score']:.2f}")
-    print(f"✅ É possivelmente falsa: {result['is_likely_fake']}")
-    print(f"✅ Confiança: {result['confidence']:.2f}")
-    print(f"✅ Padrões suspeitos encontrados: {result['analysis']['text']['suspicious_patterns_found']}")
+    print(f"✅ É possivelmente falsa: {result['prescreen']['is_likely_fake']}")
+    print(f"✅ Veredito: {result['verdict']}")
+    print(f"✅ Padrões suspeitos encontrados: {result['prescreen']['suspicious_patterns_found']}")
     print("-" * 50)
 
 def test_url_analysis():
@@ -63,10 +63,10 @@ def test_url_analysis():
     result = response.json()
     
     print(f"✅ Score de credibilidade: {result['credibility_score']:.2f}")
-    print(f"✅ É possivelmente falsa: {result['is_likely_fake']}")
-    print(f"✅ Confiança: {result['confidence']:.2f}")
-    print(f"✅ Fonte confiável: {result['analysis']['url']['is_credible_source']}")
-    print(f"✅ Domínio: {result['analysis']['url']['domain']}")
+    print(f"✅ É possivelmente falsa: {result['prescreen']['is_likely_fake']}")
+    print(f"✅ Veredito: {result['verdict']}")
+    print(f"✅ Fonte confiável: {result['prescreen']['is_credible_source']}")
+    print(f"✅ Domínio: {result['prescreen']['domain']}")
     print("-" * 50)
 
 def main():
@@ -0,0 +1,55 @@
+"""
+JobQueue com um analisador falso e o JobStore num SQLite temporário.
+"""
+
+import asyncio
+
+import pytest
+
+from app.services.jobs import JobQueue, JobQueueFull, JobStore
+
+
+class _Analyzer:
+    async def ainvestigate_and_report(self, text=None, url=None):
+        await asyncio.sleep(0.05)
+        return {"verdict": "CONFIRMADO", "text": text}
+
+
+def test_jobs_run_and_full_queue_is_rejected(tmp_path):
+    async def main():
+        queue = JobQueue(_Analyzer(), JobStore(str(tmp_path / "jobs.db")), workers=1, max_size=2)
+        await queue.start()
+        accepted, rejected = [], 0
+        for index in range(5):
+            try:
+                accepted.append((await queue.submit(text=f"pista {index}"))["id"])
+            except JobQueueFull:
+                rejected += 1
+        await asyncio.sleep(0.4)
+        jobs = [await queue.get(job_id) for job_id in accepted]
+        await queue.stop()
+        return jobs, rejected, queue.stats()
+
+    jobs, rejected, stats = asyncio.run(main())
+    assert rejected == 2 and stats["rejected"] == 2
+    assert [job["status"] for job in jobs] == ["done"] * 3
+    assert jobs[0]["result"]["text"] == "pista 0"
+
+
+def test_unfinished_jobs_are_resumed_even_beyond_the_queue_size(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.db"))
+    created = [store.create(text=f"pista {index}")["id"] for index in range(3)]
+
+    async def main():
+        queue = JobQueue(_Analyzer(), store, workers=2, max_size=1)
+        await queue.start()
+        await asyncio.sleep(0.4)
+        await queue.stop()
+
+    asyncio.run(main())
+    assert [store.get(job_id)["status"] for job_id in created] == ["done"] * 3
+
+
+@pytest.fixture(autouse=True)
+def _no_database_in_cwd(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
@@ -0,0 +1,148 @@
+"""
+ReportBatcher contra um LLM falso: o prompt real do lote (`PromptBuilder.build_batch`)
+e o parser real (`ReportParser.parse_batch`), só a chamada ao Gemini é substituída.
+"""
+
+import re
+import json
+import asyncio
+
+from app.services.llm_batcher import ReportBatcher
+from app.services.model_cascade import ModelCascade
+from app.services.prompt_builder import PromptBuilder
+from app.services.report_parser import ReportParser
+
+_CASE_RE = re.compile(r"=== CASO (\d+) ===\n.*?\"(.*?)\"", re.DOTALL)
+
+
+class StubLLM:
+    """
+    Responde a um lote com um relatório por caso; o veredito é a própria pista, para que
+    cada chamador confira que recebeu o relatório do seu caso.
+    """
+
+    def __init__(self, skip_cases=(), fail=False):
+        self.prompts = []
+        self.skip_cases = set(skip_cases)
+        self.fail = fail
+
+    async def generate(self, prompt: str) -> str:
+        self.prompts.append(prompt)
+        await asyncio.sleep(0.01)
+        if self.fail:
+            raise RuntimeError("cota excedida")
+        reports = [
+            {"case": int(number), "event_summary": f"caso {number}", "key_points": [], "verdict": lead}
+            for number, lead in _CASE_RE.findall(prompt) if int(number) not in self.skip_cases
+        ]
+        return json.dumps({"reports": reports})
+
+
+def _batcher(llm, structured=True, **options):
+    builder = PromptBuilder(structured=structured)
+    options = {"window_ms": 20, "max_size": 8, **options}
+    return ReportBatcher(llm.generate, builder.build_batch, ReportParser().parse_batch, **options)
+
+
+def _case(lead: str) -> str:
+    return PromptBuilder().build_case(lead, [{"title": "t", "link": "https://g1.globo.com/a", "snippet": "s"}])
+
+
+async def _submit_all(batcher, leads):
+    return await asyncio.gather(*(batcher.submit(_case(lead)) for lead in leads))
+
+
+def test_concurrent_cases_share_one_call():
+    llm = StubLLM()
+    batcher = _batcher(llm)
+    leads = ["CONFIRMADO", "FALSO", "IMPRECISO"]
+    reports = asyncio.run(_submit_all(batcher, leads))
+    assert len(llm.prompts) == 1
+    assert [report["verdict"] for report in reports] == leads
+    assert batcher.stats()["batched_cases"] == 3
+
+
+def test_full_batch_is_sent_without_waiting_for_the_window():
+    llm = StubLLM()
+    batcher = _batcher(llm, window_ms=10_000, max_size=2)
+    reports = asyncio.run(asyncio.wait_for(_submit_all(batcher, ["FALSO", "CONFIRMADO"]), timeout=2))
+    assert [report["verdict"] for report in reports] == ["FALSO", "CONFIRMADO"]
+
+
+def test_single_case_takes_the_individual_path():
+    llm = StubLLM()
+    batcher = _batcher(llm)
+    assert asyncio.run(_submit_all(batcher, ["FALSO"])) == [None]
+    assert llm.prompts == []
+    assert batcher.stats()["single"] == 1
+
+
+def test_missing_slot_and_failed_call_fall_back_to_none():
+    llm = StubLLM(skip_cases={2})
+    batcher = _batcher(llm)
+    reports = asyncio.run(_submit_all(batcher, ["FALSO", "CONFIRMADO"]))
+    assert reports[0]["verdict"] == "FALSO" and reports[1] is None
+    assert batcher.stats()["missing_slots"] == 1
+
+    failing = _batcher(StubLLM(fail=True))
+    assert asyncio.run(_submit_all(failing, ["FALSO", "CONFIRMADO"])) == [None, None]
+    assert failing.stats()["errors"] == 1
+
+
+def test_unstructured_batch_prompt_describes_the_report_fields():
+    llm = StubLLM()
+    reports = asyncio.run(_submit_all(_batcher(llm, structured=False), ["FALSO", "CONFIRMADO"]))
+    assert [report["verdict"] for report in reports] == ["FALSO", "CONFIRMADO"]
+    for field in ('"case"', '"event_summary"', '"key_points"', '"is_event_real"', '"verdict"'):
+        assert field in llm.prompts[0]
+
+
+class _Model:
+    def __init__(self, verdict):
+        self.verdict = verdict
+        self.calls = 0
+
+    async def generate_content_async(self, prompt):
+        self.calls += 1
+        return type("Response", (), {"text": json.dumps({"event_summary": "", "key_points": [], "verdict": self.verdict})})()
+
+
+def test_final_batched_report_skips_building_the_single_prompt():
+    models = {"fast": _Model("FALSO"), "strong": _Model("CONFIRMADO")}
+    cascade = ModelCascade(lambda name: models[name], ReportParser().parse,
+                           tiers=[("fast", "fast"), ("strong", "strong")], escalate_verdicts=["INSUFICIENTE"])
+    built = []
+
+    def prompt():
+        built.append(1)
+        return "prompt"
+
+    prior = {"event_summary": "", "key_points": [], "is_event_real": False, "verdict": "FALSO"}
+    report, tier = asyncio.run(cascade.agenerate(prompt, prior=prior))
+    assert (report["verdict"], tier, built) == ("FALSO", "fast", [])
+
+    prior = dict(prior, verdict="INSUFICIENTE")
+    report, tier = asyncio.run(cascade.agenerate(prompt, prior=prior))
+    assert (report["verdict"], tier, built) == ("CONFIRMADO", "strong", [1])
+    assert models["fast"].calls == 0
+
+
+def test_batched_cases_count_in_the_fast_tier_stats():
+    models = {"fast": _Model("FALSO"), "strong": _Model("CONFIRMADO")}
+    cascade = ModelCascade(lambda name: models[name], ReportParser().parse,
+                           tiers=[("fast", "fast"), ("strong", "strong")], escalate_verdicts=["INSUFICIENTE"])
+    batcher = _batcher(StubLLM(skip_cases={3}), on_batch=cascade.record_batch)
+
+    async def investigate(leads):
+        priors = await _submit_all(batcher, leads)
+        return [await cascade.agenerate("prompt", prior=prior) for prior in priors]
+
+    results = asyncio.run(investigate(["FALSO", "INSUFICIENTE", "IMPRECISO"]))
+    assert [tier for _, tier in results] == ["fast", "strong", "fast"]
+    stats = cascade.stats()
+    # Três casos no lote (um sem vaga, refeito individualmente) mais a escalada
+    assert stats["tiers"]["fast"]["batched"] == 3
+    assert stats["tiers"]["fast"]["calls"] == 4
+    assert stats["tiers"]["fast"]["errors"] == 1
+    assert stats["tiers"]["strong"]["calls"] == 1
+    assert stats["runs"] == 3 and stats["escalation_rate"] == round(1 / 3, 4)
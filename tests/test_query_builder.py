@@ -0,0 +1,42 @@
+"""
+QueryBuilder: números, entidades e palavras-chave que chegam à consulta de busca.
+"""
+
+import pytest
+
+from app.services.query_builder import QueryBuilder
+
+
+@pytest.fixture(scope="module")
+def builder():
+    return QueryBuilder()
+
+
+def test_currency_multiplier_is_kept_whole(builder):
+    assert builder.numbers("Desvio de R$ 10 milhões e US$ 2 bilhões; 5 mil casos") == ["R$ 10 milhões", "US$ 2 bilhões", "5 mil"]
+
+
+def test_bare_count_keeps_its_noun_but_not_a_verb(builder):
+    numbers = builder.numbers("O acidente deixou 62 pessoas feridas e o total de 38 alcançou o teto")
+    assert "62 pessoas" in numbers
+    assert not any("alcançou" in number for number in numbers)
+
+
+def test_topic_keyword_survives_entities_and_numbers(builder):
+    text = ("Prefeitura de Belo Horizonte confirma que a dengue matou 62 pessoas em Minas Gerais em 2024, "
+            "e a Secretaria de Estado de Saúde de Minas Gerais prevê mais casos")
+    query = builder.build(text)["query"]
+    assert "dengue" in query
+    assert "62 pessoas" in query
+
+
+def test_weekday_and_contractions_are_not_keywords(builder):
+    keywords = builder.keywords("Vacina contra dengue chega nesta terça-feira aos postos de saúde neste bairro")
+    assert not {"nesta", "neste", "feira", "terça"} & set(keywords)
+    assert "dengue" in keywords
+
+
+def test_sentence_initial_capital_is_not_an_entity(builder):
+    entities = builder.entities("Avião cai em Vinhedo. Descoberta da caixa-preta ajuda a Voepass. A Voepass confirmou.")
+    assert "Voepass" in entities
+    assert "Avião" not in entities and "Descoberta" not in entities
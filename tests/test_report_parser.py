@@ -0,0 +1,60 @@
+"""
+ReportParser com as respostas malformadas mais comuns do Gemini.
+"""
+
+import pytest
+
+from app.services.report_parser import ReportParser
+
+
+@pytest.fixture
+def parser():
+    return ReportParser()
+
+
+def test_strict_json(parser):
+    report, status = parser.parse('{"event_summary": "ok", "key_points": ["a"], "is_event_real": true, "verdict": "CONFIRMADO"}')
+    assert status == "strict"
+    assert report["verdict"] == "CONFIRMADO"
+
+
+def test_unescaped_quote_followed_by_comma_keeps_the_whole_value(parser):
+    text = '{"event_summary": "Ele disse "sim", depois saiu", "key_points": ["a"], "is_event_real": true, "verdict": "FALSO"}'
+    report, status = parser.parse(text)
+    assert status == "recovered"
+    assert report["event_summary"] == 'Ele disse "sim", depois saiu'
+    assert report["verdict"] == "FALSO"
+
+
+def test_truncated_response_with_unescaped_quote(parser):
+    text = '{"event_summary": "Ele disse "sim", depois saiu", "key_points": ["a"], "verdict": "FALSO"'
+    report, _ = parser.parse(text)
+    assert report["event_summary"] == 'Ele disse "sim", depois saiu'
+    assert report["key_points"] == ["a"]
+
+
+def test_python_dict_literal(parser):
+    text = "Segue: {'event_summary': \"D'Ávila disse\", 'key_points': ['a'], 'is_event_real': True, 'verdict': 'impreciso'}"
+    report, status = parser.parse(text)
+    assert status == "recovered"
+    assert report == {"event_summary": "D'Ávila disse", "key_points": ["a"], "is_event_real": True, "verdict": "IMPRECISO"}
+
+
+def test_fenced_json_with_newline_and_trailing_comma(parser):
+    text = '```json\n{"event_summary": "a\nb", "key_points": "só um", "verdict": "CONFIRMADO",}\n```'
+    report, _ = parser.parse(text)
+    assert report["event_summary"] == "a\nb"
+    assert report["key_points"] == ["só um"]
+
+
+def test_missing_verdict_fails(parser):
+    with pytest.raises(ValueError):
+        parser.parse('{"event_summary": "corte no meio')
+    assert parser.stats()["failed"] == 1
+
+
+def test_batch_with_truncated_last_case(parser):
+    text = '{"reports": [{"case": 1, "event_summary": "x", "key_points": [], "verdict": "FALSO"}, {"case": 2, "verdict": "CONFIRMADO"'
+    reports = parser.parse_batch(text)
+    assert reports[1]["verdict"] == "FALSO"
+    assert reports[2]["verdict"] == "CONFIRMADO"
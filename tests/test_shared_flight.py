@@ -0,0 +1,128 @@
+"""
+SharedFlight e RedisLock contra um Redis em memória (fakeredis).
+"""
+
+import time
+import asyncio
+import threading
+
+import pytest
+import fakeredis
+from redis.exceptions import ConnectionError as RedisConnectionError
+
+from app.services.cache import RedisLock, SharedFlight
+
+
+@pytest.fixture
+def client():
+    return fakeredis.FakeRedis(server=fakeredis.FakeServer())
+
+
+def _flight(client, **options):
+    options = {"lock_ttl": 5, "result_ttl": 5, "poll_interval": 0.01, "wait_timeout": 2, **options}
+    return SharedFlight(client, **options)
+
+
+def test_lock_is_exclusive_and_released_only_by_owner(client):
+    first = RedisLock(client, "lock:pista", ttl=5)
+    second = RedisLock(client, "lock:pista", ttl=5)
+    assert first.acquire()
+    assert not second.acquire()
+
+    second.release()  # token de outro dono: não apaga
+    assert not second.acquire()
+
+    first.release()
+    assert second.acquire()
+
+
+def test_lock_expires(client):
+    lock = RedisLock(client, "lock:pista", ttl=0.05)
+    assert lock.acquire()
+    time.sleep(0.1)
+    assert RedisLock(client, "lock:pista", ttl=5).acquire()
+
+
+def test_run_computes_once_across_workers(client):
+    # Cada "worker" tem sua própria instância, como processos diferentes
+    flights = [_flight(client) for _ in range(4)]
+    calls, results = [], []
+    started = threading.Barrier(len(flights))
+
+    def compute():
+        calls.append(1)
+        time.sleep(0.2)
+        return {"verdict": "CONFIRMADO"}
+
+    def worker(flight):
+        started.wait()
+        results.append(flight.run("pista", compute))
+
+    threads = [threading.Thread(target=worker, args=(flight,)) for flight in flights]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert results == [{"verdict": "CONFIRMADO"}] * len(flights)
+    assert sum(flight.led for flight in flights) == 1
+    assert sum(flight.waited for flight in flights) == len(flights) - 1
+
+
+def test_arun_computes_once(client):
+    flights = [_flight(client) for _ in range(4)]
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.2)
+        return {"verdict": "FALSO"}
+
+    async def main():
+        return await asyncio.gather(*(flight.arun("pista", compute) for flight in flights))
+
+    results = asyncio.run(main())
+    assert len(calls) == 1
+    assert results == [{"verdict": "FALSO"}] * len(flights)
+
+
+def test_waiter_takes_over_when_lock_expires(client):
+    # Dono do lock que morreu sem publicar: o lock expira e quem espera assume
+    assert RedisLock(client, "lock:morto", ttl=0.1).acquire()
+    flight = _flight(client)
+    flight._lock = lambda key: RedisLock(client, "lock:morto", ttl=5)
+
+    assert flight.run("pista", lambda: {"verdict": "IMPRECISO"}) == {"verdict": "IMPRECISO"}
+    assert flight.led == 1
+
+
+class _DownRedis:
+    def set(self, *args, **kwargs):
+        raise RedisConnectionError("Redis fora do ar")
+
+    def get(self, *args, **kwargs):
+        raise RedisConnectionError("Redis fora do ar")
+
+    def pipeline(self):
+        raise RedisConnectionError("Redis fora do ar")
+
+
+def test_run_falls_through_immediately_when_redis_is_down():
+    flight = _flight(_DownRedis(), wait_timeout=5)
+    start = time.monotonic()
+    assert flight.run("pista", lambda: {"verdict": "CONFIRMADO"}) == {"verdict": "CONFIRMADO"}
+    assert time.monotonic() - start < 1
+    assert flight.errors == 1
+
+
+def test_arun_falls_through_immediately_when_redis_is_down():
+    flight = _flight(_DownRedis(), wait_timeout=5)
+
+    async def compute():
+        return {"verdict": "CONFIRMADO"}
+
+    start = time.monotonic()
+    assert asyncio.run(flight.arun("pista", compute)) == {"verdict": "CONFIRMADO"}
+    assert time.monotonic() - start < 1
+    assert flight.errors == 1
@@ -0,0 +1,20 @@
+"""
+ExtractiveSummarizer: caminho de texto curto (menos de três frases aproveitáveis).
+"""
+
+from app.services.summarizer import ExtractiveSummarizer
+
+
+def test_short_text_is_cut_at_sentence_end():
+    summarizer = ExtractiveSummarizer(target_chars=80, min_chars=20)
+    text = "O governo anunciou um novo pacote de medidas econômicas nesta segunda. Outra frase longa que não cabe no resumo final."
+    assert summarizer.summarize(text) == "O governo anunciou um novo pacote de medidas econômicas nesta segunda."
+
+
+def test_short_text_without_sentence_end_is_cut_at_word():
+    summarizer = ExtractiveSummarizer(target_chars=40, min_chars=20)
+    summary = summarizer.summarize("Prefeitura confirma vacinação contra dengue em todas as escolas municipais")
+    assert summary.endswith("…")
+    assert len(summary) <= 40
+    words = set("Prefeitura confirma vacinação contra dengue em todas as escolas municipais".split())
+    assert all(word in words for word in summary[:-1].split())